@@ -0,0 +1,573 @@
+"""
+Motor de execução assíncrona de comandos.
+
+Um único event loop asyncio roda em uma thread de fundo e cada comando
+submetido é executado pelo transporte do motor (transport.py); o padrão,
+LocalTransport, cria um subprocesso com asyncio.create_subprocess_shell.
+As interfaces submetem comandos e recebem um ExecutionHandle com status,
+código de retorno e saída incremental, sem criar uma thread por execução.
+
+As submissões passam por uma fila de prioridade com limite de execuções
+simultâneas; um Command.key que já está em andamento não é iniciado de
+novo, a nova submissão é anexada à execução existente.
+
+Cada execução tem tempo limite e pode ser cancelada; em ambos os casos a
+árvore de processos do comando é encerrada.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+from typing import Any, Callable, Coroutine, Deque, Dict, List, Optional, Set, Tuple
+
+from models import Command
+from executor import SaidaCallback, STREAM_CHUNK_SIZE, preparar_elevacao
+from platform_detector import Platform, obter_plataforma
+from metrics import ExecutionSample, MetricsRegistry, metricas
+from result_cache import CachedResult, ResultCache
+from transport import LocalTransport, Transport
+
+
+# Estados possíveis de uma execução
+STATUS_PENDENTE = "pendente"
+STATUS_EXECUTANDO = "executando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_FALHOU = "falhou"
+STATUS_CANCELADO = "cancelado"
+STATUS_TIMEOUT = "timeout"
+
+# Prioridades da fila (menor valor executa primeiro)
+PRIORIDADE_ALTA = 0
+PRIORIDADE_NORMAL = 10
+PRIORIDADE_BAIXA = 20
+
+# Limite padrão de comandos executando ao mesmo tempo
+MAX_CONCORRENCIA_PADRAO = 4
+
+# Tempo máximo para encerrar as execuções ao fechar a aplicação
+PRAZO_ENCERRAMENTO_MOTOR = 3.0
+
+# Quantidade de saída recente guardada para quem se anexa a uma execução
+SAIDA_REPLAY_MAX_BYTES = 64 * 1024
+
+
+class ExecutionHandle:
+    """Acompanha uma execução submetida ao ExecutionEngine."""
+
+    def __init__(
+        self,
+        command_key: str,
+        nome: str,
+        comando: str,
+        requires_admin: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        self.command_key = command_key
+        self.nome = nome
+        self.comando = comando
+        self.requires_admin = requires_admin
+        self.timeout = timeout or None
+
+        self.status = STATUS_PENDENTE
+        self.returncode: Optional[int] = None
+        self.erro: Optional[BaseException] = None
+        self.inicio: Optional[float] = None
+        self.fim: Optional[float] = None
+        self.future: Future = Future()
+        self.submissoes = 1
+        self.amostra = ExecutionSample()
+        # Resultado devolvido do cache de resultados, sem executar
+        self.do_cache = False
+        self.cache_ttl: Optional[float] = None
+
+        self._saidas: List[SaidaCallback] = []
+        self._recente: Deque[str] = deque()
+        self._recente_tamanho = 0
+        self._lock = threading.Lock()
+        self._tarefa: Optional["asyncio.Task"] = None
+        self._cancelador: Optional[Callable[["ExecutionHandle"], None]] = None
+        # Saída completa, guardada só para comandos com cache_ttl
+        self._capturada: Optional[List[str]] = None
+        self._capturada_max = 0
+        self._capturada_tamanho = 0
+
+    def adicionar_saida(self, saida: SaidaCallback, reproduzir: bool = True) -> None:
+        """
+        Registra um destino adicional para a saída incremental.
+
+        Args:
+            saida: Destino dos próximos trechos de saída
+            reproduzir: Se True, entrega antes a saída recente já emitida
+                (até SAIDA_REPLAY_MAX_BYTES)
+        """
+        with self._lock:
+            if saida in self._saidas:
+                return
+            self._saidas.append(saida)
+            recente = "".join(self._recente) if reproduzir else ""
+
+        if recente:
+            saida(recente)
+
+    def ao_concluir(self, callback: Callable[["ExecutionHandle"], None]) -> None:
+        """
+        Registra um callback chamado ao final da execução.
+
+        O callback roda na thread do motor (ou imediatamente, se a
+        execução já terminou); interfaces gráficas devem reagendá-lo
+        no próprio loop de eventos.
+        """
+        self.future.add_done_callback(lambda _f: callback(self))
+
+    def cancelar(self) -> None:
+        """Cancela a execução, encerrando a árvore de processos se já iniciou."""
+        if self._cancelador is not None:
+            self._cancelador(self)
+
+    def resultado(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Bloqueia até o fim da execução e retorna o código de retorno."""
+        return self.future.result(timeout)
+
+    @property
+    def concluido(self) -> bool:
+        """Indica se a execução já terminou (com sucesso ou não)."""
+        return self.future.done()
+
+    @property
+    def sucesso(self) -> bool:
+        """True se terminou sem erro e com código 0 (ou delegada ao UAC)."""
+        return self.status == STATUS_CONCLUIDO and self.returncode in (0, None)
+
+    @property
+    def duracao(self) -> Optional[float]:
+        """Tempo de execução em segundos, se já iniciada."""
+        if self.inicio is None:
+            return None
+        return (self.fim or time.monotonic()) - self.inicio
+
+    def _emitir(self, texto: str) -> None:
+        """Repassa um trecho de saída para todos os destinos registrados."""
+        with self._lock:
+            saidas = list(self._saidas)
+            if self._capturada is not None:
+                # Mesma medida do ResultCache (bytes em UTF-8)
+                self._capturada_tamanho += len(texto.encode("utf-8"))
+                if self._capturada_tamanho > self._capturada_max:
+                    # Grande demais para o cache
+                    self._capturada = None
+                else:
+                    self._capturada.append(texto)
+            self._recente.append(texto)
+            self._recente_tamanho += len(texto)
+            while self._recente_tamanho > SAIDA_REPLAY_MAX_BYTES and len(self._recente) > 1:
+                self._recente_tamanho -= len(self._recente.popleft())
+
+        for saida in saidas:
+            try:
+                saida(texto)
+            except Exception:
+                logging.exception("Falha ao repassar saída de %s", self.nome)
+
+
+class ExecutionEngine:
+    """Executa comandos em subprocessos assíncronos num event loop dedicado."""
+
+    def __init__(
+        self,
+        max_concorrencia: int = MAX_CONCORRENCIA_PADRAO,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        timeout_padrao: Optional[float] = None,
+        transport: Optional[Transport] = None,
+        registro_metricas: Optional[MetricsRegistry] = None,
+        cache: Optional[ResultCache] = None,
+        plataforma: Optional[Platform] = None,
+    ):
+        self.max_concorrencia = max(1, max_concorrencia)
+        self.chunk_size = chunk_size
+        self.transport = transport or LocalTransport(chunk_size)
+        self.registro_metricas = registro_metricas or metricas
+        self.cache = cache if cache is not None else ResultCache()
+        self.plataforma = plataforma or obter_plataforma()
+        self.timeout_padrao = timeout_padrao or None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Estado do agendador, protegido por self._lock
+        self._fila: List[Tuple[int, int, ExecutionHandle]] = []
+        self._sequencia = itertools.count()
+        self._em_execucao = 0
+        self._em_andamento: Dict[str, ExecutionHandle] = {}
+        self._ativos: Set[ExecutionHandle] = set()
+        self._contadores = {
+            "submetidos": 0,
+            "deduplicados": 0,
+            "concluidos": 0,
+            "pico_fila": 0,
+            "do_cache": 0,
+        }
+
+    def iniciar(self) -> None:
+        """Cria o event loop e a thread de fundo (idempotente)."""
+        with self._lock:
+            if self._loop is not None:
+                return
+
+            pronto = threading.Event()
+            loop = asyncio.new_event_loop()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(pronto.set)
+                loop.run_forever()
+                loop.close()
+
+            self._thread = threading.Thread(target=run, name="ExecutionEngine", daemon=True)
+            self._thread.start()
+            pronto.wait()
+            self._loop = loop
+
+    def parar(self, timeout: Optional[float] = 5.0) -> None:
+        """Encerra o event loop e aguarda a thread de fundo."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+
+    def executar_no_loop(self, coro: Coroutine) -> Future:
+        """Agenda uma corrotina no event loop do motor (seguro em qualquer thread)."""
+        self.iniciar()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def definir_max_concorrencia(self, max_concorrencia: int) -> None:
+        """Altera o limite de execuções simultâneas e despacha a fila."""
+        self.max_concorrencia = max(1, max_concorrencia)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._despachar)
+
+    def definir_timeout_padrao(self, timeout: Optional[float]) -> None:
+        """Define o tempo limite usado quando o Command não define o seu."""
+        self.timeout_padrao = timeout or None
+
+    def cancelar(self, handle: ExecutionHandle) -> None:
+        """Cancela uma execução na fila ou em andamento."""
+        if self._loop is None or handle.concluido:
+            return
+        self._loop.call_soon_threadsafe(self._cancelar_no_loop, handle)
+
+    def cancelar_todos(self) -> int:
+        """
+        Cancela todas as execuções na fila ou em andamento.
+
+        Returns:
+            Quantidade de execuções canceladas.
+        """
+        with self._lock:
+            handles = [h for h in self._ativos if not h.concluido]
+        for handle in handles:
+            self.cancelar(handle)
+        return len(handles)
+
+    def encerrar(self, timeout: float = PRAZO_ENCERRAMENTO_MOTOR) -> int:
+        """
+        Cancela todas as execuções, aguarda o encerramento dos processos e
+        para o event loop, esperando no máximo `timeout` segundos no total.
+
+        Returns:
+            Quantidade de execuções canceladas.
+        """
+        limite = time.monotonic() + timeout
+        with self._lock:
+            handles = [h for h in self._ativos if not h.concluido]
+        for handle in handles:
+            self.cancelar(handle)
+        if handles:
+            wait([h.future for h in handles], timeout)
+        self.parar(max(0.0, limite - time.monotonic()))
+        return len(handles)
+
+    def submeter(
+        self,
+        cmd: Command,
+        saida: Optional[SaidaCallback] = None,
+        prioridade: int = PRIORIDADE_NORMAL,
+        fresco: bool = False,
+    ) -> ExecutionHandle:
+        """
+        Agenda a execução de um Command do catálogo.
+
+        Se o mesmo Command.key já estiver na fila ou executando, nenhum
+        processo novo é criado: a saída é anexada ao handle existente,
+        que é retornado com `submissoes` incrementado.
+
+        Se o Command tem cache_ttl e há um resultado válido no cache, ele
+        é devolvido na hora num handle já concluído (`do_cache`).
+
+        Args:
+            cmd: Comando a ser executado
+            saida: Destino opcional da saída incremental
+            prioridade: Posição na fila (PRIORIDADE_ALTA/NORMAL/BAIXA)
+            fresco: Se True, ignora o cache e executa de novo
+
+        Returns:
+            Handle para acompanhar a execução.
+        """
+        usa_cache = bool(cmd.cache_ttl) and self.cache.max_bytes > 0
+        if usa_cache and not fresco:
+            resultado = self.cache.obter(cmd.command)
+            if resultado is not None:
+                return self._responder_do_cache(cmd, resultado, saida)
+
+        with self._lock:
+            existente = self._em_andamento.get(cmd.key)
+            if existente is not None:
+                existente.submissoes += 1
+                self._contadores["deduplicados"] += 1
+            else:
+                timeout = cmd.timeout if cmd.timeout is not None else self.timeout_padrao
+                handle = ExecutionHandle(cmd.key, cmd.name, cmd.command, cmd.requires_admin, timeout)
+                if usa_cache:
+                    handle.cache_ttl = cmd.cache_ttl
+                    handle._capturada = []
+                    handle._capturada_max = self.cache.max_bytes
+                self._em_andamento[cmd.key] = handle
+
+        if existente is not None:
+            logging.info("Comando já em andamento, anexando: %s", cmd.name)
+            if saida is not None:
+                existente.adicionar_saida(saida)
+            return existente
+
+        return self._agendar(handle, saida, prioridade)
+
+    def _responder_do_cache(
+        self,
+        cmd: Command,
+        resultado: CachedResult,
+        saida: Optional[SaidaCallback],
+    ) -> ExecutionHandle:
+        """Devolve um handle concluído com a saída guardada no cache."""
+        handle = ExecutionHandle(cmd.key, cmd.name, cmd.command, cmd.requires_admin)
+        handle.do_cache = True
+        handle.cache_ttl = cmd.cache_ttl
+        if saida is not None:
+            handle.adicionar_saida(saida)
+
+        restante = max(0.0, cmd.cache_ttl - resultado.idade)
+        handle._emitir(
+            f"♻️ [cache] Resultado de {resultado.idade:.0f}s atrás "
+            f"(válido por mais {restante:.0f}s; execute sem cache para atualizar)\n"
+        )
+        handle._emitir(resultado.saida)
+
+        with self._lock:
+            self._contadores["do_cache"] += 1
+        logging.info("Resultado em cache: %s", cmd.name, extra={"command_key": cmd.key, "status": "cache"})
+
+        handle.status = STATUS_CONCLUIDO
+        handle.returncode = resultado.returncode
+        handle.inicio = handle.fim = time.monotonic()
+        handle.future.set_result(resultado.returncode)
+        return handle
+
+    def submeter_livre(
+        self,
+        comando_texto: str,
+        requer_admin: bool = False,
+        saida: Optional[SaidaCallback] = None,
+        prioridade: int = PRIORIDADE_NORMAL,
+    ) -> ExecutionHandle:
+        """Agenda a execução de um comando livre digitado pelo operador."""
+        handle = ExecutionHandle("LIVRE", "Comando Livre", comando_texto, requer_admin, self.timeout_padrao)
+        return self._agendar(handle, saida, prioridade)
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna um retrato do agendador.
+
+        Chaves: na_fila, em_execucao, max_concorrencia, pico_fila,
+        submetidos, deduplicados, concluidos e do_cache.
+        """
+        with self._lock:
+            return {
+                "na_fila": len(self._fila),
+                "em_execucao": self._em_execucao,
+                "max_concorrencia": self.max_concorrencia,
+                **self._contadores,
+            }
+
+    def _agendar(
+        self,
+        handle: ExecutionHandle,
+        saida: Optional[SaidaCallback],
+        prioridade: int,
+    ) -> ExecutionHandle:
+        """Registra a saída e envia o handle para a fila do event loop."""
+        self.iniciar()
+        handle._cancelador = self.cancelar
+        with self._lock:
+            self._ativos.add(handle)
+        if saida is not None:
+            handle.adicionar_saida(saida)
+        self._loop.call_soon_threadsafe(self._enfileirar, handle, prioridade)
+        return handle
+
+    def _enfileirar(self, handle: ExecutionHandle, prioridade: int) -> None:
+        """Insere o handle na fila de prioridade (thread do loop)."""
+        with self._lock:
+            heapq.heappush(self._fila, (prioridade, next(self._sequencia), handle))
+            self._contadores["submetidos"] += 1
+            self._contadores["pico_fila"] = max(self._contadores["pico_fila"], len(self._fila))
+        self._despachar()
+
+    def _despachar(self) -> None:
+        """Inicia execuções da fila enquanto houver vagas (thread do loop)."""
+        while True:
+            with self._lock:
+                if not self._fila or self._em_execucao >= self.max_concorrencia:
+                    return
+                _, _, handle = heapq.heappop(self._fila)
+                if handle.concluido:
+                    # Cancelado enquanto aguardava na fila
+                    continue
+                self._em_execucao += 1
+
+            tarefa = self._loop.create_task(self._executar(handle))
+            handle._tarefa = tarefa
+            tarefa.add_done_callback(lambda _t, h=handle: self._ao_terminar_tarefa(h))
+
+    def _ao_terminar_tarefa(self, handle: ExecutionHandle) -> None:
+        """Libera a vaga da execução encerrada e despacha a fila."""
+        if not handle.concluido:
+            # Tarefa cancelada antes de começar a executar
+            self._finalizar(handle, STATUS_CANCELADO, None)
+
+        with self._lock:
+            self._em_execucao -= 1
+            self._contadores["concluidos"] += 1
+        self._despachar()
+
+    def _cancelar_no_loop(self, handle: ExecutionHandle) -> None:
+        """Cancela a tarefa do handle ou o retira da fila (thread do loop)."""
+        if handle.concluido:
+            return
+        if handle._tarefa is not None:
+            handle._tarefa.cancel()
+        else:
+            logging.info("Execução cancelada na fila: %s", handle.nome)
+            self._finalizar(handle, STATUS_CANCELADO, None)
+
+    async def _executar(self, handle: ExecutionHandle) -> None:
+        """Executa o comando do handle e publica o resultado no future."""
+        handle.status = STATUS_EXECUTANDO
+        handle.inicio = time.monotonic()
+        extra = {"command_key": handle.command_key}
+        logging.info("Executando comando: %s (%s)", handle.nome, handle.comando, extra=extra)
+
+        try:
+            comando = handle.comando
+            if handle.requires_admin:
+                loop = asyncio.get_running_loop()
+                comando = await loop.run_in_executor(
+                    None, preparar_elevacao, comando, handle._emitir, self.plataforma
+                )
+                if comando is None:
+                    self._finalizar(handle, STATUS_CONCLUIDO, None)
+                    return
+
+            returncode = await self._executar_subprocesso(handle, comando)
+
+            if returncode != 0:
+                handle._emitir(f"Código de retorno: {returncode}\n")
+                logging.warning("Comando retornou código %s: %s", returncode, handle.comando, extra=extra)
+            else:
+                logging.info("Comando executado com sucesso: %s", handle.nome, extra=extra)
+
+            self._finalizar(handle, STATUS_CONCLUIDO, returncode)
+
+        except asyncio.TimeoutError:
+            handle._emitir(f"\n⏱️ Tempo limite de {handle.timeout:g}s excedido; processo encerrado.\n")
+            logging.warning("Tempo limite excedido (%ss): %s", handle.timeout, handle.comando, extra=extra)
+            self._finalizar(handle, STATUS_TIMEOUT, None)
+
+        except asyncio.CancelledError:
+            handle._emitir("\n⏹️ Execução cancelada; processo encerrado.\n")
+            logging.info("Execução cancelada: %s", handle.nome, extra=extra)
+            self._finalizar(handle, STATUS_CANCELADO, None)
+
+        except Exception as exc:
+            handle._emitir(f"Erro ao executar o comando: {exc}\n")
+            logging.exception("Erro ao executar comando: %s", handle.comando, extra=extra)
+            self._finalizar(handle, STATUS_FALHOU, None, exc)
+
+    async def _executar_subprocesso(self, handle: ExecutionHandle, comando: str) -> int:
+        """Executa o comando pelo transporte do motor com o tempo limite do handle."""
+        return await self.transport.executar(comando, handle._emitir, handle.timeout, handle.amostra)
+
+    def _finalizar(
+        self,
+        handle: ExecutionHandle,
+        status: str,
+        returncode: Optional[int],
+        erro: Optional[BaseException] = None,
+    ) -> None:
+        """Registra o estado final do handle e resolve seu future."""
+        with self._lock:
+            if self._em_andamento.get(handle.command_key) is handle:
+                del self._em_andamento[handle.command_key]
+            self._ativos.discard(handle)
+
+        handle.status = status
+        handle.returncode = returncode
+        handle.erro = erro
+        handle.fim = time.monotonic()
+        logging.info(
+            "Execução finalizada: %s", handle.nome,
+            extra={
+                "command_key": handle.command_key,
+                "duracao": handle.duracao,
+                "returncode": returncode,
+                "status": status,
+            },
+        )
+
+        if handle.cache_ttl and status == STATUS_CONCLUIDO and returncode == 0:
+            with handle._lock:
+                capturada, handle._capturada = handle._capturada, None
+            if capturada is not None:
+                self.cache.guardar(handle.comando, "".join(capturada), returncode, handle.cache_ttl)
+
+        # Só execuções que chegaram ao transporte (não as canceladas na fila
+        # nem as delegadas ao UAC) entram nas métricas
+        if handle.amostra.duracao is not None:
+            handle.amostra.status = status
+            self.registro_metricas.registrar(handle.command_key, handle.amostra)
+
+        if erro is not None:
+            handle.future.set_exception(erro)
+        else:
+            handle.future.set_result(returncode)
+
+
+_engine_padrao: Optional[ExecutionEngine] = None
+_engine_lock = threading.Lock()
+
+
+def obter_engine() -> ExecutionEngine:
+    """Retorna o motor compartilhado da aplicação, iniciando-o se preciso."""
+    global _engine_padrao
+    with _engine_lock:
+        if _engine_padrao is None:
+            _engine_padrao = ExecutionEngine()
+        _engine_padrao.iniciar()
+        return _engine_padrao
@@ -0,0 +1,81 @@
+"""
+Vazão da execução em vários alvos (fan-out) para 1, 10 e 100 alvos.
+
+Cada cenário executa o mesmo comando em N alvos e mede o tempo total e
+os alvos concluídos por segundo:
+    - simulado: MockTransport (custo do agendamento e da saída marcada)
+    - loopback: um LoopbackAgent por alvo em 127.0.0.1, cada um criando
+      um subprocesso local (custo do protocolo e dos processos)
+
+Uso:
+    python benchmarks/bench_fanout.py [--alvos 1 10 100] [--paralelismo 16]
+        [--linhas 100] [--repeticoes 3] [--comando CMD]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Command
+from transport import LoopbackAgent, MockTransport
+from fanout import Target, executar_em_alvos
+
+
+def medir(cmd: Command, alvos: List[Target], paralelismo: int, repeticoes: int) -> float:
+    """Mediana do tempo total (s) de executar em todos os alvos."""
+    linhas = 0
+
+    def contar(texto: str) -> None:
+        nonlocal linhas
+        linhas += texto.count("\n")
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        execucao = executar_em_alvos(cmd, alvos, paralelismo=paralelismo, saida=contar).resultado()
+        tempos.append(time.perf_counter() - inicio)
+        if not execucao.sucesso:
+            print(execucao.resumo(), file=sys.stderr)
+    return statistics.median(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--alvos", type=int, nargs="+", default=[1, 10, 100], help="Quantidades de alvos")
+    parser.add_argument("--paralelismo", type=int, default=16, help="Alvos executando ao mesmo tempo")
+    parser.add_argument("--linhas", type=int, default=100, help="Linhas de saída por alvo")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições por cenário (mediana)")
+    parser.add_argument("--comando", help="Comando executado pelos agentes (padrão: Python imprimindo --linhas linhas)")
+    args = parser.parse_args()
+
+    cmd = Command(
+        key="BENCH",
+        name="Benchmark",
+        command=args.comando or f'"{sys.executable}" -c "for i in range({args.linhas}): print(\'linha\', i)"',
+        category="Benchmark",
+    )
+
+    print(f"Paralelismo: {args.paralelismo}, {args.linhas} linhas por alvo, mediana de {args.repeticoes}")
+    print(f"{'Cenário':<10} {'Alvos':>6} {'Tempo (s)':>10} {'Alvos/s':>10}")
+    for quantidade in args.alvos:
+        saida = "".join(f"linha {i}\n" for i in range(args.linhas))
+        alvos = [Target(f"sim{i}", MockTransport(saida)) for i in range(quantidade)]
+        tempo = medir(cmd, alvos, args.paralelismo, args.repeticoes)
+        print(f"{'simulado':<10} {quantidade:>6} {tempo:>10.3f} {quantidade / tempo:>10.1f}")
+
+        agentes = [LoopbackAgent() for _ in range(quantidade)]
+        try:
+            alvos = [Target(f"agente{i}", agente.transporte()) for i, agente in enumerate(agentes)]
+            tempo = medir(cmd, alvos, args.paralelismo, args.repeticoes)
+            print(f"{'loopback':<10} {quantidade:>6} {tempo:>10.3f} {quantidade / tempo:>10.1f}")
+        finally:
+            for agente in agentes:
+                agente.parar()
+
+
+if __name__ == "__main__":
+    main()
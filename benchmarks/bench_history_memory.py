@@ -0,0 +1,86 @@
+"""
+Memória ocupada pelo histórico em memória (bytes por entrada).
+
+Compara a entrada antiga (dataclass com __dict__, strings duplicadas a
+cada linha lida) com CommandHistoryEntry atual (__slots__ e strings
+internadas). As entradas são criadas como no carregamento do diário:
+uma linha JSON por entrada, com comandos sorteados do catálogo.
+
+Uso:
+    python benchmarks/bench_history_memory.py [--linhas 1000000]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import CommandHistoryEntry
+from commands_windows import get_windows_commands
+
+
+@dataclass
+class EntradaSemSlots:
+    """Formato anterior de CommandHistoryEntry, para comparação."""
+    timestamp: str
+    command_key: str
+    command_name: str
+    command_text: str
+    success: bool
+    is_free_command: bool = False
+
+
+def gerar_linhas(quantidade: int) -> List[str]:
+    """Linhas do diário com comandos sorteados do catálogo."""
+    rng = random.Random(42)
+    comandos = get_windows_commands()
+    linhas = []
+    for i in range(quantidade):
+        cmd = rng.choice(comandos)
+        linhas.append(json.dumps({
+            "timestamp": f"2025-01-{1 + i % 28:02d} {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+            "command_key": cmd.key,
+            "command_name": cmd.name,
+            "command_text": cmd.command,
+            "success": rng.random() > 0.1,
+            "is_free_command": False,
+        }, ensure_ascii=False))
+    return linhas
+
+
+def medir(linhas: List[str], fabrica: Callable) -> int:
+    """Bytes retidos pelas entradas criadas a partir das linhas."""
+    gc.collect()
+    tracemalloc.start()
+    entradas = [fabrica(**json.loads(linha)) for linha in linhas]
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entradas
+    gc.collect()
+    return atual
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=1_000_000, help="Entradas no histórico")
+    args = parser.parse_args()
+
+    linhas = gerar_linhas(args.linhas)
+    print(f"Entradas: {args.linhas:,}")
+    print(f"{'Formato':<36} {'Total (MB)':>12} {'Bytes/entrada':>14}")
+    for nome, fabrica in (
+        ("dataclass com __dict__", EntradaSemSlots),
+        ("CommandHistoryEntry (slots+intern)", CommandHistoryEntry),
+    ):
+        total = medir(linhas, fabrica)
+        print(f"{nome:<36} {total / 1024 / 1024:>12.1f} {total / args.linhas:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Suíte de benchmarks com resultados em JSON para comparar execuções.
+
+Mede, isolado num diretório temporário (sem tocar nos arquivos do usuário):
+    - catalogo: get_all_commands (sem cache, com o pickle compilado e já
+      carregado) e indexar_por_key
+    - filtro: a busca feita por update_command_list (CommandSearchIndex.buscar
+      com favoritos, categoria e LIMITE_LISTA) em catálogos de 60, 1k e 50k
+      comandos, comparada com a meta de META_BUSCA por tecla; também sem
+      limite, como era antes do LIMITE_LISTA
+    - historico: ConfigManager.adicionar_ao_historico, salvar_historico,
+      carregamento e get_history com 500, 50k e 1M entradas
+    - execucao: vazão e latência de comandos triviais no ExecutionEngine
+      (processos locais e transporte simulado) e no executor síncrono
+
+Cada medição guarda mínimo, mediana, média, p95 e máximo em segundos. Com
+--comparar, medianas mais lentas que a execução anterior além da
+tolerância são listadas e o código de saída é 1.
+
+Uso:
+    python benchmarks/run_benchmarks.py [--grupos catalogo filtro historico execucao]
+        [--catalogos 60 1000 50000] [--historicos 500 50000 1000000]
+        [--execucoes 200] [--repeticoes 5] [--saida ARQUIVO.json]
+        [--comparar ANTERIOR.json] [--tolerancia 0.2]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import catalog_cache
+from async_executor import ExecutionEngine
+from commands_config import get_all_commands
+from commands_windows import get_windows_commands
+from config_manager import CONFIG_FILE, ConfigManager
+from executor import executar_comando_stream, indexar_por_key
+from metrics import MetricsRegistry
+from models import Command, CommandHistoryEntry
+from search import LIMITE_LISTA, CommandSearchIndex
+from transport import MockTransport
+
+
+GRUPOS = ("catalogo", "filtro", "historico", "execucao")
+RESULTADOS_DIR = os.path.join(RAIZ, "benchmarks", "resultados")
+
+# Texto digitado na busca, tecla a tecla, mais consultas completas
+DIGITACAO = "ipconfig"
+CONSULTAS = ("rede", "painel de controle", "ipconfg", "disco admin")
+
+# Meta de tempo de uma busca por tecla digitada (segundos)
+META_BUSCA = 0.001
+
+# Chamadas de adicionar_ao_historico medidas em cada tamanho
+ADICOES_HISTORICO = 1000
+
+COMANDO_TRIVIAL = "exit 0"
+
+
+def estatisticas(tempos: List[float]) -> Dict[str, float]:
+    """Resumo de uma lista de tempos em segundos."""
+    ordenados = sorted(tempos)
+    return {
+        "amostras": len(ordenados),
+        "min": ordenados[0],
+        "mediana": statistics.median(ordenados),
+        "media": statistics.fmean(ordenados),
+        "p95": ordenados[max(0, math.ceil(len(ordenados) * 0.95) - 1)],
+        "max": ordenados[-1],
+    }
+
+
+def medir(funcao: Callable[[], object], repeticoes: int, preparar: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """Executa `funcao` `repeticoes` vezes (após `preparar`, fora da medição)."""
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return estatisticas(tempos)
+
+
+def gerar_catalogo(tamanho: int) -> List[Command]:
+    """Catálogo sintético: o catálogo do Windows repetido com keys e nomes únicos."""
+    base = get_windows_commands()
+    comandos = []
+    for i in range(tamanho):
+        cmd = base[i % len(base)]
+        copia = i // len(base)
+        if copia:
+            cmd = replace(cmd, key=f"{cmd.key}_{copia}", name=f"{cmd.name} {copia}")
+        comandos.append(cmd)
+    return comandos
+
+
+def gerar_historico(quantidade: int) -> List[CommandHistoryEntry]:
+    """Entradas de histórico com comandos sorteados do catálogo."""
+    rng = random.Random(42)
+    comandos = get_windows_commands()
+    entradas = []
+    for i in range(quantidade):
+        cmd = rng.choice(comandos)
+        entradas.append(CommandHistoryEntry(
+            timestamp=f"2025-01-{1 + i % 28:02d} {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+            command_key=cmd.key,
+            command_name=cmd.name,
+            command_text=cmd.command,
+            success=rng.random() > 0.1,
+        ))
+    return entradas
+
+
+def bench_catalogo(args) -> Dict[str, Dict]:
+    resultados = {}
+
+    def sem_cache():
+        catalog_cache._catalogo = None
+        if os.path.exists(catalog_cache.CATALOG_CACHE_FILE):
+            os.remove(catalog_cache.CATALOG_CACHE_FILE)
+
+    resultados["catalogo.get_all_commands.sem_cache"] = medir(get_all_commands, args.repeticoes, sem_cache)
+
+    def com_pickle():
+        catalog_cache._catalogo = None
+
+    resultados["catalogo.get_all_commands.pickle"] = medir(get_all_commands, args.repeticoes, com_pickle)
+    resultados["catalogo.get_all_commands.carregado"] = medir(get_all_commands, args.repeticoes * 20)
+
+    for tamanho in args.catalogos:
+        comandos = gerar_catalogo(tamanho)
+        resultados[f"catalogo.indexar_por_key.{tamanho}"] = medir(lambda: indexar_por_key(comandos), args.repeticoes)
+    return resultados
+
+
+def bench_filtro(args) -> Dict[str, Dict]:
+    resultados = {}
+    for tamanho in args.catalogos:
+        comandos = gerar_catalogo(tamanho)
+        resultados[f"filtro.construir_indice.{tamanho}"] = medir(
+            lambda: CommandSearchIndex(comandos), max(1, args.repeticoes // 2)
+        )
+
+        indice = CommandSearchIndex(comandos)
+        favoritos = [cmd.key for cmd in comandos[::10]]
+        categoria = comandos[0].category
+
+        def filtrar(consulta: str, categoria: Optional[str] = None, limite: Optional[int] = LIMITE_LISTA):
+            # Mesma chamada de update_command_list
+            limite = limite if consulta.strip() else None
+            return indice.buscar(consulta, favoritos=favoritos, categoria=categoria, limite=limite)
+
+        def limpar_cache():
+            indice._limpar_cache()
+
+        resultados[f"filtro.vazio.{tamanho}"] = medir(lambda: filtrar(""), args.repeticoes)
+        resultados[f"filtro.categoria.{tamanho}"] = medir(lambda: filtrar("", categoria), args.repeticoes)
+
+        for sufixo, limite in (("", LIMITE_LISTA), (".sem_limite", None)):
+            # Cada tecla é uma nova consulta; o índice começa sem cache de
+            # termos. A primeira tecla não tem consulta anterior a estreitar.
+            primeira, seguintes = [], []
+            for _ in range(args.repeticoes):
+                limpar_cache()
+                for fim in range(1, len(DIGITACAO) + 1):
+                    inicio = time.perf_counter()
+                    filtrar(DIGITACAO[:fim], limite=limite)
+                    (primeira if fim == 1 else seguintes).append(time.perf_counter() - inicio)
+            resultados[f"filtro.digitacao{sufixo}.{tamanho}"] = com_meta(estatisticas(primeira + seguintes))
+            resultados[f"filtro.digitacao.primeira_tecla{sufixo}.{tamanho}"] = com_meta(estatisticas(primeira))
+            resultados[f"filtro.digitacao.seguintes{sufixo}.{tamanho}"] = com_meta(estatisticas(seguintes))
+
+            for consulta in CONSULTAS:
+                nome = consulta.replace(" ", "_")
+                resultados[f"filtro.consulta.{nome}{sufixo}.{tamanho}"] = com_meta(medir(
+                    lambda: filtrar(consulta, limite=limite), args.repeticoes, limpar_cache
+                ))
+    return resultados
+
+
+def com_meta(dados: Dict[str, float], meta: float = META_BUSCA) -> Dict[str, float]:
+    """Marca se a medição cumpre a meta (p95 dentro do tempo)."""
+    dados["meta"] = meta
+    dados["atinge_meta"] = dados["p95"] <= meta
+    return dados
+
+
+def bench_historico(args) -> Dict[str, Dict]:
+    resultados = {}
+    for tamanho in args.historicos:
+        for arquivo in os.listdir("."):
+            if arquivo.startswith("command_history"):
+                os.remove(arquivo)
+        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+            json.dump({"history_retention": tamanho, "history_fsync": args.fsync}, f)
+
+        entradas = gerar_historico(tamanho)
+        repeticoes = args.repeticoes if tamanho <= 50_000 else max(1, args.repeticoes // 3)
+
+        config_manager = ConfigManager()
+        config_manager.history = list(entradas)
+        resultados[f"historico.salvar_historico.{tamanho}"] = medir(
+            config_manager.salvar_historico, repeticoes
+        )
+
+        tempos = []
+        for i in range(ADICOES_HISTORICO):
+            cmd = entradas[i % len(entradas)]
+            inicio = time.perf_counter()
+            config_manager.adicionar_ao_historico(cmd.command_key, cmd.command_name, cmd.command_text, success=True)
+            tempos.append(time.perf_counter() - inicio)
+        resultados[f"historico.adicionar_ao_historico.{tamanho}"] = estatisticas(tempos)
+
+        resultados[f"historico.get_history.{tamanho}"] = medir(config_manager.get_history, repeticoes)
+        config_manager.salvar_historico()
+        config_manager.fechar()
+        del config_manager
+
+        def carregar():
+            novo = ConfigManager()
+            novo.history
+            novo.fechar()
+
+        resultados[f"historico.carregar.{tamanho}"] = medir(carregar, repeticoes)
+    return resultados
+
+
+def bench_execucao(args) -> Dict[str, Dict]:
+    resultados = {}
+
+    def rodada(engine: ExecutionEngine, prefixo: str) -> None:
+        # Sequencial: latência sem fila
+        tempos = []
+        for i in range(max(1, args.execucoes // 10)):
+            cmd = Command(f"SEQ{i}", "Trivial", COMANDO_TRIVIAL, "Benchmark")
+            inicio = time.perf_counter()
+            engine.submeter(cmd).resultado(30)
+            tempos.append(time.perf_counter() - inicio)
+        resultados[f"{prefixo}.latencia"] = estatisticas(tempos)
+
+        # Rajada: todos submetidos de uma vez, limitados por max_concorrencia
+        latencias = []
+        inicio = time.perf_counter()
+        handles = []
+        for i in range(args.execucoes):
+            cmd = Command(f"B{i}", "Trivial", COMANDO_TRIVIAL, "Benchmark")
+            enviado = time.perf_counter()
+            handle = engine.submeter(cmd)
+            handle.ao_concluir(lambda h, enviado=enviado: latencias.append(time.perf_counter() - enviado))
+            handles.append(handle)
+        for handle in handles:
+            handle.resultado(60)
+        total = time.perf_counter() - inicio
+        resultados[f"{prefixo}.rajada"] = {
+            **estatisticas(latencias),
+            "comandos": args.execucoes,
+            "total": total,
+            "por_segundo": args.execucoes / total,
+        }
+
+    for prefixo, transport in (
+        ("execucao.motor_local", None),
+        ("execucao.motor_simulado", MockTransport("ok\n")),
+    ):
+        engine = ExecutionEngine(transport=transport, registro_metricas=MetricsRegistry())
+        try:
+            rodada(engine, prefixo)
+        finally:
+            engine.parar()
+
+    resultados["execucao.stream_sincrono.latencia"] = medir(
+        lambda: executar_comando_stream(COMANDO_TRIVIAL, saida=lambda _: None),
+        max(1, args.execucoes // 10),
+    )
+    return resultados
+
+
+BENCHMARKS = {
+    "catalogo": bench_catalogo,
+    "filtro": bench_filtro,
+    "historico": bench_historico,
+    "execucao": bench_execucao,
+}
+
+
+def ambiente() -> Dict[str, object]:
+    """Identificação da máquina e da versão do código medido."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def comparar(atual: Dict[str, Dict], anterior: Dict[str, Dict], tolerancia: float) -> List[str]:
+    """Medições cuja mediana piorou mais que `tolerancia` (fração)."""
+    regressoes = []
+    for nome, dados in atual.items():
+        base = anterior.get(nome)
+        if not base or not base.get("mediana"):
+            continue
+        razao = dados["mediana"] / base["mediana"]
+        if razao > 1 + tolerancia:
+            regressoes.append(
+                f"{nome}: {base['mediana'] * 1000:.3f} ms -> {dados['mediana'] * 1000:.3f} ms ({razao:.2f}x)"
+            )
+    return regressoes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--grupos", nargs="+", choices=GRUPOS, default=list(GRUPOS), help="Grupos a executar")
+    parser.add_argument("--catalogos", type=int, nargs="+", default=[60, 1000, 50_000], help="Tamanhos de catálogo")
+    parser.add_argument("--historicos", type=int, nargs="+", default=[500, 50_000, 1_000_000], help="Tamanhos de histórico")
+    parser.add_argument("--execucoes", type=int, default=200, help="Comandos triviais por rajada")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Repetições por medição")
+    parser.add_argument("--fsync", default="lote", help="Política de fsync do histórico (sempre, lote, nunca)")
+    parser.add_argument("--saida", help="Arquivo JSON de resultado (padrão: benchmarks/resultados/<data>.json)")
+    parser.add_argument("--comparar", help="Resultado anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Piora aceita da mediana (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    saida = os.path.abspath(args.saida or os.path.join(RESULTADOS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json"))
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            anterior = json.load(f)["resultados"]
+
+    resultados: Dict[str, Dict] = {}
+    diretorio_original = os.getcwd()
+    temporario = tempfile.mkdtemp(prefix="bench_helpcommands_")
+    os.chdir(temporario)
+    try:
+        for grupo in args.grupos:
+            print(f"== {grupo}", flush=True)
+            medicoes = BENCHMARKS[grupo](args)
+            for nome, dados in medicoes.items():
+                extra = f"  {dados['por_segundo']:.1f}/s" if "por_segundo" in dados else ""
+                if "meta" in dados:
+                    extra += f"  meta {dados['meta'] * 1000:g} ms: {'atingida' if dados['atinge_meta'] else 'NÃO atingida'}"
+                print(f"{nome:<48} mediana {dados['mediana'] * 1000:>10.3f} ms  p95 {dados['p95'] * 1000:>10.3f} ms{extra}")
+            resultados.update(medicoes)
+    finally:
+        os.chdir(diretorio_original)
+        shutil.rmtree(temporario, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(saida), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump({
+            "gerado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "ambiente": ambiente(),
+            "parametros": {k: v for k, v in vars(args).items() if k not in ("saida", "comparar")},
+            "resultados": resultados,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}")
+
+    if anterior is not None:
+        regressoes = comparar(resultados, anterior, args.tolerancia)
+        for linha in regressoes:
+            print(f"REGRESSÃO {linha}")
+        if regressoes:
+            return 1
+        print("Nenhuma regressão acima da tolerância.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Cache compilado do catálogo de comandos.
+
+Ler os catálogos (o embutido e os de catalogs/), criar os Commands e
+construir o índice de busca custa a cada inicialização. O resultado
+compilado (comandos, mapa por key e CommandSearchIndex) é gravado em
+pickle junto com a assinatura das fontes; enquanto nenhuma muda, a
+inicialização só desserializa o cache.
+
+A assinatura combina mtime e tamanho de cada fonte (verificação barata)
+com o SHA-256 do conteúdo: se só o mtime mudou (arquivo copiado,
+checkout), os hashes confirmam que o cache continua válido.
+"""
+import gc
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import catalog_loader
+import models
+import search
+from models import Command
+from search import CommandSearchIndex
+from catalog_loader import CATALOGS_DIR, carregar_catalogos, listar_catalogos
+from platform_detector import obter_plataforma
+
+
+CATALOG_CACHE_FILE = "catalog_cache.pickle"
+
+# Incrementar ao mudar o formato do cache
+CATALOG_CACHE_VERSION = 2
+
+
+@dataclass
+class CommandCatalog:
+    """Catálogo pronto para uso: comandos, mapa por key e índice de busca."""
+    comandos: List[Command]
+    por_key: Dict[str, Command]
+    indice: CommandSearchIndex
+    avisos: List[str] = field(default_factory=list)  # entradas inválidas e duplicatas
+
+
+def compilar_catalogo(comandos: List[Command], avisos: Optional[List[str]] = None) -> CommandCatalog:
+    """Constrói o mapa por key e o índice de busca dos comandos."""
+    return CommandCatalog(
+        comandos=comandos,
+        por_key={cmd.key: cmd for cmd in comandos},
+        indice=CommandSearchIndex(comandos),
+        avisos=avisos or [],
+    )
+
+
+def fontes_padrao(diretorio: str = CATALOGS_DIR) -> List[str]:
+    """Catálogo embutido da plataforma seguido dos arquivos do diretório de catálogos."""
+    return [obter_plataforma().catalogo] + listar_catalogos(diretorio)
+
+
+def _estado_arquivo(caminho: str) -> tuple:
+    """(mtime em ns, tamanho) do arquivo."""
+    info = os.stat(caminho)
+    return info.st_mtime_ns, info.st_size
+
+
+def _hash_arquivo(caminho: str) -> str:
+    """SHA-256 do conteúdo do arquivo."""
+    with open(caminho, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _versao_codigo() -> tuple:
+    """
+    Estado dos módulos que determinam o conteúdo do pickle; mudar Command,
+    a validação ou o índice invalida o cache.
+    """
+    return (
+        CATALOG_CACHE_VERSION,
+        _estado_arquivo(catalog_loader.__file__),
+        _estado_arquivo(models.__file__),
+        _estado_arquivo(search.__file__),
+    )
+
+
+def _ler_cache(cache: str) -> Optional[dict]:
+    """Lê o cache; None se ausente ou ilegível."""
+    # O coletor de lixo é pausado durante a leitura: desserializar milhares
+    # de objetos dispara coletas que não têm o que liberar
+    gc_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        with open(cache, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Erro ao ler cache do catálogo: {e}")
+        return None
+    finally:
+        if gc_ativo:
+            gc.enable()
+
+
+def _gravar_cache(cache: str, dados: dict) -> None:
+    """Grava o cache de forma atômica (arquivo temporário + rename)."""
+    temporario = cache + ".tmp"
+    try:
+        with open(temporario, 'wb') as f:
+            pickle.dump(dados, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, cache)
+    except Exception as e:
+        print(f"Erro ao gravar cache do catálogo: {e}")
+
+
+def carregar_catalogo(fontes: Optional[Sequence[str]] = None, cache: str = CATALOG_CACHE_FILE) -> CommandCatalog:
+    """
+    Carrega o catálogo usando o cache compilado quando ainda válido.
+    
+    Args:
+        fontes: Arquivos de catálogo em ordem de precedência (padrão:
+            fontes_padrao())
+        cache: Arquivo do cache compilado
+    """
+    fontes = [os.path.abspath(f) for f in (fontes if fontes is not None else fontes_padrao())]
+    estados = [_estado_arquivo(f) for f in fontes]
+    versao = _versao_codigo()
+    dados = _ler_cache(cache)
+    hashes = None
+
+    if dados is not None and dados.get("versao") == versao and dados.get("fontes") == fontes:
+        if dados.get("estados") == estados:
+            return dados["catalogo"]
+
+        # mtime mudou: o conteúdo ainda pode ser o mesmo
+        hashes = [_hash_arquivo(f) for f in fontes]
+        if dados.get("hashes") == hashes:
+            dados["estados"] = estados
+            _gravar_cache(cache, dados)
+            return dados["catalogo"]
+
+    if hashes is None:
+        hashes = [_hash_arquivo(f) for f in fontes]
+
+    catalogo = compilar_catalogo(*carregar_catalogos(fontes))
+    for aviso in catalogo.avisos:
+        print(f"Erro no catálogo: {aviso}")
+
+    _gravar_cache(cache, {
+        "versao": versao,
+        "fontes": fontes,
+        "estados": estados,
+        "hashes": hashes,
+        "catalogo": catalogo,
+    })
+    return catalogo
+
+
+_catalogo: Optional[CommandCatalog] = None
+
+
+def obter_catalogo() -> CommandCatalog:
+    """Retorna o catálogo da aplicação, carregando-o no primeiro uso."""
+    global _catalogo
+    if _catalogo is None:
+        _catalogo = carregar_catalogo()
+    return _catalogo
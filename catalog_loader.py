@@ -0,0 +1,181 @@
+"""
+Leitura de catálogos de comandos a partir de arquivos de dados.
+
+Além do catálogo embutido da plataforma (commands_windows.json ou
+commands_linux.json, ver platform_detector), cada arquivo .json ou
+.toml do diretório catalogs/ é um catálogo adicional. Os arquivos são
+lidos em paralelo, cada entrada é validada contra os campos de Command e
+as keys repetidas são descartadas (vale a primeira definição: o catálogo
+embutido e depois os arquivos em ordem alfabética).
+
+Formato JSON:
+    {"commands": [{"key": "S1", "name": "...", "command": "...", "category": "..."}]}
+
+Formato TOML:
+    [[commands]]
+    key = "S1"
+    name = "..."
+    command = "..."
+    category = "..."
+"""
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from typing import Any, Dict, List, Tuple
+
+from models import Command
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+CATALOGS_DIR = "catalogs"
+EXTENSOES_CATALOGO = (".json", ".toml")
+
+# Máximo de arquivos lidos ao mesmo tempo
+MAX_LEITURAS_PARALELAS = 8
+
+CAMPOS_OBRIGATORIOS = ("key", "name", "command", "category")
+CAMPOS_TEXTO = ("key", "name", "command", "category", "description")
+CAMPOS_BOOLEANOS = ("requires_admin", "is_critical")
+CAMPOS_COMMAND = frozenset(f.name for f in fields(Command))
+
+
+class CatalogError(ValueError):
+    """Arquivo de catálogo ou entrada inválida."""
+
+
+def listar_catalogos(diretorio: str = CATALOGS_DIR) -> List[str]:
+    """Arquivos de catálogo do diretório, em ordem alfabética."""
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(
+        os.path.join(diretorio, nome)
+        for nome in os.listdir(diretorio)
+        if nome.lower().endswith(EXTENSOES_CATALOGO)
+    )
+
+
+def ler_entradas(caminho: str, secao: str = "commands") -> List[Any]:
+    """Lê um arquivo JSON/TOML e retorna a lista bruta de entradas da seção."""
+    if caminho.lower().endswith(".toml"):
+        if tomllib is None:
+            raise CatalogError("suporte a TOML requer Python 3.11+ ou o pacote tomli")
+        with open(caminho, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    if isinstance(data, dict):
+        data = data.get(secao)
+    if not isinstance(data, list):
+        raise CatalogError(f'esperada uma lista "{secao}"')
+    return data
+
+
+def validar_entrada(item: Any) -> Command:
+    """
+    Converte uma entrada do catálogo em Command.
+
+    Raises:
+        CatalogError: Campo ausente, desconhecido ou com tipo errado
+    """
+    if not isinstance(item, dict):
+        raise CatalogError("entrada não é um objeto")
+
+    desconhecidos = set(item) - CAMPOS_COMMAND
+    if desconhecidos:
+        raise CatalogError(f"campos desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    for campo in CAMPOS_OBRIGATORIOS:
+        if not item.get(campo):
+            raise CatalogError(f"campo obrigatório ausente: {campo}")
+    for campo in CAMPOS_TEXTO:
+        if campo in item and not isinstance(item[campo], str):
+            raise CatalogError(f"campo {campo} deve ser texto")
+    for campo in CAMPOS_BOOLEANOS:
+        if campo in item and not isinstance(item[campo], bool):
+            raise CatalogError(f"campo {campo} deve ser true/false")
+
+    for campo in ("timeout", "cache_ttl"):
+        valor = item.get(campo)
+        if valor is not None and (
+            isinstance(valor, bool) or not isinstance(valor, (int, float)) or valor <= 0
+        ):
+            raise CatalogError(f"campo {campo} deve ser um número positivo")
+
+    # Keys e categorias se repetem entre catálogos, histórico e favoritos
+    item["key"] = sys.intern(item["key"])
+    item["category"] = sys.intern(item["category"])
+    return Command(**item)
+
+
+def ler_catalogo(caminho: str) -> Tuple[List[Command], List[str]]:
+    """
+    Lê e valida um arquivo de catálogo.
+
+    Returns:
+        (comandos válidos, mensagens de erro); entradas inválidas são
+        ignoradas e relatadas, um arquivo ilegível resulta em lista vazia.
+    """
+    nome = os.path.basename(caminho)
+    try:
+        entradas = ler_entradas(caminho)
+    except Exception as e:
+        return [], [f"{nome}: {e}"]
+
+    comandos: List[Command] = []
+    erros: List[str] = []
+    for i, item in enumerate(entradas, 1):
+        try:
+            comandos.append(validar_entrada(item))
+        except (CatalogError, TypeError) as e:
+            key = item.get("key") if isinstance(item, dict) else None
+            erros.append(f"{nome}: entrada {i}{f' ({key})' if key else ''}: {e}")
+    return comandos, erros
+
+
+def ler_catalogos(caminhos: List[str]) -> List[Tuple[List[Command], List[str]]]:
+    """Lê vários catálogos em paralelo (resultado de ler_catalogo para cada um)."""
+    if not caminhos:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_LEITURAS_PARALELAS, len(caminhos))) as pool:
+        return list(pool.map(ler_catalogo, caminhos))
+
+
+def combinar_catalogos(
+    caminhos: List[str],
+    resultados: List[Tuple[List[Command], List[str]]],
+) -> Tuple[List[Command], List[str]]:
+    """
+    Combina catálogos já lidos na ordem informada, descartando keys repetidas.
+
+    Returns:
+        (comandos sem keys repetidas, mensagens de erro e de duplicatas)
+    """
+    comandos: List[Command] = []
+    erros: List[str] = []
+    origem: Dict[str, str] = {}
+    for caminho, (lidos, erros_arquivo) in zip(caminhos, resultados):
+        nome = os.path.basename(caminho)
+        erros.extend(erros_arquivo)
+        for cmd in lidos:
+            if cmd.key in origem:
+                erros.append(f"{nome}: key duplicada '{cmd.key}' ignorada (já definida em {origem[cmd.key]})")
+                continue
+            origem[cmd.key] = nome
+            comandos.append(cmd)
+    return comandos, erros
+
+
+def carregar_catalogos(caminhos: List[str]) -> Tuple[List[Command], List[str]]:
+    """Lê vários catálogos em paralelo e os combina na ordem informada."""
+    return combinar_catalogos(caminhos, ler_catalogos(caminhos))
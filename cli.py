@@ -0,0 +1,325 @@
+"""
+Interface de linha de comando (sem interface gráfica).
+
+Usa o mesmo catálogo, executor e histórico das GUIs, sem importar Tk,
+para uso em scripts e em máquinas sem display.
+
+Uso:
+    python cli.py list [--categoria CAT] [--json]
+    python cli.py search TEXTO... [--limite N] [--json]
+    python cli.py run KEY [--timeout S] [--sim] [--metricas]
+    python cli.py runbook [KEY] [--sim]
+    python cli.py fanout KEY [--alvos ALVO...] [--loopback N] [--paralelismo N] [--timeout S] [--sim]
+    python cli.py history [--limite N] [--comando KEY] [--falhas] [--desde DATA] [--ate DATA] [--json]
+
+Os mesmos subcomandos funcionam via main.py (python main.py list).
+"""
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import asdict
+from typing import List, Optional
+
+from models import Command
+
+
+# Subcomandos reconhecidos (main.py usa esta lista para decidir entre CLI e GUI;
+# mantenha leves os imports do nível do módulo)
+COMANDOS_CLI = ("list", "search", "run", "runbook", "fanout", "history")
+
+# Códigos de saída
+SAIDA_ERRO = 1
+SAIDA_USO = 2
+SAIDA_TIMEOUT = 124
+
+
+def _imprimir_comandos(comandos: List[Command], como_json: bool) -> None:
+    """Lista comandos em tabela ou JSON."""
+    if como_json:
+        print(json.dumps([asdict(cmd) for cmd in comandos], ensure_ascii=False, indent=2))
+        return
+    for cmd in comandos:
+        marcas = ("🔒" if cmd.requires_admin else "  ") + ("⚠️ " if cmd.is_critical else "  ")
+        print(f"[{cmd.key:>4}] {marcas} {cmd.name} ({cmd.category})")
+
+
+def _buscar_comando(key: str) -> Optional[Command]:
+    """Localiza um comando pela key (sem diferenciar maiúsculas)."""
+    from catalog_cache import obter_catalogo
+    
+    por_key = obter_catalogo().por_key
+    cmd = por_key.get(key)
+    if cmd is None:
+        cmd = next((c for k, c in por_key.items() if k.upper() == key.upper()), None)
+    return cmd
+
+
+def _confirmar(cmd: Command) -> bool:
+    """Pede confirmação no terminal para comandos críticos."""
+    if not sys.stdin.isatty():
+        print(f"⚠️  {cmd.name} é um comando crítico; use --sim para confirmar sem terminal.")
+        return False
+    resposta = input(f"⚠️  {cmd.name} é um comando crítico. Confirmar execução? [s/N] ")
+    return resposta.strip().lower() in ("s", "sim", "y", "yes")
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    """Lista o catálogo."""
+    from catalog_cache import obter_catalogo
+    
+    comandos = obter_catalogo().comandos
+    if args.categoria:
+        comandos = [cmd for cmd in comandos if cmd.category.lower() == args.categoria.lower()]
+    _imprimir_comandos(comandos, args.json)
+    return 0
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    """Busca no catálogo com o mesmo índice das GUIs."""
+    from catalog_cache import obter_catalogo
+    
+    comandos = obter_catalogo().indice.buscar(" ".join(args.consulta), limite=args.limite)
+    _imprimir_comandos(comandos, args.json)
+    return 0 if comandos else SAIDA_ERRO
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    """Executa um comando do catálogo, transmitindo a saída para o stdout."""
+    from config_manager import ConfigManager
+    from executor import configurar_logger, executar_comando
+    
+    cmd = _buscar_comando(args.key)
+    if cmd is None:
+        print(f"Comando não encontrado: {args.key}", file=sys.stderr)
+        return SAIDA_USO
+    
+    configurar_logger()
+    config_manager = ConfigManager()
+    timeout = args.timeout if args.timeout is not None else config_manager.config.command_timeout
+    confirmacao = (lambda _: True) if args.sim else _confirmar
+    
+    try:
+        returncode = executar_comando(cmd, confirmacao, timeout=timeout or None)
+    except subprocess.TimeoutExpired:
+        returncode = SAIDA_TIMEOUT
+    except Exception:
+        returncode = SAIDA_ERRO
+    
+    if returncode is not None:
+        config_manager.adicionar_ao_historico(
+            cmd.key, cmd.name, cmd.command, success=(returncode == 0)
+        )
+    config_manager.fechar()
+    
+    if args.metricas:
+        from metrics import formatar_resumo, metricas
+        print(file=sys.stderr)
+        print(formatar_resumo(metricas.resumo(), {cmd.key: cmd.name}), file=sys.stderr)
+    
+    return SAIDA_ERRO if returncode is None else returncode
+
+
+def cmd_runbook(args: argparse.Namespace) -> int:
+    """Lista os runbooks ou executa um deles, com um registro no histórico."""
+    from catalog_cache import obter_catalogo
+    from runbook import RunbookError, carregar_runbooks, descrever_passos, executar_runbook
+    
+    runbooks, erros = carregar_runbooks()
+    for erro in erros:
+        print(f"Erro no runbook: {erro}", file=sys.stderr)
+    
+    if args.key is None:
+        for rb in runbooks:
+            print(f"[{rb.key:>4}] {rb.name}: {descrever_passos(rb)}")
+        return 0
+    
+    runbook = next((rb for rb in runbooks if rb.key.upper() == args.key.upper()), None)
+    if runbook is None:
+        print(f"Runbook não encontrado: {args.key}", file=sys.stderr)
+        return SAIDA_USO
+    
+    from config_manager import ConfigManager
+    from executor import configurar_logger
+    
+    comandos = obter_catalogo().por_key
+    criticos = [comandos[p.key] for p in runbook.steps if p.key in comandos and comandos[p.key].is_critical]
+    if criticos and not args.sim and not all(_confirmar(cmd) for cmd in criticos):
+        return SAIDA_ERRO
+    
+    configurar_logger()
+    config_manager = ConfigManager()
+    try:
+        execucao = executar_runbook(runbook, comandos, saida=_saida_stdout)
+    except RunbookError as e:
+        print(f"Runbook inválido: {e}", file=sys.stderr)
+        return SAIDA_USO
+    
+    try:
+        execucao.resultado()
+    except KeyboardInterrupt:
+        execucao.cancelar()
+        execucao.resultado()
+    
+    print()
+    print(execucao.resumo())
+    config_manager.adicionar_ao_historico(
+        runbook.key, f"Runbook: {runbook.name}", descrever_passos(runbook), success=execucao.sucesso
+    )
+    config_manager.fechar()
+    return 0 if execucao.sucesso else SAIDA_ERRO
+
+
+def cmd_fanout(args: argparse.Namespace) -> int:
+    """Executa um comando do catálogo em vários alvos ao mesmo tempo."""
+    from fanout import Target, criar_alvo, executar_em_alvos
+    from transport import LoopbackAgent
+    
+    cmd = _buscar_comando(args.key)
+    if cmd is None:
+        print(f"Comando não encontrado: {args.key}", file=sys.stderr)
+        return SAIDA_USO
+    
+    try:
+        alvos = [criar_alvo(espec) for espec in args.alvos]
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return SAIDA_USO
+    agentes = [LoopbackAgent() for _ in range(args.loopback)]
+    alvos += [Target(f"loopback{i}", agente.transporte()) for i, agente in enumerate(agentes, 1)]
+    if not alvos:
+        print("Informe os alvos com --alvos ou --loopback.", file=sys.stderr)
+        return SAIDA_USO
+    
+    if cmd.is_critical and not args.sim and not _confirmar(cmd):
+        return SAIDA_ERRO
+    
+    from config_manager import ConfigManager
+    from executor import configurar_logger
+    
+    configurar_logger()
+    config_manager = ConfigManager()
+    timeout = args.timeout if args.timeout is not None else config_manager.config.command_timeout
+    try:
+        execucao = executar_em_alvos(
+            cmd, alvos, paralelismo=args.paralelismo, timeout=timeout or None, saida=_saida_stdout,
+            parar_em_falha=args.parar_em_falha,
+        )
+        try:
+            execucao.resultado()
+        except KeyboardInterrupt:
+            execucao.cancelar()
+            execucao.resultado()
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return SAIDA_USO
+    finally:
+        for agente in agentes:
+            agente.parar()
+    
+    print()
+    print(execucao.resumo())
+    config_manager.adicionar_ao_historico(
+        cmd.key, f"{cmd.name} ({len(alvos)} alvos)", cmd.command, success=execucao.sucesso
+    )
+    config_manager.fechar()
+    return 0 if execucao.sucesso else SAIDA_ERRO
+
+
+def _saida_stdout(texto: str) -> None:
+    """Escreve a saída no stdout assim que chega."""
+    sys.stdout.write(texto)
+    sys.stdout.flush()
+
+
+def cmd_history(args: argparse.Namespace) -> int:
+    """Consulta o histórico persistido (mais recentes primeiro)."""
+    from config_manager import ConfigManager
+    
+    # Só a data no limite final inclui o dia inteiro
+    fim = args.ate
+    if fim is not None and len(fim) == len("AAAA-MM-DD"):
+        fim += " 23:59:59"
+    
+    config_manager = ConfigManager()
+    entradas = config_manager.consultar_historico(
+        inicio=args.desde,
+        fim=fim,
+        command_key=args.comando,
+        somente_falhas=args.falhas,
+        limite=args.limite,
+    )
+    config_manager.fechar()
+    
+    if args.json:
+        print(json.dumps([asdict(e) for e in entradas], ensure_ascii=False, indent=2))
+    else:
+        for entry in entradas:
+            status = "✓" if entry.success else "✗"
+            print(f"{entry.timestamp}  {status}  [{entry.command_key}] {entry.command_name}")
+    return 0
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Parser dos subcomandos da CLI."""
+    parser = argparse.ArgumentParser(
+        prog="helpcommands",
+        description="Help Commands em modo texto (sem interface gráfica).",
+    )
+    sub = parser.add_subparsers(dest="subcomando", required=True)
+    
+    p = sub.add_parser("list", help="Lista os comandos do catálogo")
+    p.add_argument("--categoria", help="Apenas comandos desta categoria")
+    p.add_argument("--json", action="store_true", help="Saída em JSON")
+    p.set_defaults(func=cmd_list)
+    
+    p = sub.add_parser("search", help="Busca comandos por nome, comando, categoria ou descrição")
+    p.add_argument("consulta", nargs="+", help="Texto da busca")
+    p.add_argument("--limite", type=int, default=20, help="Máximo de resultados (padrão: 20)")
+    p.add_argument("--json", action="store_true", help="Saída em JSON")
+    p.set_defaults(func=cmd_search)
+    
+    p = sub.add_parser("run", help="Executa um comando do catálogo pela key")
+    p.add_argument("key", help="Key do comando (ex.: 6)")
+    p.add_argument("--timeout", type=float, help="Tempo limite em segundos (0 = sem limite)")
+    p.add_argument("--sim", action="store_true", help="Confirma comandos críticos sem perguntar")
+    p.add_argument("--metricas", action="store_true", help="Mostra as métricas da execução no stderr")
+    p.set_defaults(func=cmd_run)
+    
+    p = sub.add_parser("runbook", help="Lista os runbooks ou executa um pela key")
+    p.add_argument("key", nargs="?", help="Key do runbook (ex.: RB1); sem key, lista os runbooks")
+    p.add_argument("--sim", action="store_true", help="Confirma comandos críticos sem perguntar")
+    p.set_defaults(func=cmd_runbook)
+    
+    p = sub.add_parser("fanout", help="Executa um comando do catálogo em vários alvos")
+    p.add_argument("key", help="Key do comando (ex.: R4)")
+    p.add_argument("--alvos", nargs="+", default=[], metavar="ALVO",
+                   help="local, host:porta ou nome=host:porta de um agente")
+    p.add_argument("--loopback", type=int, default=0, metavar="N",
+                   help="Inicia N agentes locais em 127.0.0.1 como alvos")
+    p.add_argument("--paralelismo", type=int, default=16, help="Alvos executando ao mesmo tempo (padrão: 16)")
+    p.add_argument("--timeout", type=float, help="Tempo limite por alvo em segundos (0 = sem limite)")
+    p.add_argument("--parar-em-falha", action="store_true", help="Cancela os alvos restantes na primeira falha")
+    p.add_argument("--sim", action="store_true", help="Confirma comandos críticos sem perguntar")
+    p.set_defaults(func=cmd_fanout)
+    
+    p = sub.add_parser("history", help="Mostra o histórico de execuções")
+    p.add_argument("--limite", type=int, default=50, help="Máximo de entradas (padrão: 50)")
+    p.add_argument("--comando", help="Apenas execuções desta key")
+    p.add_argument("--falhas", action="store_true", help="Apenas execuções com falha")
+    p.add_argument("--desde", help="Data/hora mínima (AAAA-MM-DD [HH:MM:SS])")
+    p.add_argument("--ate", help="Data/hora máxima (AAAA-MM-DD [HH:MM:SS])")
+    p.add_argument("--json", action="store_true", help="Saída em JSON")
+    p.set_defaults(func=cmd_history)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Ponto de entrada da CLI; retorna o código de saída."""
+    args = criar_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
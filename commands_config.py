@@ -1,10 +1,120 @@
-from typing import List
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 from models import Command
-from commands_windows import get_windows_commands
+from catalog_cache import CommandCatalog, fontes_padrao, obter_catalogo
+from catalog_loader import CATALOGS_DIR, combinar_catalogos, ler_catalogos
+
+
+# Intervalo padrão entre verificações dos arquivos de catálogo (segundos)
+CATALOG_POLL_INTERVAL = 2.0
 
 
 def get_all_commands() -> List[Command]:
     """
-    Retorna a lista de comandos do Windows.
+    Retorna a lista de comandos da plataforma atual (Windows ou Linux).
+    """
+    return list(obter_catalogo().comandos)
+
+
+@dataclass
+class CatalogDiff:
+    """Diferenças aplicadas ao catálogo em uma recarga."""
+    adicionados: List[Command] = field(default_factory=list)
+    removidos: List[Command] = field(default_factory=list)
+    alterados: List[Command] = field(default_factory=list)
+    avisos: List[str] = field(default_factory=list)
+
+    @property
+    def vazio(self) -> bool:
+        return not (self.adicionados or self.removidos or self.alterados)
+
+
+class CatalogWatcher:
+    """
+    Recarrega os catálogos quando seus arquivos mudam.
+
+    verificar() compara mtime e tamanho dos arquivos (incluindo arquivos
+    novos ou removidos em catalogs/); só os arquivos alterados são relidos.
+    As diferenças são aplicadas no próprio CommandCatalog: a lista de
+    comandos, o mapa por key e o índice de busca são atualizados entrada
+    a entrada, sem reconstrução.
     """
-    return get_windows_commands()
+
+    def __init__(self, catalogo: CommandCatalog, diretorio: str = CATALOGS_DIR):
+        self.catalogo = catalogo
+        self.diretorio = diretorio
+        self._estados = self._ler_estados()
+        # Resultado da leitura de cada arquivo; preenchido na primeira mudança
+        self._por_arquivo: Optional[Dict[str, Tuple[List[Command], List[str]]]] = None
+
+    def _ler_estados(self) -> Dict[str, tuple]:
+        """(mtime, tamanho) de cada arquivo de catálogo, em ordem de precedência."""
+        estados = {}
+        for caminho in fontes_padrao(self.diretorio):
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                continue  # removido entre a listagem e o stat
+            estados[os.path.abspath(caminho)] = (info.st_mtime_ns, info.st_size)
+        return estados
+
+    def verificar(self) -> CatalogDiff:
+        """
+        Verifica os arquivos e aplica as mudanças encontradas.
+
+        Returns:
+            Diferenças aplicadas (vazio se nada mudou)
+        """
+        estados = self._ler_estados()
+        if estados == self._estados:
+            return CatalogDiff()
+
+        anteriores = self._por_arquivo or {}
+        if self._por_arquivo is None:
+            relidos = list(estados)
+        else:
+            relidos = [c for c, estado in estados.items() if self._estados.get(c) != estado]
+        lidos = dict(zip(relidos, ler_catalogos(relidos)))
+
+        self._estados = estados
+        self._por_arquivo = {c: lidos[c] if c in lidos else anteriores[c] for c in estados}
+
+        caminhos = list(estados)
+        comandos, avisos = combinar_catalogos(caminhos, [self._por_arquivo[c] for c in caminhos])
+        return self._aplicar(comandos, avisos)
+
+    def _aplicar(self, comandos: List[Command], avisos: List[str]) -> CatalogDiff:
+        """Aplica ao catálogo em memória a diferença para a nova lista."""
+        catalogo = self.catalogo
+        novos = {cmd.key: cmd for cmd in comandos}
+
+        diff = CatalogDiff(avisos=[a for a in avisos if a not in catalogo.avisos])
+        for key, cmd in catalogo.por_key.items():
+            novo = novos.get(key)
+            if novo is None:
+                diff.removidos.append(cmd)
+            elif novo != cmd:
+                diff.alterados.append(novo)
+        diff.adicionados = [cmd for cmd in comandos if cmd.key not in catalogo.por_key]
+        catalogo.avisos[:] = avisos
+
+        if diff.vazio:
+            return diff
+
+        removidos = {cmd.key for cmd in diff.removidos}
+        alterados = {cmd.key: cmd for cmd in diff.alterados}
+        catalogo.comandos[:] = [
+            alterados.get(cmd.key, cmd)
+            for cmd in catalogo.comandos
+            if cmd.key not in removidos
+        ] + diff.adicionados
+
+        for cmd in diff.removidos:
+            del catalogo.por_key[cmd.key]
+            catalogo.indice.remover(cmd.key)
+        for cmd in diff.alterados + diff.adicionados:
+            catalogo.por_key[cmd.key] = cmd
+            catalogo.indice.adicionar(cmd)
+
+        return diff
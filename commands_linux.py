@@ -0,0 +1,18 @@
+import os
+from typing import List
+from models import Command
+from catalog_loader import ler_catalogo
+
+
+# Catálogo de comandos do Linux (usado em Linux e outros sistemas POSIX)
+LINUX_CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "commands_linux.json")
+
+
+def get_linux_commands() -> List[Command]:
+    """
+    Retorna comandos específicos do Linux.
+    """
+    comandos, erros = ler_catalogo(LINUX_CATALOG_FILE)
+    for erro in erros:
+        print(f"Erro no catálogo: {erro}")
+    return comandos
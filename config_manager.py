@@ -1,12 +1,19 @@
 import json
 import os
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from models import CommandHistoryEntry
+from history_store import criar_history_store
+
 
 CONFIG_FILE = "app_config.json"
-HISTORY_FILE = "command_history.json"
+HISTORY_FILE = "command_history.json"  # Formato antigo, migrado para o diário
+
+# Período sem alterações após o qual a configuração é gravada (segundos)
+CONFIG_FLUSH_DELAY = 0.5
 
 
 @dataclass
@@ -19,29 +26,54 @@ class AppConfig:
     favorites: List[str] = None
     window_width: int = 1200
     window_height: int = 800
+    max_concurrent_commands: int = 4
+    command_timeout: float = 300.0  # segundos; 0 desativa o limite
+    history_retention: int = 500
+    history_fsync: str = "lote"  # "sempre", "lote" ou "nunca"
+    history_backend: str = "journal"  # "journal" ou "sqlite"
+    history_max_rows: int = 0  # limite do backend SQLite; 0 = ilimitado
+    console_scrollback_lines: int = 10000  # 0 = ilimitado
+    console_spill_to_file: bool = False
+    catalog_reload_interval: float = 2.0  # segundos; 0 desativa a recarga automática
+    result_cache_max_bytes: int = 4 * 1024 * 1024  # 0 desativa o cache de resultados
     
     def __post_init__(self):
         if self.favorites is None:
             self.favorites = []
 
 
-@dataclass
-class CommandHistoryEntry:
-    """Entrada no histórico de comandos."""
-    timestamp: str
-    command_key: str
-    command_name: str
-    command_text: str
-    success: bool
-    is_free_command: bool = False
-
-
 class ConfigManager:
     """Gerencia configurações e histórico da aplicação."""
     
     def __init__(self):
         self.config = self.carregar_config()
-        self.history: List[CommandHistoryEntry] = self.carregar_historico()
+        self._config_lock = threading.Lock()
+        self._config_timer: Optional[threading.Timer] = None
+        # Cópia de self.config tirada por salvar_config, gravada pelo timer
+        self._config_snapshot: Optional[dict] = None
+        self.history_store = criar_history_store(
+            self.config.history_backend,
+            retencao=self.config.history_retention,
+            fsync=self.config.history_fsync,
+            max_linhas=self.config.history_max_rows,
+            arquivo_legado=HISTORY_FILE,
+        )
+        # O histórico só é lido do disco no primeiro acesso
+        self._history: Optional[List[CommandHistoryEntry]] = None
+        self._history_lock = threading.Lock()
+    
+    @property
+    def history(self) -> List[CommandHistoryEntry]:
+        """Entradas recentes do histórico (carregadas no primeiro acesso)."""
+        with self._history_lock:
+            if self._history is None:
+                self._history = self.carregar_historico()
+            return self._history
+    
+    @history.setter
+    def history(self, entradas: List[CommandHistoryEntry]) -> None:
+        with self._history_lock:
+            self._history = entradas
     
     def carregar_config(self) -> AppConfig:
         """Carrega configurações do arquivo JSON."""
@@ -56,10 +88,56 @@ class ConfigManager:
         return AppConfig()
     
     def salvar_config(self) -> None:
-        """Salva configurações no arquivo JSON."""
+        """
+        Marca as configurações como alteradas e agenda a gravação.
+        
+        Alterações seguidas são agrupadas: o arquivo só é gravado (numa
+        thread de fundo) após CONFIG_FLUSH_DELAY segundos sem novas
+        alterações. A thread de fundo grava uma cópia tirada aqui, na
+        thread que alterou self.config. Use salvar_config_agora() para
+        gravar imediatamente.
+        """
+        with self._config_lock:
+            self._config_snapshot = asdict(self.config)
+            if self._config_timer is not None:
+                self._config_timer.cancel()
+            timer = threading.Timer(CONFIG_FLUSH_DELAY, lambda: self._gravar_agendada(timer))
+            timer.daemon = True
+            self._config_timer = timer
+            timer.start()
+    
+    def salvar_config_agora(self) -> None:
+        """
+        Grava as configurações de forma atômica (arquivo temporário + rename),
+        cancelando qualquer gravação agendada.
+        """
+        with self._config_lock:
+            if self._config_timer is not None:
+                self._config_timer.cancel()
+                self._config_timer = None
+            self._config_snapshot = None
+            self._gravar_config(asdict(self.config))
+    
+    def _gravar_agendada(self, timer: threading.Timer) -> None:
+        """Grava a cópia agendada por salvar_config (thread do timer)."""
+        with self._config_lock:
+            # Um timer substituído ou cancelado não grava
+            if timer is not self._config_timer:
+                return
+            self._config_timer = None
+            dados, self._config_snapshot = self._config_snapshot, None
+            if dados is not None:
+                self._gravar_config(dados)
+    
+    def _gravar_config(self, dados: dict) -> None:
+        """Grava o arquivo de configurações (chamado com _config_lock)."""
+        temporario = CONFIG_FILE + ".tmp"
         try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(asdict(self.config), f, indent=4, ensure_ascii=False)
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, CONFIG_FILE)
         except Exception as e:
             print(f"Erro ao salvar configurações: {e}")
     
@@ -67,34 +145,62 @@ class ConfigManager:
         """Alias para salvar_config (compatibilidade)."""
         self.salvar_config()
     
+    @property
+    def config_pendente(self) -> bool:
+        """Indica se há alterações de configuração ainda não gravadas."""
+        with self._config_lock:
+            return self._config_timer is not None
+    
     def carregar_historico(self) -> List[CommandHistoryEntry]:
-        """Carrega histórico de comandos do arquivo JSON."""
-        if os.path.exists(HISTORY_FILE):
-            try:
-                with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return [CommandHistoryEntry(**entry) for entry in data]
-            except Exception as e:
-                print(f"Erro ao carregar histórico: {e}")
+        """Carrega as entradas mais recentes do histórico."""
+        try:
+            return self.history_store.carregar()
+        except Exception as e:
+            print(f"Erro ao carregar histórico: {e}")
         
         return []
     
     def salvar_historico(self) -> None:
-        """Salva histórico de comandos no arquivo JSON."""
+        """Sincroniza o armazenamento com o histórico em memória (compactação)."""
         try:
-            # Limitar histórico a últimas 500 entradas
-            historico_limitado = self.history[-500:]
-            
-            with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(
-                    [asdict(entry) for entry in historico_limitado],
-                    f,
-                    indent=4,
-                    ensure_ascii=False
-                )
+            # Limitar histórico às últimas entradas da retenção
+            self.history = self.history[-self.config.history_retention:]
+            if self.history:
+                self.history_store.compactar(self.history)
+            else:
+                self.history_store.limpar()
         except Exception as e:
             print(f"Erro ao salvar histórico: {e}")
     
+    def consultar_historico(
+        self,
+        inicio: Optional[str] = None,
+        fim: Optional[str] = None,
+        command_key: Optional[str] = None,
+        somente_falhas: bool = False,
+        limite: int = 100,
+        offset: int = 0,
+    ) -> List[CommandHistoryEntry]:
+        """
+        Consulta o histórico persistido, do mais recente para o mais antigo.
+        
+        Args:
+            inicio: Data/hora mínima ("AAAA-MM-DD HH:MM:SS")
+            fim: Data/hora máxima
+            command_key: Apenas execuções deste comando
+            somente_falhas: Apenas execuções com falha
+            limite: Tamanho da página
+            offset: Entradas a pular (paginação)
+        """
+        return self.history_store.consultar(
+            inicio=inicio,
+            fim=fim,
+            command_key=command_key,
+            somente_falhas=somente_falhas,
+            limite=limite,
+            offset=offset,
+        )
+    
     def adicionar_ao_historico(
         self,
         command_key: str,
@@ -112,8 +218,21 @@ class ConfigManager:
             success=success,
             is_free_command=is_free_command
         )
-        self.history.append(entry)
-        self.salvar_historico()
+        historico = self.history
+        historico.append(entry)
+        # Em memória ficam só as entradas da retenção; as demais são lidas
+        # do armazenamento sob demanda (consultar_historico)
+        excedente = len(historico) - self.config.history_retention
+        if self.config.history_retention > 0 and excedente > 0:
+            del historico[:excedente]
+        
+        try:
+            self.history_store.anexar(entry)
+        except Exception as e:
+            print(f"Erro ao registrar histórico: {e}")
+        
+        if self.history_store.precisa_compactar():
+            self.salvar_historico()
     
     def adicionar_favorito(self, command_key: str) -> None:
         """Adiciona um comando aos favoritos."""
@@ -139,7 +258,7 @@ class ConfigManager:
                 f.write("HISTÓRICO DE COMANDOS - HELP COMMANDS\n")
                 f.write("=" * 80 + "\n\n")
                 
-                for entry in self.history:
+                for entry in self.history_store.iterar():
                     f.write(f"Data/Hora: {entry.timestamp}\n")
                     f.write(f"Comando: [{entry.command_key}] {entry.command_name}\n")
                     f.write(f"Comando executado: {entry.command_text}\n")
@@ -179,3 +298,9 @@ class ConfigManager:
         """Limpa todo o histórico."""
         self.history = []
         self.salvar_historico()
+    
+    def fechar(self) -> None:
+        """Grava alterações pendentes e libera recursos persistentes."""
+        if self.config_pendente:
+            self.salvar_config_agora()
+        self.history_store.fechar()
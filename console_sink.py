@@ -0,0 +1,257 @@
+"""
+Destino de saída do console seguro para uso a partir de outras threads.
+
+As threads de execução apenas enfileiram texto; o loop do Tk drena a fila
+periodicamente (root.after) e grava tudo o que chegou numa única inserção
+no widget, de modo que milhares de linhas por segundo não congelam a UI.
+A fila é limitada: se o Tk não acompanhar, o texto excedente é descartado
+e contado, e um aviso com a quantidade perdida aparece no console.
+
+O widget guarda apenas as últimas linhas (ConsoleScrollback); a saída
+completa pode ser copiada para um arquivo rotativo (ConsoleSpill).
+"""
+import os
+import queue
+import subprocess
+import sys
+import threading
+from typing import Callable, List, Optional
+
+
+# Intervalo entre drenagens da fila (ms)
+INTERVALO_DRENAGEM_MS = 50
+
+# Máximo de caracteres gravados no widget por drenagem; o excedente fica
+# para o próximo ciclo, limitando o tempo gasto no loop do Tk
+MAX_CARACTERES_POR_CICLO = 256 * 1024
+
+# Máximo de caracteres aguardando na fila; o excedente é descartado
+MAX_CARACTERES_PENDENTES = 4 * 1024 * 1024
+
+# Linhas mantidas no widget do console; 0 desativa o limite
+SCROLLBACK_PADRAO = 10000
+
+# Arquivo com a saída completa do console e sua rotação
+CONSOLE_SPILL_FILE = "console_output.log"
+SPILL_MAX_BYTES = 5 * 1024 * 1024
+SPILL_BACKUPS = 3
+
+
+class ConsoleSink:
+    """
+    Fila thread-safe de saída para um console Tk, gravada em lotes.
+
+    Chamar a instância (ou escrever()) de qualquer thread enfileira o
+    texto; agendar() enfileira um callback para rodar no loop do Tk na
+    mesma ordem da saída. Texto além de max_pendentes caracteres é
+    descartado (contado em `descartados`); callbacks nunca são descartados.
+    """
+
+    def __init__(
+        self,
+        root,
+        escrever: Callable[[str], None],
+        intervalo_ms: int = INTERVALO_DRENAGEM_MS,
+        max_caracteres: int = MAX_CARACTERES_POR_CICLO,
+        max_pendentes: int = MAX_CARACTERES_PENDENTES,
+    ):
+        self.root = root
+        self._escrever = escrever
+        self.intervalo_ms = intervalo_ms
+        self.max_caracteres = max_caracteres
+        self.max_pendentes = max_pendentes
+        # Caracteres descartados com a fila cheia (total e ainda não avisados)
+        self.descartados = 0
+        self._nao_informados = 0
+
+        self._fila: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._pendentes = 0
+        self._lock = threading.Lock()
+        self._sobra = ""
+        self._after_id: Optional[str] = None
+
+    def __call__(self, texto: str) -> None:
+        self.escrever(texto)
+
+    def escrever(self, texto: str) -> None:
+        """Enfileira texto para o console (seguro em qualquer thread)."""
+        if not texto:
+            return
+        with self._lock:
+            if self._pendentes + len(texto) > self.max_pendentes:
+                self.descartados += len(texto)
+                self._nao_informados += len(texto)
+                return
+            if self._nao_informados:
+                aviso = self._aviso_descarte()
+                self._pendentes += len(aviso)
+                self._fila.put(aviso)
+            self._pendentes += len(texto)
+            self._fila.put(texto)
+
+    def _aviso_descarte(self) -> str:
+        """Texto do aviso de saída descartada (chamado com _lock)."""
+        perdidos, self._nao_informados = self._nao_informados, 0
+        return f"\n[... {perdidos} caractere(s) de saída descartado(s): console sobrecarregado]\n"
+
+    def agendar(self, callback: Callable[[], None]) -> None:
+        """Enfileira um callback para rodar no loop do Tk (seguro em qualquer thread)."""
+        self._fila.put(callback)
+
+    def iniciar(self) -> None:
+        """Começa a drenar a fila periodicamente."""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.intervalo_ms, self._drenar)
+
+    def parar(self) -> None:
+        """Interrompe a drenagem periódica."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _drenar(self) -> None:
+        """Grava o texto pendente de uma vez e executa os callbacks na ordem."""
+        partes: List[str] = [self._sobra] if self._sobra else []
+        tamanho = len(self._sobra)
+        self._sobra = ""
+
+        try:
+            while tamanho < self.max_caracteres:
+                try:
+                    item = self._fila.get_nowait()
+                except queue.Empty:
+                    # Descarte sem texto aceito depois: avisar agora
+                    with self._lock:
+                        if self._nao_informados:
+                            partes.append(self._aviso_descarte())
+                    break
+
+                if callable(item):
+                    self._gravar(partes)
+                    partes, tamanho = [], 0
+                    item()
+                else:
+                    with self._lock:
+                        self._pendentes -= len(item)
+                    partes.append(item)
+                    tamanho += len(item)
+
+            texto = "".join(partes)
+            if len(texto) > self.max_caracteres:
+                texto, self._sobra = texto[:self.max_caracteres], texto[self.max_caracteres:]
+            self._gravar([texto])
+        finally:
+            self._after_id = self.root.after(self.intervalo_ms, self._drenar)
+
+    def _gravar(self, partes: List[str]) -> None:
+        """Grava as partes acumuladas numa única escrita no widget."""
+        texto = "".join(partes)
+        if texto:
+            self._escrever(texto)
+
+
+class ConsoleSpill:
+    """Cópia da saída do console em arquivo, rotacionado por tamanho."""
+
+    def __init__(
+        self,
+        caminho: str = CONSOLE_SPILL_FILE,
+        max_bytes: int = SPILL_MAX_BYTES,
+        backups: int = SPILL_BACKUPS,
+    ):
+        self.caminho = caminho
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._arquivo = None
+        self._tamanho = 0
+
+    def escrever(self, texto: str) -> None:
+        """Anexa texto ao arquivo, rotacionando-o ao passar de max_bytes."""
+        try:
+            if self._arquivo is None:
+                self._arquivo = open(self.caminho, "a", encoding="utf-8")
+                self._tamanho = self._arquivo.tell()
+            self._arquivo.write(texto)
+            self._tamanho += len(texto.encode("utf-8"))
+            if self._tamanho >= self.max_bytes:
+                self._rotacionar()
+        except Exception as e:
+            print(f"Erro ao gravar saída do console: {e}")
+
+    def descarregar(self) -> None:
+        """Grava em disco o que ainda está no buffer do arquivo."""
+        if self._arquivo is not None:
+            self._arquivo.flush()
+
+    def fechar(self) -> None:
+        """Fecha o arquivo."""
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def _rotacionar(self) -> None:
+        """console_output.log -> .1 -> .2 ...; descarta o mais antigo."""
+        self.fechar()
+        for i in range(self.backups - 1, 0, -1):
+            origem = f"{self.caminho}.{i}"
+            if os.path.exists(origem):
+                os.replace(origem, f"{self.caminho}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.caminho, f"{self.caminho}.1")
+        else:
+            os.remove(self.caminho)
+        self._tamanho = 0
+
+
+class ConsoleScrollback:
+    """
+    Limite de linhas do console, aplicado em blocos.
+
+    O widget funciona como um buffer circular: registrar() conta as linhas
+    gravadas e, quando o total passa do limite mais uma folga, informa
+    quantas linhas antigas remover de uma vez. Remover em blocos evita um
+    delete no widget a cada gravação.
+    """
+
+    def __init__(self, max_linhas: int = SCROLLBACK_PADRAO, spill: Optional[ConsoleSpill] = None):
+        self.max_linhas = max_linhas
+        self.folga = max(max_linhas // 10, 100)
+        self.spill = spill
+        self.linhas = 0
+
+    def registrar(self, texto: str) -> int:
+        """
+        Contabiliza texto gravado no widget.
+
+        Returns:
+            Quantidade de linhas a remover do início do widget (0 se nenhuma).
+        """
+        if self.spill is not None:
+            self.spill.escrever(texto)
+
+        self.linhas += texto.count("\n")
+        if not self.max_linhas or self.linhas <= self.max_linhas + self.folga:
+            return 0
+
+        excedente = self.linhas - self.max_linhas
+        self.linhas = self.max_linhas
+        return excedente
+
+    def limpar(self, linhas: int = 0) -> None:
+        """Reinicia a contagem após o console ser limpo."""
+        self.linhas = linhas
+
+    def fechar(self) -> None:
+        """Fecha o arquivo de saída, se houver."""
+        if self.spill is not None:
+            self.spill.fechar()
+
+
+def abrir_arquivo(caminho: str) -> None:
+    """Abre um arquivo no aplicativo padrão do sistema."""
+    if sys.platform == "win32":
+        os.startfile(caminho)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", caminho])
+    else:
+        subprocess.Popen(["xdg-open", caminho])
@@ -1,22 +1,33 @@
+import codecs
+import io
+import locale
 import logging
+import os
+import signal
 import subprocess
-from typing import Iterable, Dict, Optional, Callable
-import ctypes
+import sys
+import threading
+import time
+from typing import Iterable, Dict, Optional, Callable, Tuple
 from models import Command
+from platform_detector import Platform, obter_plataforma
+from metrics import ExecutionSample, metricas, uso_de_recursos
+from logging_queue import LOG_FILE, configurar_logging
 
 
-LOG_FILE = "mini_terminal_suporte.log"
+# Tamanho máximo de cada bloco lido do processo filho (bytes)
+STREAM_CHUNK_SIZE = 4096
+
+# Destino da saída incremental: recebe cada trecho de texto assim que chega
+SaidaCallback = Callable[[str], None]
 
 
 def configurar_logger() -> None:
     """
-    Configura o logger básico para registrar execuções de comandos.
+    Configura o log de execuções: os registros passam por uma fila e são
+    gravados em JSON Lines por uma thread própria (ver logging_queue).
     """
-    logging.basicConfig(
-        filename=LOG_FILE,
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-    )
+    configurar_logging(LOG_FILE)
 
 
 def indexar_por_key(comandos: Iterable[Command]) -> Dict[str, Command]:
@@ -26,168 +37,378 @@ def indexar_por_key(comandos: Iterable[Command]) -> Dict[str, Command]:
     return {cmd.key.upper(): cmd for cmd in comandos}
 
 
-def executar_com_elevacao_windows(comando: str) -> bool:
+def usuario_eh_admin() -> bool:
+    """Verifica se o processo atual possui privilégios administrativos."""
+    return obter_plataforma().eh_admin()
+
+
+def preparar_elevacao(comando: str, saida: SaidaCallback, plataforma: Optional[Platform] = None) -> Optional[str]:
     """
-    Executa comando com elevação UAC no Windows usando ShellExecuteEx.
+    Resolve a execução de um comando que requer privilégios.
+    
+    Args:
+        comando: Comando a ser executado
+        saida: Destino das mensagens sobre a elevação
+        plataforma: Plataforma usada (padrão: obter_plataforma())
     
     Returns:
-        True se executado com sucesso, False caso contrário.
+        Comando a executar no fluxo normal (elevado em linha, ou o
+        original se a elevação falhou), ou None se a plataforma o
+        executou elevado fora da aplicação (UAC).
+    """
+    plataforma = plataforma or obter_plataforma()
+    if plataforma.eh_admin():
+        return comando
+    
+    saida("⚠️  Este comando requer privilégios administrativos.\n")
+    elevado = plataforma.comando_elevado(comando)
+    if elevado is not None:
+        saida(f"Executando com elevação via {plataforma.elevacao}...\n")
+        logging.info("Comando elevado via %s: %s", plataforma.elevacao, comando)
+        return elevado
+    
+    saida(f"Solicitando elevação via {plataforma.elevacao}...\n")
+    if plataforma.elevar(comando):
+        return None
+    saida("Falha na elevação. Executando sem privilégios...\n")
+    return comando
+
+
+def kwargs_grupo_processos() -> Dict[str, object]:
     """
+    Argumentos de criação que isolam o filho em seu próprio grupo de
+    processos, permitindo encerrar toda a árvore depois.
+    """
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def matar_arvore_processos(pid: int) -> None:
+    """
+    Encerra à força um processo e todos os seus descendentes.
+    
+    No Windows usa `taskkill /T`; nos demais sistemas envia SIGKILL ao
+    grupo criado por kwargs_grupo_processos().
+    """
+    logging.warning("Encerrando árvore de processos (PID %s)", pid)
     try:
-        import ctypes
-        from ctypes import wintypes
-        
-        # Constantes do Windows
-        SEE_MASK_NOCLOSEPROCESS = 0x00000040
-        SW_SHOWNORMAL = 1
-        
-        class SHELLEXECUTEINFO(ctypes.Structure):
-            _fields_ = [
-                ("cbSize", wintypes.DWORD),
-                ("fMask", ctypes.c_ulong),
-                ("hwnd", wintypes.HWND),
-                ("lpVerb", wintypes.LPCWSTR),
-                ("lpFile", wintypes.LPCWSTR),
-                ("lpParameters", wintypes.LPCWSTR),
-                ("lpDirectory", wintypes.LPCWSTR),
-                ("nShow", ctypes.c_int),
-                ("hInstApp", wintypes.HINSTANCE),
-                ("lpIDList", ctypes.c_void_p),
-                ("lpClass", wintypes.LPCWSTR),
-                ("hKeyClass", wintypes.HKEY),
-                ("dwHotKey", wintypes.DWORD),
-                ("hIconOrMonitor", wintypes.HANDLE),
-                ("hProcess", wintypes.HANDLE),
-            ]
-        
-        sei = SHELLEXECUTEINFO()
-        sei.cbSize = ctypes.sizeof(sei)
-        sei.fMask = SEE_MASK_NOCLOSEPROCESS
-        sei.hwnd = None
-        sei.lpVerb = "runas"  # Solicita elevação
-        sei.lpFile = "cmd.exe"
-        sei.lpParameters = f'/c "{comando}"'
-        sei.lpDirectory = None
-        sei.nShow = SW_SHOWNORMAL
-        
-        if not ctypes.windll.shell32.ShellExecuteExW(ctypes.byref(sei)):
-            raise ctypes.WinError()
-        
-        print(f"Comando executado com privilégios administrativos.")
-        logging.info("Comando executado com elevação: %s", comando)
-        return True
+        if os.name == "nt":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(pid)],
+                capture_output=True,
+            )
+        else:
+            os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    except Exception:
+        logging.exception("Falha ao encerrar árvore de processos (PID %s)", pid)
+
+
+def aguardar_processo(processo: subprocess.Popen) -> Tuple[int, Optional[float], Optional[int]]:
+    """
+    Aguarda o fim do processo e mede os recursos que ele usou.
+    
+    Em POSIX recolhe o filho com os.wait4, que informa o tempo de CPU e o
+    pico de memória do processo e dos descendentes que ele aguardou. No
+    Windows apenas aguarda.
+    
+    Returns:
+        (código de retorno, tempo de CPU em segundos, pico de memória em
+        bytes); as medições são None quando indisponíveis.
+    """
+    if os.name == "nt":
+        return processo.wait(), None, None
+    
+    try:
+        _, status, rusage = os.wait4(processo.pid, 0)
+    except ChildProcessError:
+        # Já recolhido por outra espera
+        return processo.wait(), None, None
+    
+    processo.returncode = _codigo_de_saida(status)
+    cpu, rss_pico = uso_de_recursos(rusage)
+    return processo.returncode, cpu, rss_pico
+
+
+def _codigo_de_saida(status: int) -> int:
+    """Código de retorno de um status de wait, como Popen.returncode."""
+    # os.waitstatus_to_exitcode só existe a partir do Python 3.9
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _registrar_fim(key: str, nome: str, amostra: ExecutionSample) -> None:
+    """Registra o fim de uma execução nas métricas e no log estruturado."""
+    metricas.registrar(key, amostra)
+    logging.info(
+        "Execução finalizada: %s", nome,
+        extra={
+            "command_key": key,
+            "duracao": amostra.duracao,
+            "returncode": amostra.returncode,
+            "status": amostra.status,
+        },
+    )
+
+
+def _saida_padrao(texto: str) -> None:
+    """Escreve o trecho no stdout imediatamente (destino padrão)."""
+    sys.stdout.write(texto)
+    sys.stdout.flush()
+
+
+class SaidaPrefixada:
+    """
+    Destino de saída que marca cada linha com um prefixo (ex.: "[R4] "),
+    permitindo intercalar a saída de execuções paralelas.
+    
+    Apenas linhas completas são repassadas: o trecho final sem quebra de
+    linha fica guardado até a próxima escrita ou até descarregar(), assim
+    linhas de execuções diferentes nunca se misturam no destino.
+    """
+    
+    def __init__(self, saida: SaidaCallback, prefixo: str):
+        self._saida = saida
+        self._prefixo = prefixo
+        self._pendente = ""
+        self._lock = threading.Lock()
+    
+    def __call__(self, texto: str) -> None:
+        with self._lock:
+            texto = self._pendente + texto
+            completo, sep, self._pendente = texto.rpartition("\n")
+        if sep:
+            self._saida("".join(f"{self._prefixo}{linha}\n" for linha in completo.split("\n")))
+    
+    def descarregar(self) -> None:
+        """Repassa o trecho final guardado, se houver."""
+        with self._lock:
+            pendente, self._pendente = self._pendente, ""
+        if pendente:
+            self._saida(f"{self._prefixo}{pendente}\n")
+
+
+def prefixar_saida(saida: SaidaCallback, prefixo: str) -> SaidaPrefixada:
+    """
+    Envolve um destino de saída para marcar cada linha com um prefixo.
+    Chame descarregar() no fim da execução para repassar a última linha
+    incompleta.
+    """
+    return SaidaPrefixada(saida, prefixo)
+
+
+def criar_decoder_saida() -> io.IncrementalNewlineDecoder:
+    """
+    Cria um decodificador incremental na codificação do sistema.
+    
+    Trata sequências multibyte e quebras de linha CRLF divididas entre
+    dois blocos lidos, convertendo-as para LF como no modo texto.
+    """
+    decoder_cls = codecs.getincrementaldecoder(locale.getpreferredencoding(False))
+    return io.IncrementalNewlineDecoder(decoder_cls(errors="replace"), translate=True)
+
+
+def executar_comando_stream(
+    comando: str,
+    saida: Optional[SaidaCallback] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    timeout: Optional[float] = None,
+    amostra: Optional[ExecutionSample] = None,
+) -> int:
+    """
+    Executa um comando no shell repassando a saída de forma incremental.
+    
+    stdout e stderr são combinados e lidos em blocos de até `chunk_size`
+    bytes; cada bloco decodificado é entregue ao `saida` assim que fica
+    disponível, sem acumular a saída completa em memória.
+    
+    Args:
+        comando: Comando a ser executado
+        saida: Destino de cada trecho de texto (padrão: stdout)
+        chunk_size: Tamanho máximo de cada leitura
+        timeout: Tempo limite em segundos (None ou 0 para sem limite)
+        amostra: Se informada, recebe as medições da execução
+    
+    Returns:
+        Código de retorno do processo.
+    
+    Raises:
+        subprocess.TimeoutExpired: se o tempo limite estourar; a árvore de
+            processos do comando é encerrada antes.
+    """
+    sink = saida or _saida_padrao
+    amostra = amostra if amostra is not None else ExecutionSample()
+    decoder = criar_decoder_saida()
+    estourou = threading.Event()
+    inicio = time.monotonic()
+    
+    with subprocess.Popen(
+        comando,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        **kwargs_grupo_processos(),
+    ) as processo:
+        amostra.inicio_processo = time.monotonic() - inicio
+        timer = None
+        if timeout:
+            def ao_estourar():
+                estourou.set()
+                matar_arvore_processos(processo.pid)
+            
+            timer = threading.Timer(timeout, ao_estourar)
+            timer.daemon = True
+            timer.start()
         
-    except Exception as e:
-        print(f"Erro ao executar com elevação: {e}")
-        logging.error("Falha na elevação: %s", e)
-        return False
+        try:
+            while True:
+                bloco = processo.stdout.read1(chunk_size)
+                if not bloco:
+                    break
+                if amostra.primeiro_byte is None:
+                    amostra.primeiro_byte = time.monotonic() - inicio
+                amostra.bytes_saida += len(bloco)
+                texto = decoder.decode(bloco)
+                if texto:
+                    sink(texto)
+            
+            resto = decoder.decode(b"", final=True)
+            if resto:
+                sink(resto)
+            
+            amostra.returncode, amostra.cpu, amostra.rss_pico = aguardar_processo(processo)
+        finally:
+            if timer is not None:
+                timer.cancel()
+            amostra.duracao = time.monotonic() - inicio
+    
+    if estourou.is_set():
+        raise subprocess.TimeoutExpired(comando, timeout)
+    
+    return processo.returncode
 
 
-def executar_comando(cmd: Command, confirmacao_callback: Optional[Callable[[Command], bool]] = None) -> None:
+def executar_comando(
+    cmd: Command,
+    confirmacao_callback: Optional[Callable[[Command], bool]] = None,
+    saida: Optional[SaidaCallback] = None,
+    timeout: Optional[float] = None,
+) -> Optional[int]:
     """
     Executa um Command, solicitando elevação se necessário.
     
     Args:
         cmd: Comando a ser executado
         confirmacao_callback: Função opcional que retorna True se usuário confirmar comando crítico
+        saida: Destino da saída incremental do comando (padrão: stdout)
+        timeout: Tempo limite padrão, usado quando cmd.timeout não é definido
+    
+    Returns:
+        Código de retorno do processo, ou None se a execução foi cancelada
+        ou delegada ao UAC.
     """
+    sink = saida or _saida_padrao
+    
     # Verificar se comando crítico precisa de confirmação
     if cmd.is_critical and confirmacao_callback:
         if not confirmacao_callback(cmd):
             print("Execução cancelada pelo usuário.")
             logging.info("Execução cancelada: %s", cmd.name)
-            return
+            return None
     
-    logging.info("Executando comando: %s (%s)", cmd.name, cmd.command)
+    logging.info("Executando comando: %s (%s)", cmd.name, cmd.command, extra={"command_key": cmd.key})
     print(f"\n[EXECUTANDO] {cmd.name} -> {cmd.command}\n")
     
     # Verificar se precisa de privilégios administrativos
-    is_admin = ctypes.windll.shell32.IsUserAnAdmin() != 0
-    
-    if cmd.requires_admin and not is_admin:
-        print(f"⚠️  Este comando requer privilégios administrativos.")
-        print("Solicitando elevação via UAC...")
-        if executar_com_elevacao_windows(cmd.command):
-            return
-        else:
-            print("Falha na elevação. Executando sem privilégios...")
+    comando = cmd.command
+    if cmd.requires_admin:
+        comando = preparar_elevacao(comando, sink)
+        if comando is None:
+            return None
     
     # Execução normal
+    amostra = ExecutionSample()
     try:
-        resultado = subprocess.run(
-            cmd.command,
-            shell=True,
-            text=True,
-            capture_output=True,
-        )
-
-        if resultado.stdout:
-            print("Saída:")
-            print(resultado.stdout)
-
-        if resultado.stderr:
-            print("Erros:")
-            print(resultado.stderr)
-
-        if resultado.returncode != 0:
-            print(f"Código de retorno: {resultado.returncode}")
+        limite = cmd.timeout if cmd.timeout is not None else timeout
+        returncode = executar_comando_stream(comando, sink, timeout=limite, amostra=amostra)
+        amostra.status = "concluido"
+
+        if returncode != 0:
+            sink(f"Código de retorno: {returncode}\n")
             logging.warning(
                 "Comando retornou código %s: %s",
-                resultado.returncode,
+                returncode,
                 cmd.command,
             )
         else:
             logging.info("Comando executado com sucesso: %s", cmd.name)
+        
+        return returncode
 
     except Exception as exc:
-        print(f"Erro ao executar o comando: {exc}")
+        amostra.status = "timeout" if isinstance(exc, subprocess.TimeoutExpired) else "falhou"
+        sink(f"Erro ao executar o comando: {exc}\n")
         logging.exception("Erro ao executar comando: %s", cmd.command)
+        raise
+    
+    finally:
+        _registrar_fim(cmd.key, cmd.name, amostra)
 
 
-def executar_comando_livre(comando_texto: str, requer_admin: bool = False) -> None:
+def executar_comando_livre(
+    comando_texto: str,
+    requer_admin: bool = False,
+    saida: Optional[SaidaCallback] = None,
+    timeout: Optional[float] = None,
+) -> Optional[int]:
     """
     Executa um comando arbitrário digitado pelo operador.
     
     Args:
         comando_texto: Comando a ser executado
         requer_admin: Se True, tenta executar com privilégios elevados
+        saida: Destino da saída incremental do comando (padrão: stdout)
+        timeout: Tempo limite em segundos (None ou 0 para sem limite)
+    
+    Returns:
+        Código de retorno do processo, ou None se delegado ao UAC.
     """
+    sink = saida or _saida_padrao
+    
     logging.info("Executando comando livre: %s", comando_texto)
     print(f"\n[EXECUTANDO LIVRE] {comando_texto}\n")
     
     # Elevação se solicitada
-    is_admin = ctypes.windll.shell32.IsUserAnAdmin() != 0
-    
-    if requer_admin and not is_admin:
-        print(f"⚠️  Executando com privilégios administrativos...")
-        executar_com_elevacao_windows(comando_texto)
-        return
+    comando = comando_texto
+    if requer_admin:
+        comando = preparar_elevacao(comando, sink)
+        if comando is None:
+            return None
     
     # Execução normal
+    amostra = ExecutionSample()
     try:
-        resultado = subprocess.run(
-            comando_texto,
-            shell=True,
-            text=True,
-            capture_output=True,
-        )
-
-        if resultado.stdout:
-            print("Saída:")
-            print(resultado.stdout)
-
-        if resultado.stderr:
-            print("Erros:")
-            print(resultado.stderr)
-
-        if resultado.returncode != 0:
-            print(f"Código de retorno: {resultado.returncode}")
+        returncode = executar_comando_stream(comando, sink, timeout=timeout, amostra=amostra)
+        amostra.status = "concluido"
+
+        if returncode != 0:
+            sink(f"Código de retorno: {returncode}\n")
             logging.warning(
                 "Comando livre retornou código %s: %s",
-                resultado.returncode,
+                returncode,
                 comando_texto,
             )
+        
+        return returncode
 
     except Exception as exc:
-        print(f"Erro ao executar o comando livre: {exc}")
+        amostra.status = "timeout" if isinstance(exc, subprocess.TimeoutExpired) else "falhou"
+        sink(f"Erro ao executar o comando livre: {exc}\n")
         logging.exception("Erro ao executar comando livre: %s", comando_texto)
+        raise
+    
+    finally:
+        _registrar_fim("LIVRE", "Comando Livre", amostra)
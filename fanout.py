@@ -0,0 +1,321 @@
+"""
+Execução de um comando em vários alvos ao mesmo tempo (fan-out).
+
+Cada alvo tem seu transporte (transport.py): a máquina local, um agente
+remoto ou um alvo simulado. As execuções rodam no event loop do
+ExecutionEngine, limitadas a `paralelismo` alvos simultâneos e com tempo
+limite por alvo; a saída de cada alvo é repassada linha a linha com o
+nome do alvo como prefixo, para que as saídas não se misturem.
+
+Comandos com requires_admin só rodam em alvos locais e simulados, elevados
+pelo hook da plataforma (platform_detector); agentes remotos são recusados.
+
+Especificação de alvos (criar_alvo):
+    local                execução local (LocalTransport)
+    host:porta           agente remoto (AgentTransport)
+    nome=host:porta      agente remoto com nome próprio
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from models import Command
+from platform_detector import Platform
+from executor import SaidaCallback, prefixar_saida
+from transport import AgentTransport, LocalTransport, Transport
+from async_executor import (
+    ExecutionEngine,
+    STATUS_CANCELADO,
+    STATUS_CONCLUIDO,
+    STATUS_EXECUTANDO,
+    STATUS_FALHOU,
+    STATUS_PENDENTE,
+    STATUS_TIMEOUT,
+    obter_engine,
+)
+
+
+# Limite padrão de alvos executando ao mesmo tempo
+PARALELISMO_PADRAO = 16
+
+
+@dataclass(frozen=True)
+class Target:
+    """Alvo de execução: um nome para a saída e o transporte que o alcança."""
+    name: str
+    transport: Transport
+
+
+@dataclass
+class TargetResult:
+    """Resultado da execução em um alvo."""
+    alvo: str
+    status: str = STATUS_PENDENTE
+    returncode: Optional[int] = None
+    duracao: Optional[float] = None
+    erro: Optional[str] = None
+
+    @property
+    def sucesso(self) -> bool:
+        return self.status == STATUS_CONCLUIDO and self.returncode == 0
+
+
+def criar_alvo(espec: str) -> Target:
+    """
+    Cria um alvo a partir da especificação ("local", "host:porta" ou
+    "nome=host:porta").
+
+    Raises:
+        ValueError: Especificação inválida
+    """
+    nome, sep, endereco = espec.partition("=")
+    if not sep:
+        nome = endereco = espec
+    if endereco == "local":
+        return Target(nome, LocalTransport())
+
+    host, sep, porta = endereco.rpartition(":")
+    if not sep or not host or not porta.isdigit():
+        raise ValueError(f"alvo inválido: {espec} (use local, host:porta ou nome=host:porta)")
+    return Target(nome, AgentTransport(host, int(porta)))
+
+
+class FanOutRun:
+    """
+    Execução de um comando em vários alvos.
+
+    As tarefas rodam no event loop do motor; `future` é resolvido com a
+    própria FanOutRun quando todos os alvos terminam.
+    """
+
+    def __init__(
+        self,
+        cmd: Command,
+        alvos: Sequence[Target],
+        paralelismo: int = PARALELISMO_PADRAO,
+        timeout: Optional[float] = None,
+        saida: Optional[SaidaCallback] = None,
+        comando: Optional[str] = None,
+        parar_em_falha: bool = False,
+    ):
+        nomes = [alvo.name for alvo in alvos]
+        if len(set(nomes)) != len(nomes):
+            raise ValueError("nomes de alvos repetidos")
+
+        self.cmd = cmd
+        # Texto enviado aos alvos (o comando elevado, se requires_admin)
+        self.comando = comando or cmd.command
+        self.alvos = list(alvos)
+        self.paralelismo = max(1, paralelismo)
+        # Se True, a primeira falha cancela os alvos restantes
+        self.parar_em_falha = parar_em_falha
+        self.timeout = timeout or None
+        self.resultados: Dict[str, TargetResult] = {nome: TargetResult(nome) for nome in nomes}
+        self.future: Future = Future()
+        self.inicio: Optional[float] = None
+        self.fim: Optional[float] = None
+        self.interrompido = False
+
+        self._saida = saida
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tarefas: List["asyncio.Task"] = []
+        self._lock = threading.Lock()
+
+    @property
+    def concluido(self) -> bool:
+        return self.future.done()
+
+    @property
+    def sucesso(self) -> bool:
+        """True se o comando terminou com código 0 em todos os alvos."""
+        return all(r.sucesso for r in self.resultados.values())
+
+    @property
+    def duracao(self) -> Optional[float]:
+        """Tempo total da execução em segundos."""
+        if self.inicio is None:
+            return None
+        return (self.fim or time.monotonic()) - self.inicio
+
+    def resultado(self, timeout: Optional[float] = None) -> "FanOutRun":
+        """Bloqueia até todos os alvos terminarem."""
+        return self.future.result(timeout)
+
+    def cancelar(self) -> None:
+        """Cancela os alvos em execução e os que aguardam vaga."""
+        with self._lock:
+            self.interrompido = True
+            loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._cancelar_no_loop)
+
+    def resumo(self) -> str:
+        """Tabela com o resultado e a duração em cada alvo."""
+        linhas = [f"[{self.cmd.key}] {self.cmd.name} em {len(self.alvos)} alvo(s)"]
+        for r in self.resultados.values():
+            duracao = f"{r.duracao:8.2f} s" if r.duracao is not None else " " * 10
+            codigo = f"código {r.returncode}" if r.returncode is not None else r.erro or ""
+            linhas.append(f"  {'✓' if r.sucesso else '✗'} {r.alvo:<30} {duracao}  {r.status:<10} {codigo}")
+        sucessos = sum(r.sucesso for r in self.resultados.values())
+        total = self.duracao or 0.0
+        linhas.append(f"  Total: {total:.2f} s — {sucessos}/{len(self.alvos)} com sucesso")
+        return "\n".join(linhas)
+
+    async def _executar(self) -> "FanOutRun":
+        """Executa em todos os alvos (thread do loop)."""
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+        self.inicio = time.monotonic()
+
+        vagas = asyncio.Semaphore(self.paralelismo)
+        self._tarefas = [asyncio.ensure_future(self._executar_alvo(alvo, vagas)) for alvo in self.alvos]
+        if self._tarefas:
+            await asyncio.wait(self._tarefas)
+
+        # Tarefas canceladas antes de começar não chegam a registrar o status
+        for r in self.resultados.values():
+            if r.status == STATUS_PENDENTE:
+                r.status = STATUS_CANCELADO
+                self._emitir_status(r)
+
+        self.fim = time.monotonic()
+        return self
+
+    def _cancelar_no_loop(self) -> None:
+        for tarefa in self._tarefas:
+            tarefa.cancel()
+
+    async def _executar_alvo(self, alvo: Target, vagas: asyncio.Semaphore) -> None:
+        """Executa o comando em um alvo e registra o resultado."""
+        r = self.resultados[alvo.name]
+        saida = prefixar_saida(self._emitir, f"[{alvo.name}] ")
+        inicio = None
+
+        try:
+            async with vagas:
+                if self.interrompido:
+                    raise asyncio.CancelledError()
+                r.status = STATUS_EXECUTANDO
+                inicio = time.monotonic()
+                r.returncode = await alvo.transport.executar(self.comando, saida, self.timeout)
+                r.status = STATUS_CONCLUIDO
+        except asyncio.TimeoutError:
+            r.status = STATUS_TIMEOUT
+            r.erro = f"tempo limite de {self.timeout:g}s excedido"
+        except asyncio.CancelledError:
+            r.status = STATUS_CANCELADO
+        except Exception as e:
+            r.status = STATUS_FALHOU
+            r.erro = str(e) or type(e).__name__
+        finally:
+            if inicio is not None:
+                r.duracao = time.monotonic() - inicio
+            saida.descarregar()
+            self._emitir_status(r)
+            if self.parar_em_falha and r.status != STATUS_CANCELADO and not r.sucesso:
+                self._interromper()
+
+    def _interromper(self) -> None:
+        """Cancela os demais alvos após uma falha (thread do loop)."""
+        with self._lock:
+            self.interrompido = True
+        atual = asyncio.current_task()
+        for tarefa in self._tarefas:
+            if tarefa is not atual:
+                tarefa.cancel()
+
+    def _emitir_status(self, r: TargetResult) -> None:
+        duracao = f" ({r.duracao:.2f} s)" if r.duracao is not None else ""
+        detalhe = f": {r.erro}" if r.erro else ""
+        if r.status == STATUS_CONCLUIDO and r.returncode:
+            detalhe = f": código {r.returncode}"
+        self._emitir(f"{'✓' if r.sucesso else '✗'} [{r.alvo}] {r.status}{duracao}{detalhe}\n")
+
+    def _emitir(self, texto: str) -> None:
+        if self._saida is not None:
+            self._saida(texto)
+
+
+def executar_em_alvos(
+    cmd: Command,
+    alvos: Sequence[Target],
+    paralelismo: int = PARALELISMO_PADRAO,
+    timeout: Optional[float] = None,
+    saida: Optional[SaidaCallback] = None,
+    engine: Optional[ExecutionEngine] = None,
+    parar_em_falha: bool = False,
+) -> FanOutRun:
+    """
+    Inicia a execução de um comando em vários alvos.
+
+    Args:
+        cmd: Comando a executar
+        alvos: Alvos (nomes únicos)
+        paralelismo: Máximo de alvos executando ao mesmo tempo
+        timeout: Tempo limite por alvo (padrão: o do Command ou o do motor)
+        saida: Destino da saída; cada linha recebe o nome do alvo como prefixo
+        engine: Motor cujo event loop executa as tarefas (padrão: o global)
+        parar_em_falha: Cancela os alvos restantes na primeira falha
+            (código diferente de 0, tempo limite ou erro)
+
+    Returns:
+        FanOutRun para acompanhar ou aguardar a execução.
+
+    Raises:
+        ValueError: Nomes de alvos repetidos, ou comando que requer
+            privilégios sem como elevá-lo em algum alvo
+    """
+    engine = engine or obter_engine()
+    if timeout is None:
+        timeout = cmd.timeout if cmd.timeout is not None else engine.timeout_padrao
+
+    comando = cmd.command
+    if cmd.requires_admin:
+        comando = comando_elevado(cmd, alvos, engine.plataforma)
+        if saida is not None and comando != cmd.command:
+            saida(f"⚠️  Comando administrativo: executando com elevação via {engine.plataforma.elevacao}.\n")
+
+    execucao = FanOutRun(cmd, alvos, paralelismo, timeout, saida, comando, parar_em_falha)
+    engine.executar_no_loop(execucao._executar()).add_done_callback(
+        lambda f: _resolver(execucao, f)
+    )
+    return execucao
+
+
+def comando_elevado(cmd: Command, alvos: Sequence[Target], plataforma: Platform) -> str:
+    """
+    Texto a enviar aos alvos para um comando com requires_admin.
+
+    Raises:
+        ValueError: Há agentes remotos entre os alvos (a elevação não os
+            alcança) ou a plataforma só eleva fora da aplicação (UAC)
+    """
+    remotos = [alvo.name for alvo in alvos if isinstance(alvo.transport, AgentTransport)]
+    if remotos:
+        raise ValueError(
+            f"'{cmd.name}' requer privilégios administrativos e não pode ser executado "
+            f"em agentes remotos: {', '.join(remotos)}"
+        )
+    if plataforma.eh_admin():
+        return cmd.command
+
+    elevado = plataforma.comando_elevado(cmd.command)
+    if elevado is None:
+        raise ValueError(
+            f"'{cmd.name}' requer privilégios administrativos; execute a aplicação como "
+            f"administrador para usá-lo em vários alvos ({plataforma.elevacao} não eleva em linha)"
+        )
+    return elevado
+
+
+def _resolver(execucao: FanOutRun, tarefa: Future) -> None:
+    """Repassa o fim (ou erro inesperado) da tarefa para o future da execução."""
+    if tarefa.cancelled():
+        execucao.future.cancel()
+    elif tarefa.exception() is not None:
+        execucao.future.set_exception(tarefa.exception())
+    else:
+        execucao.future.set_result(execucao)
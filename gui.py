@@ -1,16 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 from typing import List, Dict, Optional
-import threading
 from datetime import datetime
 
 from models import Command
-from commands_config import get_all_commands
-from executor import executar_comando, executar_comando_livre, configurar_logger, indexar_por_key
+from catalog_cache import obter_catalogo
+from commands_config import CatalogDiff, CatalogWatcher
+from executor import configurar_logger
+from platform_detector import obter_plataforma
+from async_executor import ExecutionHandle, STATUS_CANCELADO, STATUS_TIMEOUT, obter_engine
 from config_manager import ConfigManager
 from help_system import HelpSystem
+from console_sink import ConsoleScrollback, ConsoleSink, ConsoleSpill, abrir_arquivo
+from search import LIMITE_LISTA
 from collections import defaultdict
-import ctypes
 
 
 class HelpCommandsGUI:
@@ -24,16 +27,22 @@ class HelpCommandsGUI:
         self.config_manager = ConfigManager()
         self.help_system = HelpSystem()
         configurar_logger()
-        
-        # Carregar comandos
-        self.comandos = get_all_commands()
-        self.index_comandos = indexar_por_key(self.comandos)
+        self.engine = obter_engine()
+        self.engine.definir_max_concorrencia(self.config_manager.config.max_concurrent_commands)
+        self.engine.definir_timeout_padrao(self.config_manager.config.command_timeout)
+        self.engine.cache.definir_max_bytes(self.config_manager.config.result_cache_max_bytes)
+        
+        # Carregar comandos (do cache compilado quando o catálogo não mudou)
+        self.catalogo = obter_catalogo()
+        self.comandos = self.catalogo.comandos
+        self.index_comandos = self.catalogo.por_key
+        self.search_index = self.catalogo.indice
         self.comandos_filtrados = self.comandos.copy()
         
         # Detectar sistema
-        import platform
-        self.os_version = f"Windows {platform.release()}"
-        self.is_admin = ctypes.windll.shell32.IsUserAnAdmin() != 0
+        self.plataforma = obter_plataforma()
+        self.os_version = self.plataforma.descricao
+        self.is_admin = self.plataforma.eh_admin()
         
         # Variáveis de interface
         self.search_var = tk.StringVar()
@@ -45,6 +54,21 @@ class HelpCommandsGUI:
         self._create_widgets()
         self._apply_theme()
         
+        # Saída das threads de execução chega ao console em lotes; o console
+        # guarda só as últimas linhas (a saída completa pode ir para arquivo)
+        self.console_scrollback = ConsoleScrollback(
+            self.config_manager.config.console_scrollback_lines,
+            ConsoleSpill() if self.config_manager.config.console_spill_to_file else None
+        )
+        self.console_sink = ConsoleSink(self.root, self._write_console)
+        self.console_sink.iniciar()
+        self.report_catalog_warnings()
+        
+        # Recarregar catálogos alterados sem reiniciar
+        self.catalog_watcher = CatalogWatcher(self.catalogo)
+        if self.config_manager.config.catalog_reload_interval > 0:
+            self.root.after(int(self.config_manager.config.catalog_reload_interval * 1000), self._poll_catalogs)
+        
         # Atualizar lista inicial
         self.update_command_list()
     
@@ -142,7 +166,7 @@ class HelpCommandsGUI:
         
         self.category_var = tk.StringVar(value="Todas")
         categorias = ["Todas"] + sorted(set(cmd.category for cmd in self.comandos))
-        category_combo = ttk.Combobox(
+        self.category_combo = ttk.Combobox(
             filter_frame,
             textvariable=self.category_var,
             values=categorias,
@@ -150,8 +174,8 @@ class HelpCommandsGUI:
             font=("Segoe UI", 9),
             width=20
         )
-        category_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        category_combo.bind("<<ComboboxSelected>>", lambda e: self.update_command_list())
+        self.category_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.category_combo.bind("<<ComboboxSelected>>", lambda e: self.update_command_list())
         
         # Lista de comandos
         list_frame = tk.Frame(left_panel)
@@ -215,6 +239,17 @@ class HelpCommandsGUI:
         )
         self.btn_execute.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         
+        self.btn_execute_fresh = tk.Button(
+            action_frame,
+            text="🔄 Sem Cache",
+            command=lambda: self.executar_comando_selecionado(fresco=True),
+            font=("Segoe UI", 10),
+            height=2,
+            state=tk.DISABLED,
+            width=12
+        )
+        self.btn_execute_fresh.pack(side=tk.LEFT, padx=5)
+        
         self.btn_favorite = tk.Button(
             action_frame,
             text="⭐ Favorito",
@@ -233,6 +268,13 @@ class HelpCommandsGUI:
         console_toolbar = tk.Frame(console_tab)
         console_toolbar.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
         
+        tk.Button(
+            console_toolbar,
+            text="⏹️ Parar",
+            command=self.stop_execution,
+            font=("Segoe UI", 9)
+        ).pack(side=tk.LEFT, padx=5)
+        
         tk.Button(
             console_toolbar,
             text="🗑️ Limpar Console",
@@ -240,6 +282,13 @@ class HelpCommandsGUI:
             font=("Segoe UI", 9)
         ).pack(side=tk.LEFT, padx=5)
         
+        tk.Button(
+            console_toolbar,
+            text="📄 Abrir Log",
+            command=self.open_console_log,
+            font=("Segoe UI", 9)
+        ).pack(side=tk.LEFT, padx=5)
+        
         self.console_text = scrolledtext.ScrolledText(
             console_tab,
             font=("Consolas", 9),
@@ -432,23 +481,15 @@ class HelpCommandsGUI:
     
     def update_command_list(self, filter_text: str = ""):
         """Atualiza a lista de comandos baseado nos filtros."""
-        # Filtrar por categoria
+        # Filtrar por categoria e busca usando o índice
         categoria_selecionada = self.category_var.get()
-        if categoria_selecionada == "Todas":
-            comandos = self.comandos.copy()
-        else:
-            comandos = [cmd for cmd in self.comandos if cmd.category == categoria_selecionada]
-        
-        # Filtrar por busca
-        if filter_text:
-            filter_lower = filter_text.lower()
-            comandos = [
-                cmd for cmd in comandos
-                if (filter_lower in cmd.name.lower() or
-                    filter_lower in cmd.command.lower() or
-                    filter_lower in cmd.description.lower() or
-                    filter_lower in cmd.category.lower())
-            ]
+        # Uma busca mostra só os melhores resultados; sem busca, o catálogo inteiro
+        comandos = self.search_index.buscar(
+            filter_text,
+            favoritos=self.config_manager.config.favorites,
+            categoria=None if categoria_selecionada == "Todas" else categoria_selecionada,
+            limite=LIMITE_LISTA if filter_text.strip() else None
+        )
         
         self.comandos_filtrados = comandos
         
@@ -479,6 +520,7 @@ class HelpCommandsGUI:
             self.selected_command = self.comandos_filtrados[index]
             self.show_command_details()
             self.btn_execute.config(state=tk.NORMAL)
+            self.btn_execute_fresh.config(state=tk.NORMAL if self.selected_command.cache_ttl else tk.DISABLED)
             self.btn_favorite.config(state=tk.NORMAL)
             self.update_favorite_button()
     
@@ -494,8 +536,13 @@ class HelpCommandsGUI:
         self.details_text.insert(1.0, help_text)
         self.details_text.config(state=tk.DISABLED)
     
-    def executar_comando_selecionado(self):
-        """Executa o comando atualmente selecionado."""
+    def executar_comando_selecionado(self, fresco: bool = False):
+        """
+        Executa o comando atualmente selecionado.
+        
+        Args:
+            fresco: Se True, ignora o resultado em cache e executa de novo
+        """
         if not self.selected_command:
             return
         
@@ -519,7 +566,7 @@ class HelpCommandsGUI:
             messagebox.showinfo(
                 "🔒 Privilégios Administrativos",
                 "Este comando requer privilégios administrativos.\n\n"
-                "Uma solicitação UAC será exibida."
+                f"Uma solicitação de elevação ({self.plataforma.elevacao}) será exibida."
             )
         
         # Log
@@ -531,34 +578,33 @@ class HelpCommandsGUI:
         # Selecionar aba do console
         self.notebook.select(1)
         
-        # Executar em thread separada
-        def execute_thread():
-            try:
-                # Callback para confirmação
-                def confirm_callback(c):
-                    return True  # Já confirmamos acima
-                
-                executar_comando(cmd, confirm_callback)
-                
-                # Adicionar ao histórico
-                self.config_manager.adicionar_ao_historico(
-                    cmd.key,
-                    cmd.name,
-                    cmd.command,
-                    success=True
-                )
-                
-                self.root.after(0, lambda: self.log_to_console(f"\n✅ Comando concluído\n"))
-            except Exception as e:
-                self.root.after(0, lambda: self.log_to_console(f"\n❌ Erro: {e}\n"))
-                self.config_manager.adicionar_ao_historico(
-                    cmd.key,
-                    cmd.name,
-                    cmd.command,
-                    success=False
-                )
-        
-        threading.Thread(target=execute_thread, daemon=True).start()
+        # Submeter ao motor assíncrono
+        handle = self.engine.submeter(cmd, saida=self.console_sink, fresco=fresco)
+        if handle.submissoes > 1:
+            self.log_to_console("⏳ Comando já em execução, acompanhando a execução existente.\n")
+            return
+        handle.ao_concluir(
+            lambda h: self.console_sink.agendar(lambda: self._on_execution_finished(h, is_free_command=False))
+        )
+    
+    def _on_execution_finished(self, handle: ExecutionHandle, is_free_command: bool):
+        """Registra no histórico o resultado de uma execução concluída (thread do Tk)."""
+        # Resultado do cache não é uma nova execução
+        if not handle.do_cache:
+            self.config_manager.adicionar_ao_historico(
+                handle.command_key,
+                handle.nome,
+                handle.comando,
+                success=handle.sucesso,
+                is_free_command=is_free_command
+            )
+        
+        if handle.erro is not None:
+            self.log_to_console(f"\n❌ Erro: {handle.erro}\n")
+        elif handle.do_cache:
+            self.log_to_console("\n♻️ Resultado do cache (use '🔄 Sem Cache' para atualizar)\n")
+        elif handle.status not in (STATUS_CANCELADO, STATUS_TIMEOUT):
+            self.log_to_console(f"\n✅ Comando concluído\n")
     
     def toggle_favorite(self):
         """Adiciona/remove comando dos favoritos."""
@@ -600,14 +646,93 @@ class HelpCommandsGUI:
             self.command_listbox.insert(tk.END, line)
     
     def log_to_console(self, message: str):
-        """Adiciona mensagem ao console."""
+        """Adiciona mensagem ao console (pode ser chamado de qualquer thread)."""
+        self.console_sink.escrever(message)
+    
+    def _write_console(self, message: str):
+        """Grava um lote de texto no console (thread do Tk)."""
         self.console_text.insert(tk.END, message)
-        if self.config_manager.config.auto_scroll:
+        excedente = self.console_scrollback.registrar(message)
+        if excedente:
+            self.console_text.delete("1.0", f"{excedente + 1}.0")
+        if self.config_manager.config.auto_scroll_console:
             self.console_text.see(tk.END)
     
+    def open_console_log(self):
+        """Abre o arquivo com a saída completa do console."""
+        spill = self.console_scrollback.spill
+        if spill is None:
+            self.log_to_console("Gravação da saída em arquivo desativada (console_spill_to_file).\n")
+            return
+        spill.descarregar()
+        try:
+            abrir_arquivo(spill.caminho)
+        except Exception as e:
+            self.log_to_console(f"❌ Erro ao abrir arquivo de saída: {str(e)}\n")
+    
+    def _poll_catalogs(self):
+        """Aplica as mudanças nos arquivos de catálogo sem reiniciar."""
+        try:
+            diff = self.catalog_watcher.verificar()
+        except Exception as e:
+            self.log_to_console(f"❌ Erro ao recarregar catálogos: {e}\n")
+        else:
+            if not diff.vazio or diff.avisos:
+                self.apply_catalog_diff(diff)
+        
+        intervalo = self.config_manager.config.catalog_reload_interval
+        if intervalo > 0:
+            self.root.after(int(intervalo * 1000), self._poll_catalogs)
+    
+    def apply_catalog_diff(self, diff: CatalogDiff):
+        """Atualiza a interface após uma recarga do catálogo."""
+        for aviso in diff.avisos:
+            self.log_to_console(f"⚠️ Catálogo: {aviso}\n")
+        if diff.vazio:
+            return
+        
+        self.log_to_console(
+            f"🔄 Catálogo recarregado: {len(diff.adicionados)} novo(s), "
+            f"{len(diff.alterados)} alterado(s), {len(diff.removidos)} removido(s)\n"
+        )
+        
+        categorias = ["Todas"] + sorted(set(cmd.category for cmd in self.comandos))
+        self.category_combo.config(values=categorias)
+        if self.category_var.get() not in categorias:
+            self.category_var.set("Todas")
+        
+        self.update_command_list(self.search_var.get())
+        
+        # Comando selecionado alterado ou removido
+        if self.selected_command is not None:
+            atual = self.index_comandos.get(self.selected_command.key)
+            if atual is None:
+                self.selected_command = None
+                self.details_text.config(state=tk.NORMAL)
+                self.details_text.delete(1.0, tk.END)
+                self.details_text.config(state=tk.DISABLED)
+                self.btn_execute.config(state=tk.DISABLED)
+                self.btn_execute_fresh.config(state=tk.DISABLED)
+                self.btn_favorite.config(state=tk.DISABLED)
+            elif atual is not self.selected_command:
+                self.selected_command = atual
+                self.show_command_details()
+                self.btn_execute_fresh.config(state=tk.NORMAL if atual.cache_ttl else tk.DISABLED)
+    
+    def report_catalog_warnings(self):
+        """Mostra no console as entradas de catálogo ignoradas."""
+        for aviso in self.catalogo.avisos:
+            self.log_to_console(f"⚠️ Catálogo: {aviso}\n")
+    
+    def stop_execution(self):
+        """Cancela os comandos em execução ou na fila."""
+        if not self.engine.cancelar_todos():
+            self.log_to_console("Nenhum comando em execução.\n")
+    
     def clear_console(self):
         """Limpa o console de saída."""
         self.console_text.delete(1.0, tk.END)
+        self.console_scrollback.limpar()
     
     def update_history(self):
         """Atualiza a exibição do histórico."""
@@ -723,21 +848,10 @@ class HelpCommandsGUI:
             self.notebook.select(1)
             
             # Executar
-            def exec_thread():
-                try:
-                    executar_comando_livre(comando, admin_var.get())
-                    self.config_manager.adicionar_ao_historico(
-                        "LIVRE",
-                        "Comando Livre",
-                        comando,
-                        success=True,
-                        is_free_command=True
-                    )
-                    self.root.after(0, lambda: self.log_to_console(f"\n✅ Comando concluído\n"))
-                except Exception as e:
-                    self.root.after(0, lambda: self.log_to_console(f"\n❌ Erro: {e}\n"))
-            
-            threading.Thread(target=exec_thread, daemon=True).start()
+            handle = self.engine.submeter_livre(comando, admin_var.get(), saida=self.console_sink)
+            handle.ao_concluir(
+                lambda h: self.console_sink.agendar(lambda: self._on_execution_finished(h, is_free_command=True))
+            )
         
         btn_frame = tk.Frame(dialog)
         btn_frame.pack(pady=20)
@@ -888,10 +1002,17 @@ class HelpCommandsGUI:
     
     def on_closing(self):
         """Callback ao fechar a janela."""
+        # Encerrar execuções em andamento antes de fechar o histórico e o console
+        self.engine.encerrar()
+        
         # Salvar tamanho da janela
         self.config_manager.config.window_width = self.root.winfo_width()
         self.config_manager.config.window_height = self.root.winfo_height()
         self.config_manager.salvar_config()
+        self.config_manager.fechar()
+        
+        self.console_sink.parar()
+        self.console_scrollback.fechar()
         
         self.root.destroy()
 
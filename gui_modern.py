@@ -2,23 +2,163 @@
 Interface gráfica moderna usando CustomTkinter para o Help Commands.
 """
 import customtkinter as ctk
-from typing import List, Dict, Optional
-import threading
+import math
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional
 from datetime import datetime
-import ctypes
 
 from models import Command
-from commands_config import get_all_commands
-from executor import executar_comando, executar_comando_livre, configurar_logger, indexar_por_key
+from catalog_cache import obter_catalogo
+from commands_config import CatalogDiff, CatalogWatcher
+from executor import configurar_logger
+from platform_detector import obter_plataforma
 from config_manager import ConfigManager
-from help_system import HelpSystem
+from console_sink import ConsoleScrollback, ConsoleSink, ConsoleSpill, abrir_arquivo
 from collections import defaultdict
+from startup_profile import profiler
+from search import LIMITE_LISTA
+
+# Motor de execução, runbooks e métricas só são importados no primeiro uso
+# (ou depois que a janela aparece), fora do caminho até a primeira pintura
+if TYPE_CHECKING:
+    from async_executor import ExecutionEngine, ExecutionHandle
+    from runbook import Runbook, RunbookRun
 
 
 # Configurações do CustomTkinter
 ctk.set_appearance_mode("dark")  # Modes: "System" (default), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue" (default), "green", "dark-blue"
 
+# Entradas por página na aba de histórico
+HISTORICO_PAGINA = 50
+
+
+class VirtualCommandList(ctk.CTkFrame):
+    """
+    Lista rolável de comandos que só cria widgets para as linhas visíveis.
+    
+    Um conjunto fixo de botões é reaproveitado durante a rolagem e a
+    filtragem: mudar os itens apenas atualiza o texto dos botões já
+    existentes, então o custo independe do tamanho do catálogo.
+    """
+    
+    ROW_HEIGHT = 42
+    WHEEL_ROWS = 3
+    
+    def __init__(
+        self,
+        master,
+        on_select: Callable[[Command], None],
+        format_item: Callable[[Command], str],
+        **kwargs
+    ):
+        super().__init__(master, **kwargs)
+        self.on_select = on_select
+        self.format_item = format_item
+        
+        self._items: List[Command] = []
+        self._top = 0
+        self._rows: List[ctk.CTkButton] = []
+        self._row_texts: List[Optional[str]] = []
+        self._font = ctk.CTkFont(size=13)
+        
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y")
+        
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self._viewport.pack(side="left", fill="both", expand=True)
+        self._viewport.bind("<Configure>", lambda e: self._render())
+        self._bind_wheel(self._viewport)
+    
+    def set_items(self, items: List[Command]):
+        """Substitui os itens exibidos mantendo os widgets existentes."""
+        self._items = items
+        self._top = min(self._top, self._max_top())
+        self._render()
+    
+    def _visible_count(self) -> int:
+        """Quantidade de linhas que cabem na área visível."""
+        height = max(self._viewport.winfo_height(), self.ROW_HEIGHT)
+        return math.ceil(height / self.ROW_HEIGHT)
+    
+    def _max_top(self) -> int:
+        """Maior índice possível para a primeira linha visível."""
+        return max(0, len(self._items) - self._visible_count() + 1)
+    
+    def _ensure_rows(self, count: int):
+        """Cria botões até o pool ter `count` linhas (nunca destrói)."""
+        while len(self._rows) < count:
+            slot = len(self._rows)
+            btn = ctk.CTkButton(
+                self._viewport,
+                text="",
+                command=lambda i=slot: self._on_row_click(i),
+                anchor="w",
+                height=32,
+                font=self._font
+            )
+            self._bind_wheel(btn)
+            self._rows.append(btn)
+            self._row_texts.append(None)
+    
+    def _render(self):
+        """Posiciona o pool de linhas sobre a janela visível dos itens."""
+        visible = self._visible_count()
+        self._ensure_rows(visible)
+        
+        for slot, btn in enumerate(self._rows):
+            index = self._top + slot
+            if slot < visible and index < len(self._items):
+                text = self.format_item(self._items[index])
+                if self._row_texts[slot] != text:
+                    btn.configure(text=text)
+                    self._row_texts[slot] = text
+                btn.place(x=0, y=slot * self.ROW_HEIGHT + 5, relwidth=1.0, height=32)
+            elif self._row_texts[slot] is not False:
+                btn.place_forget()
+                self._row_texts[slot] = False
+        
+        total = len(self._items)
+        if total:
+            first = self._top / total
+            last = min(1.0, (self._top + visible) / total)
+        else:
+            first, last = 0.0, 1.0
+        self._scrollbar.set(first, last)
+    
+    def _scroll_to(self, top: int):
+        """Move a primeira linha visível para `top` (limitado à lista)."""
+        top = max(0, min(top, self._max_top()))
+        if top != self._top:
+            self._top = top
+            self._render()
+    
+    def _on_scrollbar(self, action, value, unit=None):
+        """Trata arrasto e cliques na barra de rolagem."""
+        if action == "moveto":
+            self._scroll_to(int(float(value) * len(self._items)))
+        elif action == "scroll":
+            step = self._visible_count() if unit == "pages" else 1
+            self._scroll_to(self._top + int(value) * step)
+    
+    def _on_wheel(self, event):
+        """Rola a lista com a roda do mouse."""
+        if getattr(event, "num", None) == 4 or event.delta > 0:
+            self._scroll_to(self._top - self.WHEEL_ROWS)
+        else:
+            self._scroll_to(self._top + self.WHEEL_ROWS)
+    
+    def _bind_wheel(self, widget):
+        """Associa a roda do mouse (Windows/macOS e X11) ao widget."""
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", self._on_wheel)
+        widget.bind("<Button-5>", self._on_wheel)
+    
+    def _on_row_click(self, slot: int):
+        """Seleciona o comando exibido na linha clicada."""
+        index = self._top + slot
+        if index < len(self._items):
+            self.on_select(self._items[index])
+
 
 class HelpCommandsGUI:
     """Interface gráfica moderna do Help Commands."""
@@ -27,32 +167,96 @@ class HelpCommandsGUI:
         self.root = root
         self.root.title("Help Commands - Painel de Suporte Técnico")
         
-        # Inicializar gerenciadores
-        self.config_manager = ConfigManager()
-        self.help_system = HelpSystem()
-        configurar_logger()
-        
-        # Carregar comandos
-        self.comandos = get_all_commands()
-        self.index_comandos = indexar_por_key(self.comandos)
+        # Inicializar gerenciadores (histórico, ajuda e logger ficam para
+        # depois que a janela aparecer)
+        with profiler.fase("configurações"):
+            self.config_manager = ConfigManager()
+        self._help_system = None
+        self._engine: Optional["ExecutionEngine"] = None
+        
+        # Carregar comandos (do cache compilado quando o catálogo não mudou)
+        with profiler.fase("catálogo"):
+            self.catalogo = obter_catalogo()
+        self.comandos = self.catalogo.comandos
+        self.index_comandos = self.catalogo.por_key
+        self.search_index = self.catalogo.indice
         self.comandos_filtrados = self.comandos.copy()
         
         # Detectar sistema
-        import platform
-        self.os_version = f"Windows {platform.release()}"
-        self.is_admin = ctypes.windll.shell32.IsUserAnAdmin() != 0
+        self.plataforma = obter_plataforma()
+        self.os_version = self.plataforma.descricao
+        self.is_admin = self.plataforma.eh_admin()
         
         # Variáveis de interface
         self.search_var = ctk.StringVar()
         self.selected_command: Optional[Command] = None
         self.selected_category = "Todos"
+        self._history_page = 0
+        # Abas fora da vista só são montadas quando selecionadas
+        self._abas_pendentes: Dict[str, Callable[[], None]] = {}
         
         # Configurar janela
-        self._setup_window()
-        self._create_widgets()
+        with profiler.fase("construção dos widgets"):
+            self._setup_window()
+            self._create_widgets()
+        
+        # Saída das threads de execução chega ao console em lotes; o console
+        # guarda só as últimas linhas (a saída completa pode ir para arquivo)
+        self.console_scrollback = ConsoleScrollback(
+            self.config_manager.config.console_scrollback_lines,
+            ConsoleSpill() if self.config_manager.config.console_spill_to_file else None
+        )
+        self.console_scrollback.limpar(1)  # mensagem "Console pronto"
+        self.console_sink = ConsoleSink(self.root, self._write_console)
+        self.console_sink.iniciar()
         
         # Atualizar lista inicial
         self.update_command_list()
+        
+        # O restante roda com a janela já visível
+        self.root.after_idle(self._on_window_shown)
+    
+    @property
+    def help_system(self):
+        """Sistema de ajuda, criado no primeiro uso."""
+        if self._help_system is None:
+            from help_system import HelpSystem
+            self._help_system = HelpSystem()
+        return self._help_system
+    
+    @property
+    def engine(self) -> "ExecutionEngine":
+        """Motor de execução, criado (com sua thread) no primeiro uso."""
+        if self._engine is None:
+            from async_executor import obter_engine
+            config = self.config_manager.config
+            self._engine = obter_engine()
+            self._engine.definir_max_concorrencia(config.max_concurrent_commands)
+            self._engine.definir_timeout_padrao(config.command_timeout)
+            self._engine.cache.definir_max_bytes(config.result_cache_max_bytes)
+        return self._engine
+    
+    def _on_window_shown(self):
+        """Agenda o trabalho não essencial da inicialização."""
+        profiler.marcar("janela visível")
+        self._run_deferred_startup([
+            ("logger", configurar_logger),
+            ("motor de execução", lambda: self.engine),
+            ("avisos do catálogo", self.report_catalog_warnings),
+            ("monitor de catálogos", self._start_catalog_watch),
+        ])
+    
+    def _run_deferred_startup(self, tarefas: List[tuple]):
+        """Executa uma tarefa adiada por vez, deixando a UI responder entre elas."""
+        if not tarefas:
+            profiler.marcar("inicialização concluída")
+            profiler.imprimir()
+            return
+        
+        nome, tarefa = tarefas[0]
+        with profiler.fase(f"adiado: {nome}"):
+            tarefa()
+        self.root.after(1, self._run_deferred_startup, tarefas[1:])
     
     def _setup_window(self):
         """Configura a janela principal."""
@@ -142,16 +346,21 @@ class HelpCommandsGUI:
         commands_label = ctk.CTkLabel(left_panel, text="📋 Comandos:", font=ctk.CTkFont(size=13, weight="bold"))
         commands_label.pack(anchor="w", padx=15, pady=(0, 5))
         
-        # Scrollable frame para comandos
-        self.commands_scroll = ctk.CTkScrollableFrame(left_panel, fg_color="transparent")
-        self.commands_scroll.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+        # Lista virtualizada de comandos
+        self.commands_list = VirtualCommandList(
+            left_panel,
+            on_select=self.select_command,
+            format_item=self._format_command_label,
+            fg_color="transparent"
+        )
+        self.commands_list.pack(fill="both", expand=True, padx=15, pady=(0, 15))
         
         # ========== PAINEL DIREITO ==========
         right_panel = ctk.CTkFrame(main_container)
         right_panel.pack(side="right", fill="both", expand=True)
         
         # Tabs
-        self.tabview = ctk.CTkTabview(right_panel)
+        self.tabview = ctk.CTkTabview(right_panel, command=self._on_tab_changed)
         self.tabview.pack(fill="both", expand=True, padx=15, pady=15)
         
         # Tab: Detalhes
@@ -162,13 +371,16 @@ class HelpCommandsGUI:
         self.tab_console = self.tabview.add("💻 Console")
         self._create_console_tab()
         
-        # Tab: Favoritos
+        # Tabs montadas na primeira seleção (ver _on_tab_changed)
         self.tab_favorites = self.tabview.add("⭐ Favoritos")
-        self._create_favorites_tab()
-        
-        # Tab: Histórico
         self.tab_history = self.tabview.add("📜 Histórico")
-        self._create_history_tab()
+        self.tab_performance = self.tabview.add("📊 Performance")
+        self._abas_pendentes = {
+            "⭐ Favoritos": self._create_favorites_tab,
+            "📜 Histórico": self._create_history_tab,
+            "📊 Performance": self._create_performance_tab,
+        }
+        self.tabview.set("📝 Detalhes")
         
         # ========== BARRA DE AÇÕES INFERIOR ==========
         actions_frame = ctk.CTkFrame(self.root, height=70, corner_radius=0)
@@ -192,6 +404,17 @@ class HelpCommandsGUI:
         self.btn_execute.pack(side="left", padx=10)
         self.btn_execute.configure(state="disabled")
         
+        self.btn_execute_fresh = ctk.CTkButton(
+            btn_frame,
+            text="🔄 Executar sem Cache",
+            command=lambda: self.execute_selected_command(fresco=True),
+            height=45,
+            width=180,
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        self.btn_execute_fresh.pack(side="left", padx=10)
+        self.btn_execute_fresh.configure(state="disabled")
+        
         self.btn_free_cmd = ctk.CTkButton(
             btn_frame,
             text="✏️ Comando Livre",
@@ -202,6 +425,16 @@ class HelpCommandsGUI:
         )
         self.btn_free_cmd.pack(side="left", padx=10)
         
+        self.btn_runbooks = ctk.CTkButton(
+            btn_frame,
+            text="📋 Runbooks",
+            command=self.show_runbooks_dialog,
+            height=45,
+            width=180,
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        self.btn_runbooks.pack(side="left", padx=10)
+        
         self.btn_settings = ctk.CTkButton(
             btn_frame,
             text="⚙️ Configurações",
@@ -232,6 +465,16 @@ class HelpCommandsGUI:
         )
         self.btn_about.pack(side="left", padx=10)
     
+    def _on_tab_changed(self):
+        """Monta a aba selecionada se ainda não foi montada."""
+        criar = self._abas_pendentes.pop(self.tabview.get(), None)
+        if criar is not None:
+            criar()
+    
+    def _aba_montada(self, nome: str) -> bool:
+        """Indica se a aba já foi montada (e pode ser atualizada)."""
+        return nome not in self._abas_pendentes
+    
     def _create_details_tab(self):
         """Cria a aba de detalhes do comando."""
         # Frame de informações
@@ -286,15 +529,38 @@ class HelpCommandsGUI:
         )
         self.console_text.pack(fill="both", expand=True)
         
-        # Botão limpar console
+        # Botões do console
+        console_btn_frame = ctk.CTkFrame(console_frame, fg_color="transparent")
+        console_btn_frame.pack(pady=(10, 0))
+        
+        btn_stop = ctk.CTkButton(
+            console_btn_frame,
+            text="⏹️ Parar",
+            command=self.stop_execution,
+            height=35,
+            width=150,
+            fg_color="#e74c3c",
+            hover_color="#c0392b"
+        )
+        btn_stop.pack(side="left", padx=5)
+        
         btn_clear = ctk.CTkButton(
-            console_frame,
+            console_btn_frame,
             text="🗑️ Limpar Console",
             command=self.clear_console,
             height=35,
             width=150
         )
-        btn_clear.pack(pady=(10, 0))
+        btn_clear.pack(side="left", padx=5)
+        
+        btn_log = ctk.CTkButton(
+            console_btn_frame,
+            text="📄 Abrir Log",
+            command=self.open_console_log,
+            height=35,
+            width=150
+        )
+        btn_log.pack(side="left", padx=5)
         
         self.console_text.insert("1.0", "Console pronto. Execute comandos para ver a saída aqui.\n")
         self.console_text.configure(state="disabled")
@@ -326,12 +592,32 @@ class HelpCommandsGUI:
         btn_refresh = ctk.CTkButton(
             btn_frame,
             text="🔄 Atualizar",
-            command=self.update_history_display,
+            command=lambda: self.update_history_display(pagina=0),
             height=35,
             width=120
         )
         btn_refresh.pack(side="left", padx=5)
         
+        self.btn_history_newer = ctk.CTkButton(
+            btn_frame,
+            text="◀ Recentes",
+            command=lambda: self.update_history_display(pagina=self._history_page - 1),
+            height=35,
+            width=110,
+            state="disabled"
+        )
+        self.btn_history_newer.pack(side="left", padx=5)
+        
+        self.btn_history_older = ctk.CTkButton(
+            btn_frame,
+            text="Anteriores ▶",
+            command=lambda: self.update_history_display(pagina=self._history_page + 1),
+            height=35,
+            width=110,
+            state="disabled"
+        )
+        self.btn_history_older.pack(side="left", padx=5)
+        
         btn_export = ctk.CTkButton(
             btn_frame,
             text="💾 Exportar",
@@ -354,31 +640,108 @@ class HelpCommandsGUI:
         
         self.update_history_display()
     
-    def update_command_list(self):
-        """Atualiza a lista de comandos exibidos."""
-        # Limpar lista atual
-        for widget in self.commands_scroll.winfo_children():
-            widget.destroy()
+    def _create_performance_tab(self):
+        """Cria a aba de métricas de execução."""
+        performance_frame = ctk.CTkFrame(self.tab_performance, fg_color="transparent")
+        performance_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        self.performance_text = ctk.CTkTextbox(
+            performance_frame,
+            font=ctk.CTkFont(family="Consolas", size=11),
+            wrap="none"
+        )
+        self.performance_text.pack(fill="both", expand=True)
         
-        # Filtrar comandos
-        search_term = self.search_var.get().lower()
+        btn_frame = ctk.CTkFrame(performance_frame, fg_color="transparent")
+        btn_frame.pack(fill="x", pady=(10, 0))
         
-        for cmd in self.comandos_filtrados:
-            if search_term:
-                if not (search_term in cmd.name.lower() or 
-                       search_term in cmd.description.lower() or
-                       search_term in cmd.category.lower()):
-                    continue
-            
-            self._create_command_button(cmd)
+        btn_refresh = ctk.CTkButton(
+            btn_frame,
+            text="🔄 Atualizar",
+            command=self.update_performance_display,
+            height=35,
+            width=120
+        )
+        btn_refresh.pack(side="left", padx=5)
+        
+        btn_export = ctk.CTkButton(
+            btn_frame,
+            text="💾 Exportar",
+            command=self.export_metrics,
+            height=35,
+            width=120
+        )
+        btn_export.pack(side="left", padx=5)
+        
+        btn_clear = ctk.CTkButton(
+            btn_frame,
+            text="🗑️ Zerar",
+            command=self.clear_metrics,
+            height=35,
+            width=120,
+            fg_color="#e74c3c",
+            hover_color="#c0392b"
+        )
+        btn_clear.pack(side="left", padx=5)
+        
+        self.update_performance_display()
+    
+    def update_performance_display(self):
+        """Mostra as métricas de execução por comando (percentis de duração, CPU, memória)."""
+        if not self._aba_montada("📊 Performance"):
+            return
+        from metrics import formatar_resumo, metricas
+        
+        nomes = {cmd.key: cmd.name for cmd in self.comandos}
+        nomes["LIVRE"] = "Comando Livre"
+        
+        self.performance_text.configure(state="normal")
+        self.performance_text.delete("1.0", "end")
+        self.performance_text.insert("1.0", formatar_resumo(metricas.resumo(), nomes))
+        self.performance_text.configure(state="disabled")
+    
+    def export_metrics(self):
+        """Exporta as métricas e os histogramas para JSON."""
+        from tkinter import filedialog
+        from metrics import METRICS_EXPORT_FILE, metricas
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile=METRICS_EXPORT_FILE,
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        
+        if filename:
+            try:
+                caminho = metricas.exportar(filename)
+                self.log_to_console(f"✅ Métricas exportadas para: {caminho}\n")
+            except Exception as e:
+                self.log_to_console(f"❌ Erro ao exportar métricas: {str(e)}\n")
+    
+    def clear_metrics(self):
+        """Zera as métricas da sessão."""
+        from metrics import metricas
+        
+        metricas.limpar()
+        self.update_performance_display()
     
-    def _create_command_button(self, cmd: Command):
-        """Cria um botão para o comando."""
-        # Frame do comando
-        cmd_frame = ctk.CTkFrame(self.commands_scroll)
-        cmd_frame.pack(fill="x", pady=5)
+    def update_command_list(self):
+        """Atualiza a lista de comandos exibidos."""
+        # Filtrar comandos pelo índice de busca
+        categoria = None if self.selected_category == "Todos" else self.selected_category
+        consulta = self.search_var.get()
+        # Uma busca mostra só os melhores resultados; sem busca, o catálogo inteiro
+        self.comandos_filtrados = self.search_index.buscar(
+            consulta,
+            favoritos=self.config_manager.config.favorites,
+            categoria=categoria,
+            limite=LIMITE_LISTA if consulta.strip() else None
+        )
         
-        # Indicadores
+        self.commands_list.set_items(self.comandos_filtrados)
+    
+    def _format_command_label(self, cmd: Command) -> str:
+        """Texto do botão do comando com seus indicadores."""
         indicators = ""
         if cmd.requires_admin:
             indicators += "🔒 "
@@ -387,16 +750,7 @@ class HelpCommandsGUI:
         if cmd.key in self.config_manager.config.favorites:
             indicators += "⭐ "
         
-        # Botão do comando
-        btn = ctk.CTkButton(
-            cmd_frame,
-            text=f"{indicators}{cmd.name}",
-            command=lambda c=cmd: self.select_command(c),
-            anchor="w",
-            height=32,
-            font=ctk.CTkFont(size=13)
-        )
-        btn.pack(fill="x", padx=5, pady=3)
+        return f"{indicators}{cmd.name}"
     
     def select_command(self, cmd: Command):
         """Seleciona um comando e exibe seus detalhes."""
@@ -433,6 +787,7 @@ class HelpCommandsGUI:
         
         # Atualizar botões
         self.btn_execute.configure(state="normal")
+        self.btn_execute_fresh.configure(state="normal" if cmd.cache_ttl else "disabled")
         self.btn_favorite.configure(state="normal")
         
         # Atualizar texto do botão de favorito
@@ -441,8 +796,13 @@ class HelpCommandsGUI:
         else:
             self.btn_favorite.configure(text="⭐ Adicionar aos Favoritos")
     
-    def execute_selected_command(self):
-        """Executa o comando selecionado."""
+    def execute_selected_command(self, fresco: bool = False):
+        """
+        Executa o comando selecionado.
+        
+        Args:
+            fresco: Se True, ignora o resultado em cache e executa de novo
+        """
         if not self.selected_command:
             return
         
@@ -461,27 +821,38 @@ class HelpCommandsGUI:
         # Mudar para aba do console
         self.tabview.set("💻 Console")
         
-        # Executar em thread separada
-        def execute():
-            self.log_to_console(f"\n{'='*60}\n")
-            self.log_to_console(f"[EXECUTANDO] {cmd.name}\n")
-            self.log_to_console(f"Comando: {cmd.command}\n")
-            self.log_to_console(f"{'='*60}\n\n")
-            
-            try:
-                # Executar comando (isso vai imprimir no console padrão)
-                executar_comando(cmd)
-                self.log_to_console("\n✅ Comando executado.\n")
-                
-                # Adicionar ao histórico
-                self.config_manager.add_to_history(cmd.key, cmd.name, "sucesso")
-                self.update_history_display()
-                
-            except Exception as e:
-                self.log_to_console(f"\n❌ Erro: {str(e)}\n")
-                self.config_manager.add_to_history(cmd.key, cmd.name, "erro")
+        self.log_to_console(f"\n{'='*60}\n")
+        self.log_to_console(f"[EXECUTANDO] {cmd.name}\n")
+        self.log_to_console(f"Comando: {cmd.command}\n")
+        self.log_to_console(f"{'='*60}\n\n")
         
-        threading.Thread(target=execute, daemon=True).start()
+        # Submeter ao motor assíncrono
+        handle = self.engine.submeter(cmd, saida=self.log_to_console, fresco=fresco)
+        if handle.submissoes > 1:
+            self.log_to_console("⏳ Comando já em execução, acompanhando a execução existente.\n")
+            return
+        handle.ao_concluir(
+            lambda h: self.console_sink.agendar(lambda: self._on_command_finished(cmd, h))
+        )
+    
+    def _on_command_finished(self, cmd: Command, handle: "ExecutionHandle"):
+        """Registra o resultado de uma execução concluída."""
+        from async_executor import STATUS_CANCELADO, STATUS_TIMEOUT
+        
+        if handle.erro is not None:
+            self.log_to_console(f"\n❌ Erro: {str(handle.erro)}\n")
+        elif handle.do_cache:
+            self.log_to_console("\n♻️ Resultado do cache. Use '🔄 Executar sem Cache' para atualizar.\n")
+        elif handle.sucesso:
+            self.log_to_console("\n✅ Comando executado.\n")
+        elif handle.status not in (STATUS_CANCELADO, STATUS_TIMEOUT):
+            self.log_to_console("\n❌ Comando falhou.\n")
+        
+        # Adicionar ao histórico (resultado do cache não é uma nova execução)
+        if not handle.do_cache:
+            self.config_manager.add_to_history(cmd.key, cmd.name, "sucesso" if handle.sucesso else "erro")
+            self.update_history_display()
+        self.update_performance_display()
     
     def show_free_command_dialog(self):
         """Mostra diálogo para executar comando livre."""
@@ -500,7 +871,7 @@ class HelpCommandsGUI:
         # Conteúdo
         ctk.CTkLabel(
             dialog,
-            text="✏️ Digite o comando do Windows:",
+            text="✏️ Digite o comando do sistema:",
             font=ctk.CTkFont(size=16, weight="bold")
         ).pack(pady=20)
         
@@ -523,11 +894,10 @@ class HelpCommandsGUI:
                 self.log_to_console(f"[COMANDO LIVRE] {comando}\n")
                 self.log_to_console(f"{'='*60}\n\n")
                 
-                try:
-                    executar_comando_livre(comando, admin_var.get())
-                    self.log_to_console("\n✅ Comando executado.\n")
-                except Exception as e:
-                    self.log_to_console(f"\n❌ Erro: {str(e)}\n")
+                handle = self.engine.submeter_livre(comando, admin_var.get(), saida=self.log_to_console)
+                handle.ao_concluir(
+                    lambda h: self.console_sink.agendar(lambda: self._on_free_command_finished(h))
+                )
                 
                 dialog.destroy()
         
@@ -552,6 +922,104 @@ class HelpCommandsGUI:
             height=40
         ).pack(side="left", padx=10)
     
+    def show_runbooks_dialog(self):
+        """Mostra os runbooks disponíveis para execução."""
+        from runbook import carregar_runbooks, descrever_passos
+        
+        runbooks, erros = carregar_runbooks()
+        for erro in erros:
+            self.log_to_console(f"⚠️ Runbook: {erro}\n")
+        
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("Runbooks")
+        dialog.geometry("600x450")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        ctk.CTkLabel(
+            dialog,
+            text="📋 Runbooks",
+            font=ctk.CTkFont(size=20, weight="bold")
+        ).pack(pady=20)
+        
+        lista = ctk.CTkScrollableFrame(dialog)
+        lista.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        
+        if not runbooks:
+            ctk.CTkLabel(lista, text="Nenhum runbook definido.", font=ctk.CTkFont(size=14)).pack(pady=50)
+        
+        for runbook in runbooks:
+            def executar(rb=runbook):
+                dialog.destroy()
+                self.execute_runbook(rb)
+            
+            ctk.CTkButton(
+                lista,
+                text=f"[{runbook.key}] {runbook.name}\n{descrever_passos(runbook)}",
+                command=executar,
+                anchor="w",
+                height=50
+            ).pack(fill="x", pady=3)
+    
+    def execute_runbook(self, runbook: "Runbook"):
+        """Executa um runbook e registra uma entrada no histórico ao final."""
+        from runbook import RunbookError, descrever_passos, executar_runbook
+        
+        criticos = [
+            self.index_comandos[p.key] for p in runbook.steps
+            if p.key in self.index_comandos and self.index_comandos[p.key].is_critical
+        ]
+        if criticos:
+            nomes = "\n".join(f"• {cmd.name}" for cmd in criticos)
+            dialog = ctk.CTkInputDialog(
+                text=f"⚠️ ATENÇÃO: o runbook inclui comandos críticos:\n{nomes}\n\nDigite 'CONFIRMAR' para executar:",
+                title="Confirmação Necessária"
+            )
+            if dialog.get_input() != "CONFIRMAR":
+                self.log_to_console("Execução cancelada pelo usuário.\n")
+                return
+        
+        self.tabview.set("💻 Console")
+        self.log_to_console(f"\n{'='*60}\n")
+        self.log_to_console(f"[RUNBOOK] {runbook.name}\n")
+        self.log_to_console(f"Passos: {descrever_passos(runbook)}\n")
+        self.log_to_console(f"{'='*60}\n\n")
+        
+        try:
+            execucao = executar_runbook(runbook, self.index_comandos, self.engine, saida=self.log_to_console)
+        except RunbookError as e:
+            self.log_to_console(f"❌ Runbook inválido: {str(e)}\n")
+            return
+        execucao.future.add_done_callback(
+            lambda _f: self.console_sink.agendar(lambda: self._on_runbook_finished(execucao))
+        )
+    
+    def _on_runbook_finished(self, execucao: "RunbookRun"):
+        """Mostra o resumo do runbook e registra a execução no histórico."""
+        from runbook import descrever_passos
+        
+        self.log_to_console(f"\n{execucao.resumo()}\n")
+        
+        runbook = execucao.runbook
+        self.config_manager.adicionar_ao_historico(
+            runbook.key,
+            f"Runbook: {runbook.name}",
+            descrever_passos(runbook),
+            success=execucao.sucesso
+        )
+        self.update_history_display()
+        self.update_performance_display()
+    
+    def _on_free_command_finished(self, handle: "ExecutionHandle"):
+        """Informa no console o resultado de um comando livre."""
+        from async_executor import STATUS_CANCELADO, STATUS_TIMEOUT
+        
+        if handle.erro is not None:
+            self.log_to_console(f"\n❌ Erro: {str(handle.erro)}\n")
+        elif handle.status not in (STATUS_CANCELADO, STATUS_TIMEOUT):
+            self.log_to_console("\n✅ Comando executado.\n")
+        self.update_performance_display()
+    
     def show_settings(self):
         """Mostra janela de configurações."""
         dialog = ctk.CTkToplevel(self.root)
@@ -718,6 +1186,8 @@ class HelpCommandsGUI:
     
     def update_favorites_list(self):
         """Atualiza a lista de favoritos."""
+        if not self._aba_montada("⭐ Favoritos"):
+            return
         for widget in self.favorites_frame.winfo_children():
             widget.destroy()
         
@@ -761,51 +1231,155 @@ class HelpCommandsGUI:
     def on_category_changed(self, category: str):
         """Callback quando a categoria muda."""
         self.selected_category = category
-        
-        if category == "Todos":
-            self.comandos_filtrados = self.comandos.copy()
-        else:
-            self.comandos_filtrados = [cmd for cmd in self.comandos if cmd.category == category]
-        
         self.update_command_list()
     
     def log_to_console(self, message: str):
-        """Adiciona mensagem ao console."""
+        """Adiciona mensagem ao console (pode ser chamado de qualquer thread)."""
+        self.console_sink.escrever(message)
+    
+    def _write_console(self, message: str):
+        """Grava um lote de texto no console (thread do Tk)."""
         self.console_text.configure(state="normal")
         self.console_text.insert("end", message)
+        excedente = self.console_scrollback.registrar(message)
+        if excedente:
+            self.console_text.delete("1.0", f"{excedente + 1}.0")
         if self.config_manager.config.auto_scroll_console:
             self.console_text.see("end")
         self.console_text.configure(state="disabled")
     
+    def open_console_log(self):
+        """Abre o arquivo com a saída completa do console."""
+        spill = self.console_scrollback.spill
+        if spill is None:
+            self.log_to_console("Gravação da saída em arquivo desativada (console_spill_to_file).\n")
+            return
+        spill.descarregar()
+        try:
+            abrir_arquivo(spill.caminho)
+        except Exception as e:
+            self.log_to_console(f"❌ Erro ao abrir arquivo de saída: {str(e)}\n")
+    
+    def _start_catalog_watch(self):
+        """Começa a verificar periodicamente os arquivos de catálogo."""
+        intervalo = self.config_manager.config.catalog_reload_interval
+        if intervalo > 0:
+            self.catalog_watcher = CatalogWatcher(self.catalogo)
+            self.root.after(int(intervalo * 1000), self._poll_catalogs)
+    
+    def _poll_catalogs(self):
+        """Aplica as mudanças nos arquivos de catálogo sem reiniciar."""
+        try:
+            diff = self.catalog_watcher.verificar()
+        except Exception as e:
+            self.log_to_console(f"❌ Erro ao recarregar catálogos: {str(e)}\n")
+        else:
+            if not diff.vazio or diff.avisos:
+                self.apply_catalog_diff(diff)
+        
+        intervalo = self.config_manager.config.catalog_reload_interval
+        if intervalo > 0:
+            self.root.after(int(intervalo * 1000), self._poll_catalogs)
+    
+    def apply_catalog_diff(self, diff: CatalogDiff):
+        """Atualiza a interface após uma recarga do catálogo."""
+        for aviso in diff.avisos:
+            self.log_to_console(f"⚠️ Catálogo: {aviso}\n")
+        if diff.vazio:
+            return
+        
+        self.log_to_console(
+            f"🔄 Catálogo recarregado: {len(diff.adicionados)} novo(s), "
+            f"{len(diff.alterados)} alterado(s), {len(diff.removidos)} removido(s)\n"
+        )
+        
+        categorias = ["Todos"] + sorted(set(cmd.category for cmd in self.comandos))
+        self.category_combo.configure(values=categorias)
+        if self.selected_category not in categorias:
+            self.selected_category = "Todos"
+            self.category_combo.set("Todos")
+        
+        self.update_command_list()
+        
+        # Comando selecionado alterado ou removido
+        if self.selected_command is not None:
+            atual = self.index_comandos.get(self.selected_command.key)
+            if atual is None:
+                self.selected_command = None
+                self.detail_title.configure(text="Selecione um comando")
+                self.detail_text.configure(state="normal")
+                self.detail_text.delete("1.0", "end")
+                self.detail_text.configure(state="disabled")
+                self.btn_execute.configure(state="disabled")
+                self.btn_execute_fresh.configure(state="disabled")
+                self.btn_favorite.configure(state="disabled")
+            elif atual is not self.selected_command:
+                self.select_command(atual)
+        
+        favoritos = set(self.config_manager.config.favorites)
+        if any(cmd.key in favoritos for cmd in diff.adicionados + diff.alterados + diff.removidos):
+            self.update_favorites_list()
+    
+    def report_catalog_warnings(self):
+        """Mostra no console as entradas de catálogo ignoradas."""
+        for aviso in self.catalogo.avisos:
+            self.log_to_console(f"⚠️ Catálogo: {aviso}\n")
+    
+    def stop_execution(self):
+        """Cancela os comandos em execução ou na fila."""
+        canceladas = self.engine.cancelar_todos()
+        if not canceladas:
+            self.log_to_console("Nenhum comando em execução.\n")
+    
     def clear_console(self):
         """Limpa o console."""
         self.console_text.configure(state="normal")
         self.console_text.delete("1.0", "end")
         self.console_text.insert("1.0", "Console limpo.\n")
         self.console_text.configure(state="disabled")
+        self.console_scrollback.limpar(1)
     
-    def update_history_display(self):
-        """Atualiza a exibição do histórico."""
-        history = self.config_manager.get_history()
+    def update_history_display(self, pagina: Optional[int] = None):
+        """
+        Mostra uma página do histórico (HISTORICO_PAGINA entradas, mais
+        recentes primeiro), consultada no armazenamento.
+        
+        Args:
+            pagina: Página a exibir (0 = mais recentes); None mantém a atual
+        """
+        if pagina is not None:
+            self._history_page = max(0, pagina)
+        if not self._aba_montada("📜 Histórico"):
+            return
+        offset = self._history_page * HISTORICO_PAGINA
+        # Uma entrada a mais indica se existe página anterior
+        entradas = self.config_manager.consultar_historico(limite=HISTORICO_PAGINA + 1, offset=offset)
+        ha_mais = len(entradas) > HISTORICO_PAGINA
+        entradas = entradas[:HISTORICO_PAGINA]
         
         self.history_text.configure(state="normal")
         self.history_text.delete("1.0", "end")
         
-        if not history:
+        if not entradas:
             self.history_text.insert("1.0", "Nenhum comando executado ainda.\n")
         else:
             self.history_text.insert("1.0", "═══════════════════════════════════════════════════════════\n")
             self.history_text.insert("end", "                    HISTÓRICO DE COMANDOS\n")
             self.history_text.insert("end", "═══════════════════════════════════════════════════════════\n\n")
             
-            for i, entry in enumerate(reversed(history), 1):
-                status_icon = "✅" if entry["status"] == "sucesso" else "❌"
-                self.history_text.insert("end", f"{i}. {status_icon} {entry['command_name']}\n")
-                self.history_text.insert("end", f"   📅 {entry['timestamp']}\n")
-                self.history_text.insert("end", f"   🔑 Código: {entry['command_key']}\n")
-                self.history_text.insert("end", "\n")
+            linhas = []
+            for i, entry in enumerate(entradas, offset + 1):
+                status_icon = "✅" if entry.success else "❌"
+                linhas.append(
+                    f"{i}. {status_icon} {entry.command_name}\n"
+                    f"   📅 {entry.timestamp}\n"
+                    f"   🔑 Código: {entry.command_key}\n\n"
+                )
+            self.history_text.insert("end", "".join(linhas))
         
         self.history_text.configure(state="disabled")
+        self.btn_history_newer.configure(state="normal" if self._history_page > 0 else "disabled")
+        self.btn_history_older.configure(state="normal" if ha_mais else "disabled")
     
     def export_history(self):
         """Exporta histórico para arquivo."""
@@ -845,22 +1419,31 @@ class HelpCommandsGUI:
         
         if dialog.get_input() == "CONFIRMAR":
             self.config_manager.clear_history()
-            self.update_history_display()
+            self.update_history_display(pagina=0)
             self.log_to_console("🗑️ Histórico limpo.\n")
     
     def on_closing(self):
         """Callback ao fechar a janela."""
+        # Encerrar execuções em andamento antes de fechar o histórico e o console
+        if self._engine is not None:
+            self._engine.encerrar()
+        
         # Salvar tamanho da janela
         self.config_manager.config.window_width = self.root.winfo_width()
         self.config_manager.config.window_height = self.root.winfo_height()
         self.config_manager.save_config()
+        self.config_manager.fechar()
+        
+        self.console_sink.parar()
+        self.console_scrollback.fechar()
         
         self.root.destroy()
 
 
 def main():
     """Função principal para iniciar a GUI moderna."""
-    root = ctk.CTk()
+    with profiler.fase("janela raiz"):
+        root = ctk.CTk()
     app = HelpCommandsGUI(root)
     root.mainloop()
 
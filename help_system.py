@@ -183,9 +183,9 @@ Solução:
 -----------------------------
 Problema: mini_terminal_suporte.log está grande
 Solução:
-  1. É seguro deletar o arquivo (será recriado)
-  2. Ou mova para backup
-  3. Configure rotação de logs se necessário
+  1. O log é rotacionado a cada 5 MB (mantém .1 a .3)
+  2. É seguro deletar os arquivos (serão recriados)
+  3. Ou mova-os para backup
 
 🆘 AINDA COM PROBLEMAS?
 ----------------------
@@ -209,7 +209,7 @@ Solução:
 --------------
 Nome: Help Commands - Painel de Suporte Técnico
 Versão: 3.2.0
-Plataforma: Windows
+Plataforma: Windows e Linux
 Interface: Tkinter GUI
 
 📋 DESCRIÇÃO
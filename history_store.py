@@ -0,0 +1,537 @@
+"""
+Armazenamento persistente do histórico de comandos.
+
+Dois backends com a mesma interface (carregar, anexar, precisa_compactar,
+compactar, limpar, consultar, iterar e fechar):
+  • HistoryJournal: diário JSON Lines somente-anexação (padrão)
+  • SQLiteHistoryStore: banco SQLite indexado para históricos longos
+"""
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import asdict
+from typing import Iterator, List, Optional, TextIO
+
+from models import CommandHistoryEntry
+
+
+HISTORY_JOURNAL_FILE = "command_history.jsonl"
+HISTORY_DB_FILE = "command_history.db"
+
+# Backends disponíveis (AppConfig.history_backend)
+BACKEND_JOURNAL = "journal"
+BACKEND_SQLITE = "sqlite"
+
+# Políticas de fsync do diário
+FSYNC_SEMPRE = "sempre"   # fsync a cada registro
+FSYNC_LOTE = "lote"       # fsync a cada FSYNC_LOTE_TAMANHO registros
+FSYNC_NUNCA = "nunca"     # apenas flush; o sistema operacional decide
+
+FSYNC_LOTE_TAMANHO = 20
+
+# O diário é compactado quando passa de retencao * FATOR_COMPACTACAO linhas
+FATOR_COMPACTACAO = 2
+
+# Tamanho dos lotes lidos ao percorrer o histórico completo
+LOTE_ITERACAO = 1000
+
+
+class HistoryJournal:
+    """
+    Histórico em arquivo JSON Lines somente-anexação.
+
+    Cada execução grava uma única linha no fim do arquivo, então o custo
+    de registrar independe do tamanho do histórico. Quando o diário passa
+    de `retencao * FATOR_COMPACTACAO` linhas ele é reescrito de forma
+    atômica apenas com as entradas mais recentes.
+    """
+
+    def __init__(
+        self,
+        caminho: str = HISTORY_JOURNAL_FILE,
+        retencao: int = 500,
+        fsync: str = FSYNC_LOTE,
+        arquivo_legado: Optional[str] = None,
+    ):
+        self.caminho = caminho
+        self.retencao = retencao
+        self.fsync = fsync
+        self.arquivo_legado = arquivo_legado
+
+        self._arquivo: Optional[TextIO] = None
+        self._linhas = 0
+        self._pendentes_fsync = 0
+        self._lock = threading.Lock()
+
+    def carregar(self) -> List[CommandHistoryEntry]:
+        """
+        Lê o diário e retorna as entradas mais recentes (até a retenção).
+
+        Linhas corrompidas (ex.: escrita interrompida por uma queda) são
+        ignoradas. Se o diário ainda não existe e há um histórico no
+        formato JSON antigo, ele é migrado.
+        """
+        if not os.path.exists(self.caminho) and self.arquivo_legado and os.path.exists(self.arquivo_legado):
+            self._migrar_legado()
+
+        entradas: List[CommandHistoryEntry] = []
+        self._linhas = 0
+
+        if os.path.exists(self.caminho):
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    linha = linha.strip()
+                    if not linha:
+                        continue
+                    self._linhas += 1
+                    try:
+                        entradas.append(CommandHistoryEntry(**json.loads(linha)))
+                    except (ValueError, TypeError):
+                        print(f"Ignorando linha inválida no histórico: {linha[:80]}")
+
+        return entradas[-self.retencao:]
+
+    def anexar(self, entry: CommandHistoryEntry) -> None:
+        """Grava uma entrada no fim do diário conforme a política de fsync."""
+        linha = json.dumps(asdict(entry), ensure_ascii=False) + "\n"
+
+        with self._lock:
+            arquivo = self._abrir()
+            arquivo.write(linha)
+            arquivo.flush()
+            self._linhas += 1
+
+            if self.fsync == FSYNC_SEMPRE:
+                os.fsync(arquivo.fileno())
+            elif self.fsync == FSYNC_LOTE:
+                self._pendentes_fsync += 1
+                if self._pendentes_fsync >= FSYNC_LOTE_TAMANHO:
+                    os.fsync(arquivo.fileno())
+                    self._pendentes_fsync = 0
+
+    def precisa_compactar(self) -> bool:
+        """Indica se o diário cresceu além do limite de compactação."""
+        return self._linhas > self.retencao * FATOR_COMPACTACAO
+
+    def compactar(self, recentes: List[CommandHistoryEntry]) -> None:
+        """Reescreve o diário apenas com as entradas recentes informadas."""
+        self.reescrever(recentes)
+
+    def limpar(self) -> None:
+        """Apaga todo o histórico."""
+        self.reescrever([])
+
+    def consultar(
+        self,
+        inicio: Optional[str] = None,
+        fim: Optional[str] = None,
+        command_key: Optional[str] = None,
+        somente_falhas: bool = False,
+        limite: int = 100,
+        offset: int = 0,
+    ) -> List[CommandHistoryEntry]:
+        """
+        Filtra o histórico, do mais recente para o mais antigo.
+
+        O diário não tem índices: a consulta percorre o arquivo inteiro,
+        o que é aceitável dentro do limite de retenção.
+        """
+        encontrados = [
+            entry for entry in self.iterar()
+            if _corresponde(entry, inicio, fim, command_key, somente_falhas)
+        ]
+        encontrados.reverse()
+        return encontrados[offset:offset + limite]
+
+    def iterar(self) -> Iterator[CommandHistoryEntry]:
+        """Percorre todas as entradas do diário, da mais antiga à mais recente."""
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.flush()
+
+        if not os.path.exists(self.caminho):
+            return
+
+        with open(self.caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    yield CommandHistoryEntry(**json.loads(linha))
+                except (ValueError, TypeError):
+                    continue
+
+    def reescrever(self, entradas: List[CommandHistoryEntry]) -> None:
+        """
+        Substitui o diário pelas entradas informadas (limitadas à retenção).
+
+        Grava em arquivo temporário e troca com os.replace, de modo que uma
+        queda no meio da escrita nunca deixa o diário pela metade.
+        """
+        entradas = entradas[-self.retencao:] if self.retencao else []
+        temporario = self.caminho + ".tmp"
+
+        with self._lock:
+            self._fechar_arquivo()
+
+            with open(temporario, 'w', encoding='utf-8') as f:
+                for entry in entradas:
+                    f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(temporario, self.caminho)
+            self._linhas = len(entradas)
+
+    def fechar(self) -> None:
+        """Sincroniza e fecha o arquivo do diário."""
+        with self._lock:
+            self._fechar_arquivo()
+
+    def _abrir(self) -> TextIO:
+        """Abre o diário em modo de anexação, se ainda não estiver aberto."""
+        if self._arquivo is None:
+            termina_incompleto = False
+            if os.path.exists(self.caminho) and os.path.getsize(self.caminho) > 0:
+                with open(self.caminho, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    termina_incompleto = f.read(1) != b"\n"
+
+            self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+            if termina_incompleto:
+                # Isola a última linha truncada por uma escrita interrompida
+                self._arquivo.write("\n")
+        return self._arquivo
+
+    def _fechar_arquivo(self) -> None:
+        """Fecha o arquivo aberto aplicando o fsync pendente."""
+        if self._arquivo is None:
+            return
+        if self.fsync != FSYNC_NUNCA:
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+        self._arquivo.close()
+        self._arquivo = None
+        self._pendentes_fsync = 0
+
+    def _migrar_legado(self) -> None:
+        """Converte o histórico JSON antigo para o diário JSON Lines."""
+        try:
+            with open(self.arquivo_legado, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.reescrever([CommandHistoryEntry(**entry) for entry in data])
+            print(f"Histórico migrado de {self.arquivo_legado} para {self.caminho}")
+        except Exception as e:
+            print(f"Erro ao migrar histórico antigo: {e}")
+
+
+class SQLiteHistoryStore:
+    """
+    Histórico em banco SQLite (modo WAL) com índices por data, comando e
+    status, adequado para meses de histórico de vários técnicos.
+
+    Apenas as entradas mais recentes (até `retencao`) são carregadas em
+    memória; o restante é acessado sob demanda por consultar() e iterar().
+    `max_linhas` (0 = ilimitado) define quantas linhas o banco mantém.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            command_key TEXT NOT NULL,
+            command_name TEXT NOT NULL,
+            command_text TEXT NOT NULL,
+            success INTEGER NOT NULL,
+            is_free_command INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_history_key ON history(command_key, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_history_success ON history(success, timestamp);
+    """
+
+    _COLUNAS = "timestamp, command_key, command_name, command_text, success, is_free_command"
+
+    # Política de fsync -> PRAGMA synchronous
+    _SYNCHRONOUS = {
+        FSYNC_SEMPRE: "FULL",
+        FSYNC_LOTE: "NORMAL",
+        FSYNC_NUNCA: "OFF",
+    }
+
+    def __init__(
+        self,
+        caminho: str = HISTORY_DB_FILE,
+        retencao: int = 500,
+        fsync: str = FSYNC_LOTE,
+        max_linhas: int = 0,
+        arquivo_legado: Optional[str] = None,
+        arquivo_json_legado: Optional[str] = None,
+    ):
+        """
+        Args:
+            arquivo_legado: Diário JSON Lines importado ao criar o banco
+            arquivo_json_legado: Histórico JSON antigo, importado ao criar o
+                banco quando não há diário
+        """
+        self.caminho = caminho
+        self.retencao = retencao
+        self.max_linhas = max_linhas
+        self.arquivo_legado = arquivo_legado
+        self.arquivo_json_legado = arquivo_json_legado
+
+        novo = not os.path.exists(caminho)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={self._SYNCHRONOUS.get(fsync, 'NORMAL')}")
+        self._conn.executescript(self._SCHEMA)
+
+        if novo and arquivo_legado and os.path.exists(arquivo_legado):
+            self._importar_diario(arquivo_legado)
+        elif novo and arquivo_json_legado and os.path.exists(arquivo_json_legado):
+            self._importar_json(arquivo_json_legado)
+
+    def carregar(self) -> List[CommandHistoryEntry]:
+        """Retorna as entradas mais recentes (até a retenção), em ordem cronológica."""
+        entradas = self.consultar(limite=self.retencao)
+        entradas.reverse()
+        return entradas
+
+    def anexar(self, entry: CommandHistoryEntry) -> None:
+        """Insere uma entrada no banco, respeitando `max_linhas`."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO history ({self._COLUNAS}) VALUES (?, ?, ?, ?, ?, ?)",
+                _para_linha(entry),
+            )
+            self._limitar_linhas()
+
+    def anexar_varios(self, entradas: List[CommandHistoryEntry]) -> None:
+        """Insere várias entradas numa única transação, respeitando `max_linhas`."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO history ({self._COLUNAS}) VALUES (?, ?, ?, ?, ?, ?)",
+                (_para_linha(entry) for entry in entradas),
+            )
+            self._limitar_linhas()
+
+    def _limitar_linhas(self) -> None:
+        """
+        Remove as linhas além de `max_linhas` (chamado com _lock, na transação).
+
+        Os ids só crescem e as remoções são sempre das linhas mais antigas,
+        então o corte pelo maior id é exato e usa apenas a chave primária.
+        """
+        if self.max_linhas:
+            self._conn.execute(
+                "DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?",
+                (self.max_linhas,),
+            )
+
+    def precisa_compactar(self) -> bool:
+        """O limite de linhas é aplicado a cada inserção; não há compactação periódica."""
+        return False
+
+    def compactar(self, recentes: List[CommandHistoryEntry]) -> None:
+        """Remove as linhas mais antigas além de `max_linhas`, se definido."""
+        if not self.max_linhas:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM history WHERE id <= "
+                "(SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_linhas,),
+            )
+
+    def limpar(self) -> None:
+        """Apaga todo o histórico."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
+
+    def consultar(
+        self,
+        inicio: Optional[str] = None,
+        fim: Optional[str] = None,
+        command_key: Optional[str] = None,
+        somente_falhas: bool = False,
+        limite: int = 100,
+        offset: int = 0,
+    ) -> List[CommandHistoryEntry]:
+        """
+        Filtra o histórico usando os índices, do mais recente para o mais antigo.
+
+        Args:
+            inicio: Data/hora mínima ("AAAA-MM-DD HH:MM:SS", inclusiva)
+            fim: Data/hora máxima (inclusiva)
+            command_key: Apenas execuções deste comando
+            somente_falhas: Apenas execuções com falha
+            limite: Tamanho da página
+            offset: Quantidade de entradas a pular (paginação)
+        """
+        where, params = self._filtros(inicio, fim, command_key, somente_falhas)
+        sql = (
+            f"SELECT {self._COLUNAS} FROM history{where} "
+            "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            linhas = self._conn.execute(sql, (*params, limite, offset)).fetchall()
+        return [_de_linha(linha) for linha in linhas]
+
+    def contar(
+        self,
+        inicio: Optional[str] = None,
+        fim: Optional[str] = None,
+        command_key: Optional[str] = None,
+        somente_falhas: bool = False,
+    ) -> int:
+        """Conta as entradas que atendem aos filtros."""
+        where, params = self._filtros(inicio, fim, command_key, somente_falhas)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+
+    def iterar(self) -> Iterator[CommandHistoryEntry]:
+        """Percorre todo o histórico em lotes, da entrada mais antiga à mais recente."""
+        ultimo_id = 0
+        while True:
+            with self._lock:
+                linhas = self._conn.execute(
+                    f"SELECT id, {self._COLUNAS} FROM history WHERE id > ? ORDER BY id LIMIT ?",
+                    (ultimo_id, LOTE_ITERACAO),
+                ).fetchall()
+            if not linhas:
+                return
+            for linha in linhas:
+                yield _de_linha(linha[1:])
+            ultimo_id = linhas[-1][0]
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _filtros(inicio, fim, command_key, somente_falhas):
+        """Monta a cláusula WHERE e seus parâmetros."""
+        condicoes = []
+        params: list = []
+        if inicio is not None:
+            condicoes.append("timestamp >= ?")
+            params.append(inicio)
+        if fim is not None:
+            condicoes.append("timestamp <= ?")
+            params.append(fim)
+        if command_key is not None:
+            condicoes.append("command_key = ?")
+            params.append(command_key)
+        if somente_falhas:
+            condicoes.append("success = 0")
+        where = " WHERE " + " AND ".join(condicoes) if condicoes else ""
+        return where, params
+
+    def _importar_diario(self, caminho: str) -> None:
+        """Importa um diário JSON Lines existente para o banco recém-criado."""
+        try:
+            diario = HistoryJournal(caminho, retencao=0)
+            lote: List[CommandHistoryEntry] = []
+            for entry in diario.iterar():
+                lote.append(entry)
+                if len(lote) >= LOTE_ITERACAO:
+                    self.anexar_varios(lote)
+                    lote = []
+            if lote:
+                self.anexar_varios(lote)
+            print(f"Histórico importado de {caminho} para {self.caminho}")
+        except Exception as e:
+            print(f"Erro ao importar histórico do diário: {e}")
+
+    def _importar_json(self, caminho: str) -> None:
+        """Importa o histórico JSON antigo para o banco recém-criado."""
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.anexar_varios([CommandHistoryEntry(**entry) for entry in data])
+            print(f"Histórico importado de {caminho} para {self.caminho}")
+        except Exception as e:
+            print(f"Erro ao importar histórico antigo: {e}")
+
+
+def criar_history_store(
+    backend: str = BACKEND_JOURNAL,
+    retencao: int = 500,
+    fsync: str = FSYNC_LOTE,
+    max_linhas: int = 0,
+    arquivo_legado: Optional[str] = None,
+):
+    """
+    Cria o armazenamento de histórico conforme o backend configurado.
+
+    Args:
+        backend: BACKEND_JOURNAL ou BACKEND_SQLITE
+        retencao: Entradas mantidas em memória (e no diário)
+        fsync: Política de sincronização com o disco
+        max_linhas: Limite de linhas do SQLite (0 = ilimitado)
+        arquivo_legado: Histórico JSON antigo a migrar para o diário (ou
+            para o SQLite, quando não existe diário)
+    """
+    if backend == BACKEND_SQLITE:
+        return SQLiteHistoryStore(
+            HISTORY_DB_FILE,
+            retencao=retencao,
+            fsync=fsync,
+            max_linhas=max_linhas,
+            arquivo_legado=HISTORY_JOURNAL_FILE,
+            arquivo_json_legado=arquivo_legado,
+        )
+    return HistoryJournal(
+        HISTORY_JOURNAL_FILE,
+        retencao=retencao,
+        fsync=fsync,
+        arquivo_legado=arquivo_legado,
+    )
+
+
+def _corresponde(
+    entry: CommandHistoryEntry,
+    inicio: Optional[str],
+    fim: Optional[str],
+    command_key: Optional[str],
+    somente_falhas: bool,
+) -> bool:
+    """Aplica os filtros de consulta a uma entrada em memória."""
+    if inicio is not None and entry.timestamp < inicio:
+        return False
+    if fim is not None and entry.timestamp > fim:
+        return False
+    if command_key is not None and entry.command_key != command_key:
+        return False
+    if somente_falhas and entry.success:
+        return False
+    return True
+
+
+def _para_linha(entry: CommandHistoryEntry) -> tuple:
+    """Converte uma entrada para a tupla de colunas do SQLite."""
+    return (
+        entry.timestamp,
+        entry.command_key,
+        entry.command_name,
+        entry.command_text,
+        int(entry.success),
+        int(entry.is_free_command),
+    )
+
+
+def _de_linha(linha: tuple) -> CommandHistoryEntry:
+    """Converte uma linha do SQLite em CommandHistoryEntry."""
+    timestamp, key, nome, texto, sucesso, livre = linha
+    return CommandHistoryEntry(
+        timestamp=timestamp,
+        command_key=key,
+        command_name=nome,
+        command_text=texto,
+        success=bool(sucesso),
+        is_free_command=bool(livre),
+    )
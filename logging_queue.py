@@ -0,0 +1,165 @@
+"""
+Logging sem E/S de arquivo nas threads da aplicação.
+
+Os loggers apenas colocam registros numa fila limitada (QueueHandler); uma
+QueueListener em thread própria grava no arquivo, em JSON Lines, com
+rotação por tamanho. Se a fila encher, o registro é descartado e contado
+em vez de bloquear quem chamou: o log nunca trava a execução de comandos
+nem a interface. A quantidade descartada é registrada assim que a fila
+volta a ter espaço.
+
+Cada linha do arquivo é um objeto JSON:
+    {"ts": "2025-11-27 10:30:15,123", "nivel": "INFO", "logger": "root",
+     "thread": "ExecutionEngine", "msg": "Execução finalizada: ipconfig",
+     "command_key": "R4", "duracao": 0.183, "returncode": 0, "status": "concluido"}
+
+Campos estruturados são passados em `extra`:
+    logging.info("...", extra={"command_key": cmd.key, "duracao": 1.2})
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Optional
+
+
+LOG_FILE = "mini_terminal_suporte.log"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# Registros aguardando gravação; acima disso os novos são descartados
+LOG_QUEUE_SIZE = 10000
+
+# Atributos de `extra` copiados para o JSON
+CAMPOS_ESTRUTURADOS = ("command_key", "duracao", "returncode", "status", "alvo")
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON em uma linha."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "ts": self.formatTime(record),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for campo in CAMPOS_ESTRUTURADOS:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                dados[campo] = round(valor, 6) if isinstance(valor, float) else valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados["exc"] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta (e conta) registros quando a fila está cheia."""
+
+    def __init__(self, fila: "queue.Queue"):
+        super().__init__(fila)
+        self.descartados = 0
+        self._nao_informados = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Resolve a mensagem e a exceção na thread de origem, mantendo os campos de `extra`."""
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.descartados += 1
+                self._nao_informados += 1
+            return
+
+        if self._nao_informados:
+            with self._lock:
+                perdidos, self._nao_informados = self._nao_informados, 0
+            aviso = logging.makeLogRecord({
+                "name": "logging_queue",
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"{perdidos} registro(s) de log descartado(s): fila cheia",
+            })
+            try:
+                self.queue.put_nowait(aviso)
+            except queue.Full:
+                with self._lock:
+                    self._nao_informados += perdidos
+
+
+_handler: Optional[BoundedQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+def configurar_logging(
+    arquivo: str = LOG_FILE,
+    nivel: int = logging.INFO,
+    max_bytes: int = LOG_MAX_BYTES,
+    backups: int = LOG_BACKUPS,
+    tamanho_fila: int = LOG_QUEUE_SIZE,
+) -> BoundedQueueHandler:
+    """
+    Direciona o logger raiz para a fila e inicia a thread de gravação.
+
+    Idempotente: chamadas seguintes retornam o handler já configurado.
+    """
+    global _handler, _listener
+    with _lock:
+        if _handler is not None:
+            return _handler
+
+        arquivo_handler = logging.handlers.RotatingFileHandler(
+            arquivo, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+        )
+        arquivo_handler.setFormatter(JsonLinesFormatter())
+
+        fila: "queue.Queue" = queue.Queue(maxsize=tamanho_fila)
+        _handler = BoundedQueueHandler(fila)
+        _listener = logging.handlers.QueueListener(fila, arquivo_handler)
+        _listener.start()
+
+        raiz = logging.getLogger()
+        for handler in list(raiz.handlers):
+            raiz.removeHandler(handler)
+        raiz.addHandler(_handler)
+        raiz.setLevel(nivel)
+
+        atexit.register(parar_logging)
+        return _handler
+
+
+def parar_logging() -> None:
+    """Grava os registros pendentes e encerra a thread de gravação."""
+    global _handler, _listener
+    with _lock:
+        handler, listener = _handler, _listener
+        _handler = _listener = None
+
+    if handler is None:
+        return
+    logging.getLogger().removeHandler(handler)
+    listener.stop()
+    for destino in listener.handlers:
+        destino.close()
+
+
+def logs_descartados() -> int:
+    """Registros descartados por fila cheia desde a configuração."""
+    handler = _handler
+    return handler.descartados if handler is not None else 0
@@ -1,11 +1,32 @@
 """
 Mini Terminal - Painel de Controle de Suporte
 Aplicação GUI moderna para executar comandos do Windows de forma organizada.
+
+Uso:
+    python main.py [--profile-startup]
+    python main.py list|search|run|runbook|fanout|history ...   (modo texto, ver cli.py)
+
+    --profile-startup   Mostra o tempo de cada fase da inicialização
 """
+import sys
+
+from startup_profile import profiler
+
 
 if __name__ == "__main__":
+    # Subcomandos da CLI não carregam a interface gráfica (cli.py só
+    # importa a biblioteca padrão e models no nível do módulo)
+    from cli import COMANDOS_CLI
+    if len(sys.argv) > 1 and sys.argv[1] in COMANDOS_CLI:
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
+    if "--profile-startup" in sys.argv[1:]:
+        profiler.ativar()
+    
     try:
-        from gui_modern import main as gui_main
+        with profiler.fase("import da interface"):
+            from gui_modern import main as gui_main
         gui_main()
     except ImportError as e:
         print(f"ERRO: Não foi possível importar a interface gráfica: {e}")
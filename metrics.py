@@ -0,0 +1,327 @@
+"""
+Métricas de execução por Command.key.
+
+Cada execução gera uma ExecutionSample (latência até o processo existir,
+tempo até o primeiro byte de saída, duração total, tempo de CPU e pico de
+memória do processo filho em POSIX, bytes de saída e código de retorno).
+As amostras são agregadas em memória por key, em histogramas no estilo HDR:
+buckets logarítmicos com subdivisão linear, com erro relativo abaixo de
+1% em qualquer faixa de valores e memória constante, sem guardar as
+amostras individuais.
+
+Uso:
+    from metrics import metricas
+    metricas.resumo()                    # {key: {métrica: {p50, p95, p99, ...}}}
+    metricas.exportar("metricas.json")
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models import SLOTS
+
+
+METRICS_EXPORT_FILE = "metricas_execucao.json"
+
+# Bits da subdivisão linear de cada potência de 2: 2^7 = 128 subdivisões,
+# erro relativo máximo de 1/128 (duas casas significativas)
+SUB_BUCKET_BITS = 7
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+PERCENTIS = (50, 95, 99)
+
+# Campos de ExecutionSample agregados: nome -> (unidade do resumo, escala)
+# Tempos em segundos são guardados em microssegundos; tamanhos em bytes
+METRICAS = {
+    "inicio_processo": ("ms", 1_000_000),
+    "primeiro_byte": ("ms", 1_000_000),
+    "duracao": ("ms", 1_000_000),
+    "cpu": ("ms", 1_000_000),
+    "rss_pico": ("bytes", 1),
+    "bytes_saida": ("bytes", 1),
+}
+
+
+@dataclass(**SLOTS)
+class ExecutionSample:
+    """
+    Medições de uma execução; campos não medidos ficam None.
+
+    Tempos em segundos, contados a partir do pedido de execução.
+    """
+    inicio_processo: Optional[float] = None
+    primeiro_byte: Optional[float] = None
+    duracao: Optional[float] = None
+    cpu: Optional[float] = None
+    rss_pico: Optional[int] = None
+    bytes_saida: int = 0
+    returncode: Optional[int] = None
+    status: Optional[str] = None
+
+
+class HdrHistogram:
+    """
+    Histograma de inteiros não negativos com precisão relativa fixa.
+
+    Valores menores que 2^(SUB_BUCKET_BITS+1) são exatos; acima disso
+    cada potência de 2 é dividida em 128 buckets iguais.
+    """
+
+    __slots__ = ("contagens", "total", "soma", "minimo", "maximo")
+
+    def __init__(self):
+        self.contagens: Dict[int, int] = {}
+        self.total = 0
+        self.soma = 0
+        self.minimo: Optional[int] = None
+        self.maximo: Optional[int] = None
+
+    @staticmethod
+    def _indice(valor: int) -> int:
+        expoente = valor.bit_length() - SUB_BUCKET_BITS - 1
+        if expoente <= 0:
+            return valor
+        return (expoente << SUB_BUCKET_BITS) + (valor >> expoente)
+
+    @staticmethod
+    def _faixa(indice: int) -> Tuple[int, int]:
+        """Menor e maior valor que caem no bucket."""
+        if indice < 2 * _SUB_BUCKETS:
+            return indice, indice
+        expoente = (indice >> SUB_BUCKET_BITS) - 1
+        mantissa = (indice & (_SUB_BUCKETS - 1)) + _SUB_BUCKETS
+        return mantissa << expoente, ((mantissa + 1) << expoente) - 1
+
+    def registrar(self, valor: int, vezes: int = 1) -> None:
+        valor = max(0, int(valor))
+        indice = self._indice(valor)
+        self.contagens[indice] = self.contagens.get(indice, 0) + vezes
+        self.total += vezes
+        self.soma += valor * vezes
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+
+    def mesclar(self, outro: "HdrHistogram") -> None:
+        """Soma as contagens de outro histograma a este."""
+        for indice, contagem in outro.contagens.items():
+            self.contagens[indice] = self.contagens.get(indice, 0) + contagem
+        self.total += outro.total
+        self.soma += outro.soma
+        for valor in (outro.minimo, outro.maximo):
+            if valor is not None:
+                self.minimo = valor if self.minimo is None else min(self.minimo, valor)
+                self.maximo = valor if self.maximo is None else max(self.maximo, valor)
+
+    @property
+    def media(self) -> Optional[float]:
+        return self.soma / self.total if self.total else None
+
+    def percentil(self, p: float) -> Optional[int]:
+        """Valor abaixo do qual estão p% das amostras (limite superior do bucket)."""
+        if not self.total:
+            return None
+        alvo = max(1, math.ceil(self.total * p / 100))
+        acumulado = 0
+        for indice in sorted(self.contagens):
+            acumulado += self.contagens[indice]
+            if acumulado >= alvo:
+                return min(self._faixa(indice)[1], self.maximo)
+        return self.maximo
+
+    def resumo(self, escala: float = 1) -> Dict[str, Optional[float]]:
+        """Contagem, mínimo, média, máximo e percentis, divididos por escala."""
+        def escalar(valor):
+            return None if valor is None else valor / escala
+
+        dados = {
+            "contagem": self.total,
+            "min": escalar(self.minimo),
+            "media": escalar(self.media),
+            "max": escalar(self.maximo),
+        }
+        for p in PERCENTIS:
+            dados[f"p{p}"] = escalar(self.percentil(p))
+        return dados
+
+    def buckets(self) -> Iterator[Tuple[int, int, int]]:
+        """(valor mínimo, valor máximo, contagem) de cada bucket ocupado."""
+        for indice in sorted(self.contagens):
+            yield (*self._faixa(indice), self.contagens[indice])
+
+
+class CommandMetrics:
+    """Histogramas e contadores de um Command.key."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.histogramas: Dict[str, HdrHistogram] = {nome: HdrHistogram() for nome in METRICAS}
+        self.status: Counter = Counter()
+        self.codigos: Counter = Counter()
+        # Execuções com status diferente de concluído ou código diferente de 0
+        self.falhas = 0
+        self.ultima_execucao: Optional[float] = None
+
+    @property
+    def execucoes(self) -> int:
+        return sum(self.status.values())
+
+    def registrar(self, amostra: ExecutionSample) -> None:
+        for nome, (_unidade, escala) in METRICAS.items():
+            valor = getattr(amostra, nome)
+            if valor is not None:
+                self.histogramas[nome].registrar(round(valor * escala))
+        status = amostra.status or "concluido"
+        self.status[status] += 1
+        if amostra.returncode is not None:
+            self.codigos[amostra.returncode] += 1
+        # Cada execução conta uma vez, mesmo com timeout e código de retorno
+        if status != "concluido" or amostra.returncode not in (None, 0):
+            self.falhas += 1
+        self.ultima_execucao = time.time()
+
+    def resumo(self) -> Dict[str, object]:
+        """Métricas do comando; tempos em ms e tamanhos em bytes."""
+        dados: Dict[str, object] = {
+            "execucoes": self.execucoes,
+            "falhas": self.falhas,
+            "status": dict(self.status),
+            "codigos": {str(codigo): n for codigo, n in self.codigos.items()},
+        }
+        for nome, (unidade, escala) in METRICAS.items():
+            histograma = self.histogramas[nome]
+            if histograma.total:
+                divisor = escala / 1000 if unidade == "ms" else 1
+                dados[nome] = {"unidade": unidade, **histograma.resumo(divisor)}
+        return dados
+
+
+class MetricsRegistry:
+    """Métricas de todas as keys, seguro para uso a partir de várias threads."""
+
+    def __init__(self):
+        self._por_key: Dict[str, CommandMetrics] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, key: str, amostra: ExecutionSample) -> None:
+        """Agrega uma amostra às métricas da key."""
+        with self._lock:
+            metricas = self._por_key.get(key)
+            if metricas is None:
+                metricas = self._por_key[key] = CommandMetrics(key)
+            metricas.registrar(amostra)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._por_key)
+
+    def obter(self, key: str) -> Optional[Dict[str, object]]:
+        """Resumo das métricas da key, ou None se ela nunca foi executada."""
+        with self._lock:
+            metricas = self._por_key.get(key)
+            return metricas.resumo() if metricas is not None else None
+
+    def resumo(self) -> Dict[str, Dict[str, object]]:
+        """Resumo de todas as keys."""
+        with self._lock:
+            return {key: m.resumo() for key, m in self._por_key.items()}
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._por_key.clear()
+
+    def exportar(self, caminho: str = METRICS_EXPORT_FILE) -> str:
+        """
+        Grava o resumo e os buckets dos histogramas em JSON.
+
+        Returns:
+            Caminho absoluto do arquivo gravado.
+        """
+        with self._lock:
+            dados = {
+                "gerado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "precisao_bits": SUB_BUCKET_BITS,
+                "comandos": {
+                    key: {
+                        **m.resumo(),
+                        "histogramas": {
+                            nome: [list(b) for b in h.buckets()]
+                            for nome, h in m.histogramas.items() if h.total
+                        },
+                    }
+                    for key, m in self._por_key.items()
+                },
+            }
+
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, caminho)
+        return os.path.abspath(caminho)
+
+
+def uso_de_recursos(rusage) -> Tuple[float, Optional[int]]:
+    """
+    (tempo de CPU em s, pico de memória em bytes) de um resultado de wait4.
+
+    O filho herda, até o exec, o pico de memória deste processo: um pico
+    que não supera o do próprio aplicativo não diz nada sobre o comando e
+    é informado como None.
+    """
+    import resource
+
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    fator = 1 if sys.platform == "darwin" else 1024
+    cpu = rusage.ru_utime + rusage.ru_stime
+    if rusage.ru_maxrss <= resource.getrusage(resource.RUSAGE_SELF).ru_maxrss:
+        return cpu, None
+    return cpu, rusage.ru_maxrss * fator
+
+
+def formatar_resumo(resumo: Dict[str, Dict[str, object]], nomes: Optional[Dict[str, str]] = None) -> str:
+    """
+    Tabela em texto do resumo (uma linha por key, mais lentas primeiro).
+
+    Args:
+        resumo: Resultado de MetricsRegistry.resumo()
+        nomes: Nome de exibição de cada key (opcional)
+    """
+    def valor(dados, metrica, percentil, divisor=1.0):
+        item = dados.get(metrica)
+        if not item or item.get(percentil) is None:
+            return "-"
+        return f"{item[percentil] / divisor:.1f}"
+
+    def duracao_p95(key):
+        item = resumo[key].get("duracao") or {}
+        return item.get("p95") or 0
+
+    nomes = nomes or {}
+    cabecalho = (
+        f"{'Key':<6} {'Comando':<28} {'Exec':>5} {'Falha':>5} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'1º byte':>9} {'CPU ms':>8} {'RSS MB':>7} {'Saída KB':>9}"
+    )
+    linhas = [cabecalho, "─" * len(cabecalho)]
+    for key in sorted(resumo, key=duracao_p95, reverse=True):
+        dados = resumo[key]
+        linhas.append(
+            f"{key:<6} {nomes.get(key, key)[:28]:<28} {dados['execucoes']:>5} {dados['falhas']:>5} "
+            f"{valor(dados, 'duracao', 'p50'):>9} {valor(dados, 'duracao', 'p95'):>9} "
+            f"{valor(dados, 'duracao', 'p99'):>9} {valor(dados, 'primeiro_byte', 'p50'):>9} "
+            f"{valor(dados, 'cpu', 'p50'):>8} {valor(dados, 'rss_pico', 'max', 1024 * 1024):>7} "
+            f"{valor(dados, 'bytes_saida', 'p50', 1024):>9}"
+        )
+    if not resumo:
+        linhas.append("Nenhuma execução registrada nesta sessão.")
+    return "\n".join(linhas)
+
+
+# Registro global usado pelo executor e pelo motor assíncrono
+metricas = MetricsRegistry()
@@ -1,8 +1,13 @@
+import sys
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
 
-@dataclass(frozen=True)
+# Dataclasses com __slots__ (sem __dict__ por instância) a partir do Python 3.10
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **SLOTS)
 class Command:
     """
     Representa um comando executável multiplataforma.
@@ -15,6 +20,9 @@ class Command:
         description: descrição detalhada do que o comando faz.
         requires_admin: se True, exige privilégios administrativos.
         is_critical: se True, pede confirmação antes de executar.
+        timeout: tempo limite em segundos (None usa o padrão da aplicação).
+        cache_ttl: validade em segundos da saída guardada em cache (só para
+            comandos de consulta; None não usa cache).
     """
     key: str
     name: str
@@ -23,3 +31,59 @@ class Command:
     description: str = "Sem descrição disponível."
     requires_admin: bool = False
     is_critical: bool = False
+    timeout: Optional[float] = None
+    cache_ttl: Optional[float] = None
+
+
+@dataclass(**SLOTS)
+class CommandHistoryEntry:
+    """
+    Entrada no histórico de comandos.
+
+    Key, nome e texto do comando se repetem em milhares de entradas; as
+    strings são internadas para que todas as entradas do mesmo comando
+    compartilhem uma única cópia.
+    """
+    timestamp: str
+    command_key: str
+    command_name: str
+    command_text: str
+    success: bool
+    is_free_command: bool = False
+
+    def __post_init__(self):
+        self.command_key = sys.intern(self.command_key)
+        self.command_name = sys.intern(self.command_name)
+        self.command_text = sys.intern(self.command_text)
+
+
+@dataclass(frozen=True, **SLOTS)
+class RunbookStep:
+    """
+    Passo de um runbook.
+
+    Atributos:
+        key: key do Command executado no passo.
+        after: keys dos passos que precisam terminar com sucesso antes deste.
+    """
+    key: str
+    after: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, **SLOTS)
+class Runbook:
+    """
+    Sequência de comandos executada como uma única ação.
+
+    Atributos:
+        key: identificador do runbook (ex.: "RB1").
+        name: nome amigável.
+        steps: passos com suas dependências (um grafo acíclico).
+        description: descrição do procedimento.
+        stop_on_failure: se True, uma falha impede o início de novos passos.
+    """
+    key: str
+    name: str
+    steps: Tuple[RunbookStep, ...]
+    description: str = "Sem descrição disponível."
+    stop_on_failure: bool = True
@@ -0,0 +1,251 @@
+"""
+Detecção do sistema operacional e operações dependentes de plataforma.
+
+O executor, o motor assíncrono e as interfaces não chamam APIs do Windows
+diretamente: usam a Platform retornada por obter_plataforma(), que sabe
+verificar privilégios, elevar comandos e qual catálogo carregar.
+
+  • WindowsPlatform: IsUserAnAdmin e UAC via ShellExecuteExW (o comando
+    elevado abre em outra janela, fora do console da aplicação)
+  • PosixPlatform: os.geteuid e elevação por um hook que reescreve o
+    comando (pkexec com sessão gráfica, senão sudo); o comando elevado
+    roda no mesmo fluxo de saída
+  • FakePlatform: privilégios e elevação simulados, sem efeitos colaterais
+
+Uso em testes e benchmarks:
+    definir_plataforma(FakePlatform(admin=True))
+"""
+import logging
+import os
+import platform
+import shlex
+import shutil
+import sys
+import threading
+from typing import Callable, List, Optional
+
+from commands_linux import LINUX_CATALOG_FILE
+from commands_windows import WINDOWS_CATALOG_FILE
+
+
+# Reescreve um comando para executá-lo com privilégios; None se não for possível
+ElevacaoHook = Callable[[str], Optional[str]]
+
+
+class Platform:
+    """Operações dependentes do sistema operacional."""
+
+    nome = "generico"
+    # Mecanismo de elevação exibido ao usuário ("UAC", "sudo", ...)
+    elevacao = "elevação"
+    catalogo = LINUX_CATALOG_FILE
+
+    @property
+    def descricao(self) -> str:
+        """Sistema e versão, para a barra de status."""
+        return f"{platform.system()} {platform.release()}"
+
+    def eh_admin(self) -> bool:
+        """Verifica se o processo atual possui privilégios administrativos."""
+        return False
+
+    def comando_elevado(self, comando: str) -> Optional[str]:
+        """
+        Comando que executa `comando` com privilégios no mesmo fluxo de
+        saída, ou None se a plataforma só eleva fora dele (elevar).
+        """
+        return None
+
+    def elevar(self, comando: str) -> bool:
+        """
+        Executa o comando com privilégios fora da aplicação (outra janela).
+
+        Returns:
+            True se a execução elevada foi iniciada.
+        """
+        return False
+
+
+class WindowsPlatform(Platform):
+    """Windows: privilégios pelo token do processo e elevação por UAC."""
+
+    nome = "windows"
+    elevacao = "UAC"
+    catalogo = WINDOWS_CATALOG_FILE
+
+    @property
+    def descricao(self) -> str:
+        return f"Windows {platform.release()}"
+
+    def eh_admin(self) -> bool:
+        import ctypes
+        return ctypes.windll.shell32.IsUserAnAdmin() != 0
+
+    def elevar(self, comando: str) -> bool:
+        """Executa comando com elevação UAC usando ShellExecuteEx."""
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            # Constantes do Windows
+            SEE_MASK_NOCLOSEPROCESS = 0x00000040
+            SW_SHOWNORMAL = 1
+
+            class SHELLEXECUTEINFO(ctypes.Structure):
+                _fields_ = [
+                    ("cbSize", wintypes.DWORD),
+                    ("fMask", ctypes.c_ulong),
+                    ("hwnd", wintypes.HWND),
+                    ("lpVerb", wintypes.LPCWSTR),
+                    ("lpFile", wintypes.LPCWSTR),
+                    ("lpParameters", wintypes.LPCWSTR),
+                    ("lpDirectory", wintypes.LPCWSTR),
+                    ("nShow", ctypes.c_int),
+                    ("hInstApp", wintypes.HINSTANCE),
+                    ("lpIDList", ctypes.c_void_p),
+                    ("lpClass", wintypes.LPCWSTR),
+                    ("hKeyClass", wintypes.HKEY),
+                    ("dwHotKey", wintypes.DWORD),
+                    ("hIconOrMonitor", wintypes.HANDLE),
+                    ("hProcess", wintypes.HANDLE),
+                ]
+
+            sei = SHELLEXECUTEINFO()
+            sei.cbSize = ctypes.sizeof(sei)
+            sei.fMask = SEE_MASK_NOCLOSEPROCESS
+            sei.hwnd = None
+            sei.lpVerb = "runas"  # Solicita elevação
+            sei.lpFile = "cmd.exe"
+            sei.lpParameters = f'/c "{comando}"'
+            sei.lpDirectory = None
+            sei.nShow = SW_SHOWNORMAL
+
+            if not ctypes.windll.shell32.ShellExecuteExW(ctypes.byref(sei)):
+                raise ctypes.WinError()
+
+            print(f"Comando executado com privilégios administrativos.")
+            logging.info("Comando executado com elevação: %s", comando)
+            return True
+
+        except Exception as e:
+            print(f"Erro ao executar com elevação: {e}")
+            logging.error("Falha na elevação: %s", e)
+            return False
+
+
+def elevar_com_pkexec(comando: str) -> Optional[str]:
+    """pkexec pede a senha numa janela do ambiente gráfico."""
+    if not shutil.which("pkexec"):
+        return None
+    return f"pkexec /bin/sh -c {shlex.quote(comando)}"
+
+
+def elevar_com_sudo(comando: str) -> Optional[str]:
+    """sudo pede a senha no terminal; sem terminal, só funciona se não precisar de senha."""
+    if not shutil.which("sudo"):
+        return None
+    opcoes = "" if sys.stdin is not None and sys.stdin.isatty() else "-n "
+    return f"sudo {opcoes}/bin/sh -c {shlex.quote(comando)}"
+
+
+def hooks_elevacao_padrao() -> List[ElevacaoHook]:
+    """pkexec primeiro quando há sessão gráfica, senão sudo."""
+    if os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"):
+        return [elevar_com_pkexec, elevar_com_sudo]
+    return [elevar_com_sudo, elevar_com_pkexec]
+
+
+class PosixPlatform(Platform):
+    """Linux/macOS: privilégios pelo UID efetivo e elevação por hooks."""
+
+    nome = "posix"
+    elevacao = "sudo"
+    catalogo = LINUX_CATALOG_FILE
+
+    def __init__(self, hooks: Optional[List[ElevacaoHook]] = None):
+        """
+        Args:
+            hooks: Tentados em ordem até um retornar o comando elevado
+                (padrão: hooks_elevacao_padrao())
+        """
+        self.hooks = hooks if hooks is not None else hooks_elevacao_padrao()
+
+    def eh_admin(self) -> bool:
+        return os.geteuid() == 0
+
+    def comando_elevado(self, comando: str) -> Optional[str]:
+        for hook in self.hooks:
+            elevado = hook(comando)
+            if elevado is not None:
+                return elevado
+        return None
+
+
+class FakePlatform(Platform):
+    """
+    Plataforma simulada para testes e benchmarks.
+
+    A elevação apenas registra o comando: em linha (padrão) ele roda sem
+    privilégios reais; com em_linha=False, elevar() retorna
+    `resultado_elevacao` sem executar nada.
+    """
+
+    nome = "fake"
+    elevacao = "fake"
+
+    def __init__(
+        self,
+        admin: bool = False,
+        em_linha: bool = True,
+        resultado_elevacao: bool = True,
+        catalogo: str = LINUX_CATALOG_FILE,
+    ):
+        self.admin = admin
+        self.em_linha = em_linha
+        self.resultado_elevacao = resultado_elevacao
+        self.catalogo = catalogo
+        self.elevacoes: List[str] = []
+
+    @property
+    def descricao(self) -> str:
+        return "Plataforma simulada"
+
+    def eh_admin(self) -> bool:
+        return self.admin
+
+    def comando_elevado(self, comando: str) -> Optional[str]:
+        if not self.em_linha:
+            return None
+        self.elevacoes.append(comando)
+        return comando
+
+    def elevar(self, comando: str) -> bool:
+        self.elevacoes.append(comando)
+        return self.resultado_elevacao
+
+
+def detectar_plataforma() -> Platform:
+    """Cria a Platform do sistema operacional atual."""
+    if os.name == "nt":
+        return WindowsPlatform()
+    return PosixPlatform()
+
+
+_plataforma: Optional[Platform] = None
+_lock = threading.Lock()
+
+
+def obter_plataforma() -> Platform:
+    """Retorna a plataforma da aplicação, detectando-a no primeiro uso."""
+    global _plataforma
+    with _lock:
+        if _plataforma is None:
+            _plataforma = detectar_plataforma()
+        return _plataforma
+
+
+def definir_plataforma(plataforma: Optional[Platform]) -> None:
+    """Substitui a plataforma da aplicação (None volta à detecção automática)."""
+    global _plataforma
+    with _lock:
+        _plataforma = plataforma
@@ -0,0 +1,121 @@
+"""
+Cache de resultados de comandos somente leitura.
+
+Comandos de consulta (ipconfig /all, systeminfo, netstat) são repetidos
+várias vezes em poucos minutos durante um atendimento. Um Command com
+`cache_ttl` tem a saída de uma execução bem-sucedida guardada pelo texto
+do comando; enquanto não expira, uma nova execução devolve a saída
+guardada na hora, sem criar processo.
+
+O cache é limitado pelo total de bytes das saídas guardadas; ao passar do
+limite, as entradas usadas há mais tempo são descartadas (LRU).
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from models import SLOTS
+
+
+# Limite padrão do total de saídas guardadas
+CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+
+@dataclass(**SLOTS)
+class CachedResult:
+    """Saída guardada de uma execução."""
+    saida: str
+    returncode: int
+    criado_em: float
+    expira_em: float
+    tamanho: int
+
+    @property
+    def idade(self) -> float:
+        """Segundos desde a execução que gerou o resultado."""
+        return time.monotonic() - self.criado_em
+
+
+class ResultCache:
+    """Cache LRU de saídas, limitado pelo total de bytes e com validade por entrada."""
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self._entradas: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obter(self, comando: str) -> Optional[CachedResult]:
+        """Resultado ainda válido do comando, ou None."""
+        with self._lock:
+            entrada = self._entradas.get(comando)
+            if entrada is not None and entrada.expira_em <= time.monotonic():
+                self._remover(comando)
+                entrada = None
+
+            if entrada is None:
+                self.falhas += 1
+                return None
+
+            self._entradas.move_to_end(comando)
+            self.acertos += 1
+            return entrada
+
+    def guardar(self, comando: str, saida: str, returncode: int, ttl: float) -> bool:
+        """
+        Guarda a saída de uma execução por `ttl` segundos.
+
+        Returns:
+            False se a saída sozinha passa do limite do cache (não guardada).
+        """
+        tamanho = len(saida.encode("utf-8"))
+        if ttl <= 0 or tamanho > self.max_bytes:
+            return False
+
+        agora = time.monotonic()
+        with self._lock:
+            if comando in self._entradas:
+                self._remover(comando)
+            self._entradas[comando] = CachedResult(saida, returncode, agora, agora + ttl, tamanho)
+            self.total_bytes += tamanho
+            while self.total_bytes > self.max_bytes:
+                self._remover(next(iter(self._entradas)))
+        return True
+
+    def invalidar(self, comando: Optional[str] = None) -> None:
+        """Descarta o resultado de um comando, ou todos."""
+        with self._lock:
+            if comando is None:
+                self._entradas.clear()
+                self.total_bytes = 0
+            elif comando in self._entradas:
+                self._remover(comando)
+
+    def definir_max_bytes(self, max_bytes: int) -> None:
+        """Altera o limite, descartando as entradas mais antigas se preciso."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._entradas and self.total_bytes > self.max_bytes:
+                self._remover(next(iter(self._entradas)))
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Entradas, bytes ocupados, acertos e falhas."""
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+            }
+
+    def _remover(self, comando: str) -> None:
+        """Remove uma entrada (chamado com o lock)."""
+        self.total_bytes -= self._entradas.pop(comando).tamanho
@@ -0,0 +1,411 @@
+"""
+Runbooks: sequências de comandos do catálogo executadas como uma ação.
+
+Um runbook é um grafo acíclico de passos (cada passo é um Command.key e
+suas dependências). Os passos cujas dependências já terminaram com
+sucesso são submetidos juntos ao ExecutionEngine, de modo que passos
+independentes rodam em paralelo (respeitando o limite de concorrência do
+motor). Se um passo falha, os que dependem dele são ignorados e, com
+stop_on_failure, nenhum passo novo é iniciado.
+
+Formato (runbooks.json ou arquivos .json/.toml em runbooks/):
+    {"runbooks": [{
+        "key": "RB1",
+        "name": "Reparo de Rede",
+        "steps": ["R5", "R6", {"key": "R4", "after": []}]
+    }]}
+
+Um passo escrito só como key depende do passo anterior da lista; um
+passo escrito como objeto declara as dependências em "after".
+
+Passos com requires_admin são elevados em linha (sudo/pkexec), para que
+os dependentes só comecem depois que eles terminarem. Sem privilégios, em
+plataformas que só elevam fora da aplicação (UAC), o passo falha sem
+executar.
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models import Command, Runbook, RunbookStep
+from catalog_loader import CatalogError, ler_entradas, listar_catalogos
+from executor import SaidaCallback, SaidaPrefixada, prefixar_saida
+from async_executor import (
+    ExecutionEngine,
+    ExecutionHandle,
+    STATUS_CONCLUIDO,
+    STATUS_EXECUTANDO,
+    STATUS_FALHOU,
+    STATUS_PENDENTE,
+    obter_engine,
+)
+
+
+RUNBOOKS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runbooks.json")
+RUNBOOKS_DIR = "runbooks"
+
+# Passo não executado (dependência falhou ou runbook interrompido)
+STATUS_IGNORADO = "ignorado"
+
+_ESTADOS_FINAIS = (STATUS_CONCLUIDO, STATUS_FALHOU, STATUS_IGNORADO)
+
+
+class RunbookError(ValueError):
+    """Runbook inválido (passo inexistente, dependência desconhecida ou ciclo)."""
+
+
+def validar_entrada(item: Any) -> Runbook:
+    """
+    Converte uma entrada do arquivo em Runbook.
+
+    Raises:
+        RunbookError: Campo ausente ou com formato errado
+    """
+    if not isinstance(item, dict):
+        raise RunbookError("entrada não é um objeto")
+    for campo in ("key", "name"):
+        if not isinstance(item.get(campo), str) or not item[campo]:
+            raise RunbookError(f"campo obrigatório ausente: {campo}")
+    passos = item.get("steps")
+    if not isinstance(passos, list) or not passos:
+        raise RunbookError('esperada uma lista "steps" não vazia')
+
+    steps: List[RunbookStep] = []
+    for passo in passos:
+        if isinstance(passo, str):
+            after = (steps[-1].key,) if steps else ()
+            steps.append(RunbookStep(sys.intern(passo), after))
+        elif isinstance(passo, dict) and isinstance(passo.get("key"), str):
+            after = passo.get("after", [])
+            if not isinstance(after, list) or not all(isinstance(k, str) for k in after):
+                raise RunbookError(f"passo {passo['key']}: \"after\" deve ser uma lista de keys")
+            steps.append(RunbookStep(sys.intern(passo["key"]), tuple(after)))
+        else:
+            raise RunbookError("cada passo deve ser uma key ou um objeto com \"key\"")
+
+    stop_on_failure = item.get("stop_on_failure", True)
+    if not isinstance(stop_on_failure, bool):
+        raise RunbookError("campo stop_on_failure deve ser true/false")
+
+    return Runbook(
+        key=item["key"],
+        name=item["name"],
+        steps=tuple(steps),
+        description=item.get("description", "Sem descrição disponível."),
+        stop_on_failure=stop_on_failure,
+    )
+
+
+def carregar_runbooks(caminhos: Optional[Sequence[str]] = None) -> Tuple[List[Runbook], List[str]]:
+    """
+    Lê os runbooks (padrão: runbooks.json e os arquivos de runbooks/).
+
+    Returns:
+        (runbooks válidos sem keys repetidas, mensagens de erro)
+    """
+    if caminhos is None:
+        caminhos = [RUNBOOKS_FILE] + listar_catalogos(RUNBOOKS_DIR)
+
+    runbooks: List[Runbook] = []
+    erros: List[str] = []
+    vistos = set()
+    for caminho in caminhos:
+        nome = os.path.basename(caminho)
+        try:
+            entradas = ler_entradas(caminho, "runbooks")
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            erros.append(f"{nome}: {e}")
+            continue
+        for i, item in enumerate(entradas, 1):
+            try:
+                runbook = validar_entrada(item)
+            except (RunbookError, CatalogError) as e:
+                erros.append(f"{nome}: runbook {i}: {e}")
+                continue
+            if runbook.key in vistos:
+                erros.append(f"{nome}: key duplicada '{runbook.key}' ignorada")
+                continue
+            vistos.add(runbook.key)
+            runbooks.append(runbook)
+    return runbooks, erros
+
+
+def ordenar_passos(runbook: Runbook, comandos: Dict[str, Command]) -> List[str]:
+    """
+    Valida o runbook contra o catálogo e retorna as keys em ordem topológica.
+
+    Raises:
+        RunbookError: Passo repetido ou fora do catálogo, dependência
+            desconhecida ou ciclo
+    """
+    dependencias: Dict[str, Tuple[str, ...]] = {}
+    for passo in runbook.steps:
+        if passo.key in dependencias:
+            raise RunbookError(f"{runbook.key}: passo repetido: {passo.key}")
+        if passo.key not in comandos:
+            raise RunbookError(f"{runbook.key}: comando não encontrado no catálogo: {passo.key}")
+        dependencias[passo.key] = passo.after
+
+    for key, after in dependencias.items():
+        for dep in after:
+            if dep not in dependencias:
+                raise RunbookError(f"{runbook.key}: passo {key} depende de {dep}, que não está no runbook")
+
+    # Algoritmo de Kahn, preservando a ordem declarada entre passos livres
+    pendentes = {key: len(after) for key, after in dependencias.items()}
+    ordem: List[str] = []
+    livres = [key for key, n in pendentes.items() if n == 0]
+    while livres:
+        key = livres.pop(0)
+        ordem.append(key)
+        for outro, after in dependencias.items():
+            if key in after:
+                pendentes[outro] -= 1
+                if pendentes[outro] == 0:
+                    livres.append(outro)
+
+    if len(ordem) != len(dependencias):
+        ciclo = sorted(key for key in dependencias if key not in ordem)
+        raise RunbookError(f"{runbook.key}: dependências circulares entre {', '.join(ciclo)}")
+    return ordem
+
+
+@dataclass
+class RunbookStepResult:
+    """Estado e tempos de um passo durante a execução do runbook."""
+    key: str
+    nome: str
+    status: str = STATUS_PENDENTE
+    returncode: Optional[int] = None
+    duracao: Optional[float] = None  # segundos de execução do processo
+
+
+class RunbookRun:
+    """
+    Execução de um runbook em andamento.
+
+    Os callbacks de conclusão dos passos rodam na thread do motor; todo o
+    estado é protegido por um lock e a execução termina resolvendo
+    `future` com a própria RunbookRun.
+    """
+
+    def __init__(
+        self,
+        runbook: Runbook,
+        comandos: Dict[str, Command],
+        engine: ExecutionEngine,
+        saida: Optional[SaidaCallback] = None,
+    ):
+        self.runbook = runbook
+        self.engine = engine
+        self._comandos = comandos
+        self._saida = saida
+        self._ordem = ordenar_passos(runbook, comandos)
+        self._dependencias = {passo.key: passo.after for passo in runbook.steps}
+
+        self.passos: Dict[str, RunbookStepResult] = {
+            key: RunbookStepResult(key, comandos[key].name) for key in self._ordem
+        }
+        self.future: Future = Future()
+        self.inicio: Optional[float] = None
+        self.fim: Optional[float] = None
+        self.interrompido = False
+
+        self._handles: Dict[str, ExecutionHandle] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def concluido(self) -> bool:
+        return self.future.done()
+
+    @property
+    def sucesso(self) -> bool:
+        """True se todos os passos terminaram com sucesso."""
+        return all(p.status == STATUS_CONCLUIDO for p in self.passos.values())
+
+    @property
+    def duracao(self) -> Optional[float]:
+        """Tempo total do runbook em segundos."""
+        if self.inicio is None:
+            return None
+        return (self.fim or time.monotonic()) - self.inicio
+
+    def resultado(self, timeout: Optional[float] = None) -> "RunbookRun":
+        """Bloqueia até o fim do runbook."""
+        return self.future.result(timeout)
+
+    def cancelar(self) -> None:
+        """Não inicia novos passos e cancela os que estão executando."""
+        with self._lock:
+            self.interrompido = True
+            prontos = self._liberar()
+            handles = list(self._handles.values())
+        self._submeter(prontos)
+        for handle in handles:
+            handle.cancelar()
+
+    def resumo(self) -> str:
+        """Tabela com o resultado e a duração de cada passo."""
+        simbolos = {STATUS_CONCLUIDO: "✓", STATUS_IGNORADO: "-"}
+        linhas = [f"Runbook [{self.runbook.key}] {self.runbook.name}"]
+        for passo in self.passos.values():
+            duracao = f"{passo.duracao:8.2f} s" if passo.duracao is not None else " " * 10
+            linhas.append(
+                f"  {simbolos.get(passo.status, '✗')} [{passo.key:>4}] {passo.nome:<40} {duracao}  {passo.status}"
+            )
+        total = self.duracao or 0.0
+        linhas.append(f"  Total: {total:.2f} s — {'sucesso' if self.sucesso else 'falha'}")
+        return "\n".join(linhas)
+
+    def _iniciar(self) -> None:
+        """Submete os passos sem dependências."""
+        self.inicio = time.monotonic()
+        with self._lock:
+            prontos = self._liberar()
+        self._submeter(prontos)
+
+    def _liberar(self) -> List[str]:
+        """
+        Atualiza os passos pendentes (chamado com o lock).
+
+        Returns:
+            Keys dos passos prontos para executar, já marcados como em execução.
+        """
+        prontos = []
+        for key in self._ordem:
+            passo = self.passos[key]
+            if passo.status != STATUS_PENDENTE:
+                continue
+            deps = [self.passos[dep].status for dep in self._dependencias[key]]
+            if self.interrompido or any(s in (STATUS_FALHOU, STATUS_IGNORADO) for s in deps):
+                passo.status = STATUS_IGNORADO
+            elif all(s == STATUS_CONCLUIDO for s in deps):
+                passo.status = STATUS_EXECUTANDO
+                prontos.append(key)
+        return prontos
+
+    def _submeter(self, keys: List[str]) -> None:
+        """Submete passos ao motor (fora do lock: o callback pode rodar na hora)."""
+        for key in keys:
+            cmd = self._comandos[key]
+            self._emitir(f"▶ [{key}] {cmd.name}\n")
+            executar = self._comando_do_passo(cmd)
+            if executar is None:
+                self._recusar_passo(key)
+                continue
+            saida = prefixar_saida(self._saida, f"[{key}] ") if self._saida else None
+            # Passos de reparo decidem com base em resultados atuais, nunca do cache
+            handle = self.engine.submeter(executar, saida=saida, fresco=True)
+            with self._lock:
+                self._handles[key] = handle
+            handle.ao_concluir(lambda h, key=key, saida=saida: self._ao_terminar_passo(key, h, saida))
+        self._verificar_fim()
+
+    def _comando_do_passo(self, cmd: Command) -> Optional[Command]:
+        """
+        Command a submeter para o passo, elevado em linha se necessário.
+
+        Uma elevação fora da aplicação (UAC) terminaria o passo na hora,
+        sem aguardar o comando elevado: nesse caso retorna None.
+        """
+        plataforma = self.engine.plataforma
+        if not cmd.requires_admin or plataforma.eh_admin():
+            return cmd
+        elevado = plataforma.comando_elevado(cmd.command)
+        if elevado is None:
+            return None
+        self._emitir(f"  [{cmd.key}] executando com elevação via {plataforma.elevacao}\n")
+        return replace(cmd, command=elevado, requires_admin=False)
+
+    def _recusar_passo(self, key: str) -> None:
+        """Marca como falho um passo que não pode ser elevado em linha."""
+        with self._lock:
+            passo = self.passos[key]
+            passo.status = STATUS_FALHOU
+            if self.runbook.stop_on_failure:
+                self.interrompido = True
+            prontos = self._liberar()
+
+        self._emitir(
+            f"✗ [{key}] {passo.nome} — requer privilégios administrativos e "
+            f"{self.engine.plataforma.elevacao} só eleva fora da aplicação; "
+            f"execute a aplicação como administrador para usá-lo em runbooks\n"
+        )
+        self._submeter(prontos)
+
+    def _ao_terminar_passo(
+        self, key: str, handle: ExecutionHandle, saida: Optional[SaidaPrefixada] = None
+    ) -> None:
+        """Registra o resultado de um passo e libera os dependentes."""
+        if saida is not None:
+            saida.descarregar()
+        with self._lock:
+            passo = self.passos[key]
+            passo.status = STATUS_CONCLUIDO if handle.sucesso else STATUS_FALHOU
+            passo.returncode = handle.returncode
+            passo.duracao = handle.duracao
+            self._handles.pop(key, None)
+            if not handle.sucesso and self.runbook.stop_on_failure:
+                self.interrompido = True
+            prontos = self._liberar()
+
+        simbolo = "✓" if handle.sucesso else "✗"
+        duracao = f" ({passo.duracao:.2f} s)" if passo.duracao is not None else ""
+        self._emitir(f"{simbolo} [{key}] {passo.nome} — {passo.status}{duracao}\n")
+        self._submeter(prontos)
+
+    def _verificar_fim(self) -> None:
+        """Resolve o future quando todos os passos chegaram a um estado final."""
+        with self._lock:
+            if self.fim is not None or any(p.status not in _ESTADOS_FINAIS for p in self.passos.values()):
+                return
+            self.fim = time.monotonic()
+        # Fora do lock: os callbacks do future podem consultar a execução
+        self.future.set_result(self)
+
+    def _emitir(self, texto: str) -> None:
+        if self._saida is not None:
+            self._saida(texto)
+
+
+def descrever_passos(runbook: Runbook) -> str:
+    """Texto dos passos para o histórico (ex.: "R5 -> R6 -> R3, R4")."""
+    partes = []
+    for passo in runbook.steps:
+        if partes and passo.after == (partes[-1][-1],):
+            partes[-1].append(passo.key)
+        else:
+            partes.append([passo.key])
+    return ", ".join(" -> ".join(cadeia) for cadeia in partes)
+
+
+def executar_runbook(
+    runbook: Runbook,
+    comandos: Dict[str, Command],
+    engine: Optional[ExecutionEngine] = None,
+    saida: Optional[SaidaCallback] = None,
+) -> RunbookRun:
+    """
+    Inicia a execução de um runbook.
+
+    Args:
+        runbook: Runbook a executar
+        comandos: Catálogo indexado por key
+        engine: Motor de execução (padrão: o motor global)
+        saida: Destino da saída; cada linha recebe a key do passo como prefixo
+
+    Returns:
+        RunbookRun para acompanhar ou aguardar a execução.
+
+    Raises:
+        RunbookError: Runbook inválido para este catálogo
+    """
+    execucao = RunbookRun(runbook, comandos, engine or obter_engine(), saida)
+    execucao._iniciar()
+    return execucao
@@ -0,0 +1,450 @@
+"""
+Índice de busca sobre o catálogo de comandos.
+
+O índice é construído uma vez na inicialização: os campos de cada Command
+são normalizados (minúsculas, sem acentos) e divididos em termos, e cada
+prefixo de termo aponta para os termos que o iniciam. Uma busca consulta
+apenas os termos relevantes em vez de percorrer o catálogo inteiro.
+
+Termos da busca sem nenhum prefixo correspondente ("gerenciadr",
+"ipconfg") caem na busca aproximada: um índice de trigramas do vocabulário
+seleciona candidatos e uma distância de edição limitada confirma.
+
+Durante a digitação, uma consulta que estende a anterior ("ip" ->
+"ipc", ou um termo a mais) só pode casar com os documentos do resultado
+anterior: o último termo é pontuado apenas sobre eles. Com `limite`, só
+os melhores resultados são ordenados (heapq.nsmallest).
+"""
+import heapq
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from models import Command
+
+
+# Peso de cada campo no ranking (nome acima de descrição)
+PESOS_CAMPOS: Tuple[Tuple[str, float], ...] = (
+    ("name", 4.0),
+    ("command", 3.0),
+    ("category", 2.0),
+    ("description", 1.0),
+)
+
+# Fator aplicado quando o termo da busca é só prefixo do termo indexado
+FATOR_PREFIXO = 0.7
+
+# Pontuação somada aos comandos favoritos
+BONUS_FAVORITO = 2.0
+
+# Prefixos mais longos que isso não são indexados (verificados na busca)
+MAX_PREFIXO = 12
+
+# Resultados exibidos pelas listas das interfaces para uma consulta
+LIMITE_LISTA = 200
+
+# Quantidade de consultas recentes mantidas em cache
+TAMANHO_CACHE = 64
+
+# Busca aproximada: fator de pontuação, similaridade mínima de trigramas
+# e tamanho mínimo do termo para tentar correção
+FATOR_APROXIMADO = 0.5
+SIMILARIDADE_MINIMA = 0.3
+TAMANHO_MINIMO_APROXIMADO = 3
+
+_TERMO_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalizar(texto: str) -> str:
+    """Converte para minúsculas e remove acentos ("Serviços" -> "servicos")."""
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Divide um texto normalizado em termos alfanuméricos."""
+    return _TERMO_RE.findall(normalizar(texto))
+
+
+def trigramas(termo: str) -> Set[str]:
+    """Trigramas do termo com marcadores de início e fim ("$ip", "ipc", ...)."""
+    marcado = f"${termo}$"
+    return {marcado[i:i + 3] for i in range(len(marcado) - 2)}
+
+
+def distancia_maxima(termo: str) -> int:
+    """Erros de digitação tolerados conforme o tamanho do termo."""
+    return 1 if len(termo) <= 5 else 2
+
+
+def distancia_limitada(a: str, b: str, maximo: int) -> Optional[int]:
+    """
+    Distância de Levenshtein entre `a` e `b`, ou None se passar de `maximo`.
+
+    Interrompe o cálculo assim que todas as células da linha atual
+    excedem o limite, o que torna o custo proporcional a len(a) * maximo
+    para termos muito diferentes.
+    """
+    if abs(len(a) - len(b)) > maximo:
+        return None
+
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            atual[j] = min(
+                anterior[j] + 1,
+                atual[j - 1] + 1,
+                anterior[j - 1] + (ca != cb),
+            )
+        if min(atual) > maximo:
+            return None
+        anterior = atual
+
+    return anterior[-1] if anterior[-1] <= maximo else None
+
+
+class CommandSearchIndex:
+    """Índice invertido de prefixos com busca ranqueada sobre Commands."""
+
+    def __init__(self, comandos: Iterable[Command] = ()):
+        self._comandos: List[Optional[Command]] = []
+        self._por_key: Dict[str, int] = {}
+
+        # termo -> id do termo; id do termo -> termo e {id do comando: peso}
+        self._termos: Dict[str, int] = {}
+        self._nomes: List[str] = []
+        self._postings: List[Dict[int, float]] = []
+        # prefixo -> ids dos termos que começam com ele
+        self._prefixos: Dict[str, List[int]] = {}
+        # trigrama -> ids dos termos que o contêm (busca aproximada)
+        self._trigramas: Dict[str, List[int]] = {}
+        # id do comando -> ids dos termos presentes nele
+        self._termos_por_doc: Dict[int, Set[int]] = {}
+
+        # Total de pares (termo, comando): custo médio de pontuar um comando
+        self._ligacoes = 0
+
+        # consulta -> (pontuação sem o último termo, pontuação final)
+        self._cache: "OrderedDict[str, Tuple[Optional[Dict[int, float]], Dict[int, float]]]" = OrderedDict()
+        # Favoritos da última busca e seus ids de documento
+        self._favoritos: Tuple[Tuple[str, ...], Set[int]] = ((), set())
+        # Última consulta pontuada, base para estreitar a seguinte
+        self._ultima: Optional[Tuple[Tuple[str, ...], bool, Optional[Dict[int, float]], Dict[int, float]]] = None
+
+        for cmd in comandos:
+            self.adicionar(cmd)
+
+    def __len__(self) -> int:
+        return len(self._por_key)
+
+    def adicionar(self, cmd: Command) -> None:
+        """
+        Indexa um comando. Um comando de mesma key já indexado é
+        substituído na mesma posição da ordem do catálogo.
+        """
+        doc = self._por_key.get(cmd.key)
+        if doc is None:
+            doc = len(self._comandos)
+            self._comandos.append(cmd)
+            self._por_key[cmd.key] = doc
+        else:
+            for tid in self._termos_por_doc.pop(doc, ()):
+                self._postings[tid].pop(doc, None)
+                self._ligacoes -= 1
+            self._comandos[doc] = cmd
+
+        pesos: Dict[int, float] = {}
+        for campo, peso in PESOS_CAMPOS:
+            for termo in tokenizar(getattr(cmd, campo)):
+                tid = self._obter_termo(termo)
+                if peso > pesos.get(tid, 0.0):
+                    pesos[tid] = peso
+
+        for tid, peso in pesos.items():
+            self._postings[tid][doc] = peso
+        self._termos_por_doc[doc] = set(pesos)
+        self._ligacoes += len(pesos)
+        self._limpar_cache()
+
+    def remover(self, key: str) -> None:
+        """Remove do índice o comando com a key informada."""
+        doc = self._por_key.pop(key, None)
+        if doc is None:
+            return
+        for tid in self._termos_por_doc.pop(doc, ()):
+            self._postings[tid].pop(doc, None)
+            self._ligacoes -= 1
+        self._comandos[doc] = None
+        self._limpar_cache()
+
+    def _limpar_cache(self) -> None:
+        self._cache.clear()
+        self._ultima = None
+        self._favoritos = ((), set())
+
+    def comandos(self) -> List[Command]:
+        """Retorna os comandos indexados na ordem de inserção."""
+        return [cmd for cmd in self._comandos if cmd is not None]
+
+    def buscar(
+        self,
+        consulta: str,
+        favoritos: Iterable[str] = (),
+        categoria: Optional[str] = None,
+        limite: Optional[int] = None,
+        aproximada: bool = True,
+    ) -> List[Command]:
+        """
+        Busca comandos cujos campos contêm termos iniciados por cada
+        termo da consulta.
+
+        Args:
+            consulta: Texto digitado (acentos e maiúsculas são ignorados)
+            favoritos: Keys dos favoritos, que recebem BONUS_FAVORITO
+            categoria: Restringe o resultado a uma categoria
+            limite: Quantidade máxima de resultados; só estes são
+                ordenados, o que barateia consultas amplas
+            aproximada: Tolera erros de digitação nos termos sem
+                correspondência exata ou por prefixo
+
+        Returns:
+            Comandos do mais para o menos relevante; consulta vazia retorna
+            o catálogo na ordem original.
+        """
+        termos = tokenizar(consulta)
+        if not termos:
+            resultado = [
+                cmd for cmd in self._comandos
+                if cmd is not None and (categoria is None or cmd.category == categoria)
+            ]
+            return resultado[:limite] if limite is not None else resultado
+
+        pontuacao = self._pontuar(termos, aproximada)
+
+        bonus = self._docs_favoritos(favoritos)
+        itens = pontuacao.items()
+        if categoria is not None:
+            comandos = self._comandos
+            itens = [(doc, pontos) for doc, pontos in itens if comandos[doc].category == categoria]
+        if bonus:
+            candidatos = [
+                (-(pontos + BONUS_FAVORITO) if doc in bonus else -pontos, doc) for doc, pontos in itens
+            ]
+        else:
+            candidatos = [(-pontos, doc) for doc, pontos in itens]
+
+        # Seleção parcial só compensa quando o limite é pequeno perto do total
+        if limite is not None and limite * 4 < len(candidatos):
+            ordenados = heapq.nsmallest(limite, candidatos)
+        else:
+            candidatos.sort()
+            ordenados = candidatos[:limite] if limite is not None else candidatos
+        return [self._comandos[doc] for _, doc in ordenados]
+
+    def _docs_favoritos(self, favoritos: Iterable[str]) -> Set[int]:
+        """Ids de documento dos favoritos (reaproveitados enquanto a lista não muda)."""
+        favoritos = tuple(favoritos)
+        if favoritos != self._favoritos[0]:
+            docs = {self._por_key[key] for key in favoritos if key in self._por_key}
+            self._favoritos = (favoritos, docs)
+        return self._favoritos[1]
+
+    def _pontuar(self, termos: Sequence[str], aproximada: bool) -> Dict[int, float]:
+        """Soma os pesos dos documentos que casam com todos os termos."""
+        termos = tuple(termos)
+        chave = ("~" if aproximada else "") + " ".join(termos)
+        em_cache = self._cache.get(chave)
+        if em_cache is not None:
+            self._cache.move_to_end(chave)
+            self._ultima = (termos, aproximada) + em_cache
+            return em_cache[1]
+
+        estreitada = self._estreitar(termos, aproximada)
+        if estreitada is not None:
+            anteriores, candidatos = estreitada
+        else:
+            anteriores = None
+            for termo in termos[:-1]:
+                anteriores = _somar(anteriores, self._pontuar_termo_ou_aproximado(termo, aproximada, anteriores))
+                if not anteriores:
+                    break
+            candidatos = anteriores
+
+        if anteriores is not None and not anteriores:
+            pontuacao: Dict[int, float] = {}
+        else:
+            parcial = self._pontuar_termo_ou_aproximado(termos[-1], aproximada, candidatos)
+            pontuacao = _somar(anteriores, parcial)
+
+        self._cache[chave] = (anteriores, pontuacao)
+        if len(self._cache) > TAMANHO_CACHE:
+            self._cache.popitem(last=False)
+        self._ultima = (termos, aproximada, anteriores, pontuacao)
+        return pontuacao
+
+    def _estreitar(
+        self, termos: Tuple[str, ...], aproximada: bool
+    ) -> Optional[Tuple[Optional[Dict[int, float]], Dict[int, float]]]:
+        """
+        Reaproveita a consulta anterior quando a atual a estende.
+
+        Returns:
+            (pontuação dos termos anteriores ao último, documentos que podem
+            casar com o último termo), ou None se não houver relação.
+        """
+        if self._ultima is None:
+            return None
+        termos_antes, aproximada_antes, anteriores, pontuacao = self._ultima
+        if aproximada_antes != aproximada:
+            return None
+        # "ip" -> "ipc": os termos por prefixo de "ipc" são parte dos de "ip"
+        if (
+            len(termos) == len(termos_antes)
+            and termos[:-1] == termos_antes[:-1]
+            and termos[-1].startswith(termos_antes[-1])
+        ):
+            return anteriores, pontuacao
+        # "ip" -> "ip con": um termo a mais só reduz o resultado
+        if len(termos) == len(termos_antes) + 1 and termos[:-1] == termos_antes:
+            return pontuacao, pontuacao
+        return None
+
+    def _pontuar_termo_ou_aproximado(
+        self, termo: str, aproximada: bool, docs: Optional[Dict[int, float]] = None
+    ) -> Dict[int, float]:
+        """Pontua o termo por prefixo ou, sem nenhum prefixo no índice, pela busca aproximada."""
+        if self._tem_prefixo(termo):
+            return self._pontuar_termo(termo, docs)
+        if aproximada:
+            return self._pontuar_aproximado(termo)
+        return {}
+
+    def _tem_prefixo(self, termo: str) -> bool:
+        """Indica se algum comando tem um termo iniciado por `termo`."""
+        for tid in self._prefixos.get(termo[:MAX_PREFIXO], ()):
+            if self._postings[tid] and (len(termo) <= MAX_PREFIXO or self._nomes[tid].startswith(termo)):
+                return True
+        return False
+
+    def _pontuar_termo(self, termo: str, docs: Optional[Dict[int, float]] = None) -> Dict[int, float]:
+        """
+        Melhor peso de cada documento para um termo da consulta.
+
+        Com `docs`, apenas esses documentos são considerados: quando são
+        poucos, seus termos são verificados um a um em vez de percorrer as
+        listas de todos os termos iniciados por `termo`.
+        """
+        pontuacao: Dict[int, float] = {}
+        tids = self._prefixos.get(termo[:MAX_PREFIXO], ())
+
+        if docs is not None:
+            custo_listas = sum(len(self._postings[tid]) for tid in tids)
+            custo_docs = len(docs) * self._ligacoes / max(1, len(self._por_key))
+            if custo_docs < custo_listas:
+                for doc in docs:
+                    melhor = 0.0
+                    for tid in self._termos_por_doc[doc]:
+                        indexado = self._nomes[tid]
+                        if indexado.startswith(termo):
+                            pontos = self._postings[tid][doc] * (1.0 if indexado == termo else FATOR_PREFIXO)
+                            if pontos > melhor:
+                                melhor = pontos
+                    if melhor:
+                        pontuacao[doc] = melhor
+                return pontuacao
+
+        if len(tids) == 1:
+            # Um único termo indexado: sem disputa pelo melhor peso
+            indexado = self._nomes[tids[0]]
+            if len(termo) > MAX_PREFIXO and not indexado.startswith(termo):
+                return pontuacao
+            fator = 1.0 if indexado == termo else FATOR_PREFIXO
+            postings = self._postings[tids[0]]
+            if docs is None:
+                return {doc: peso * fator for doc, peso in postings.items()}
+            return {doc: peso * fator for doc, peso in postings.items() if doc in docs}
+
+        for tid in tids:
+            indexado = self._nomes[tid]
+            if len(termo) > MAX_PREFIXO and not indexado.startswith(termo):
+                continue
+            fator = 1.0 if indexado == termo else FATOR_PREFIXO
+            for doc, peso in self._postings[tid].items():
+                if docs is not None and doc not in docs:
+                    continue
+                pontos = peso * fator
+                if pontos > pontuacao.get(doc, 0.0):
+                    pontuacao[doc] = pontos
+
+        return pontuacao
+
+    def _pontuar_aproximado(self, termo: str) -> Dict[int, float]:
+        """Pontua documentos cujos termos estão a poucas edições do termo."""
+        pontuacao: Dict[int, float] = {}
+        for tid, distancia in self.termos_similares(termo):
+            fator = FATOR_APROXIMADO * (1.0 - distancia / (distancia_maxima(termo) + 1))
+            for doc, peso in self._postings[tid].items():
+                pontos = peso * fator
+                if pontos > pontuacao.get(doc, 0.0):
+                    pontuacao[doc] = pontos
+        return pontuacao
+
+    def termos_similares(self, termo: str) -> List[Tuple[int, int]]:
+        """
+        Termos do vocabulário parecidos com `termo`.
+
+        Os candidatos são os termos que compartilham trigramas suficientes
+        (coeficiente de Dice >= SIMILARIDADE_MINIMA); cada um é confirmado
+        pela distância de edição limitada.
+
+        Returns:
+            Pares (id do termo, distância de edição).
+        """
+        if len(termo) < TAMANHO_MINIMO_APROXIMADO:
+            return []
+
+        grams = trigramas(termo)
+        compartilhados: Dict[int, int] = {}
+        for gram in grams:
+            for tid in self._trigramas.get(gram, ()):
+                compartilhados[tid] = compartilhados.get(tid, 0) + 1
+
+        maximo = distancia_maxima(termo)
+        similares = []
+        for tid, comuns in compartilhados.items():
+            indexado = self._nomes[tid]
+            # "$termo$" tem len(termo) trigramas
+            total = len(grams) + len(indexado)
+            if 2.0 * comuns / total < SIMILARIDADE_MINIMA:
+                continue
+            if not self._postings[tid]:
+                continue
+            distancia = distancia_limitada(termo, indexado, maximo)
+            if distancia is not None:
+                similares.append((tid, distancia))
+        return similares
+
+    def _obter_termo(self, termo: str) -> int:
+        """Retorna o id do termo, registrando-o e a seus prefixos se novo."""
+        tid = self._termos.get(termo)
+        if tid is None:
+            tid = len(self._postings)
+            self._termos[termo] = tid
+            self._nomes.append(termo)
+            self._postings.append({})
+            for tamanho in range(1, min(len(termo), MAX_PREFIXO) + 1):
+                self._prefixos.setdefault(termo[:tamanho], []).append(tid)
+            for gram in trigramas(termo):
+                self._trigramas.setdefault(gram, []).append(tid)
+        return tid
+
+
+def _somar(anteriores: Optional[Dict[int, float]], parcial: Dict[int, float]) -> Dict[int, float]:
+    """Documentos presentes nas duas pontuações, com os pontos somados."""
+    if anteriores is None:
+        return parcial
+    if len(parcial) > len(anteriores):
+        return {doc: pontos + parcial[doc] for doc, pontos in anteriores.items() if doc in parcial}
+    return {doc: anteriores[doc] + pontos for doc, pontos in parcial.items() if doc in anteriores}
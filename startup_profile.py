@@ -0,0 +1,53 @@
+"""
+Medição das fases de inicialização (main.py --profile-startup).
+
+As fases são sempre registradas (o custo é uma chamada a perf_counter);
+o relatório só é impresso quando o perfil está ativado.
+"""
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+
+class StartupProfiler:
+    """Registra a duração de cada fase e os marcos desde o início do processo."""
+
+    def __init__(self):
+        self.ativo = False
+        self.inicio = time.perf_counter()
+        self.fases: List[Tuple[str, float]] = []
+        self.marcos: List[Tuple[str, float]] = []
+
+    def ativar(self) -> None:
+        """Ativa a impressão do relatório ao fim da inicialização."""
+        self.ativo = True
+
+    @contextmanager
+    def fase(self, nome: str) -> Iterator[None]:
+        """Mede a duração do bloco como uma fase."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases.append((nome, time.perf_counter() - inicio))
+
+    def marcar(self, nome: str) -> None:
+        """Registra um marco (tempo decorrido desde o início)."""
+        self.marcos.append((nome, time.perf_counter() - self.inicio))
+
+    def relatorio(self) -> str:
+        """Tabela das fases e marcos em milissegundos."""
+        linhas = ["Perfil de inicialização:"]
+        for nome, duracao in self.fases:
+            linhas.append(f"  {nome:<28} {duracao * 1000:9.1f} ms")
+        for nome, decorrido in self.marcos:
+            linhas.append(f"  @ {nome:<26} {decorrido * 1000:9.1f} ms")
+        return "\n".join(linhas)
+
+    def imprimir(self) -> None:
+        """Imprime o relatório se o perfil estiver ativo."""
+        if self.ativo:
+            print(self.relatorio(), flush=True)
+
+
+profiler = StartupProfiler()
@@ -0,0 +1,185 @@
+"""
+Verificações da execução em vários alvos (fanout.py) sem outras máquinas:
+alvos simulados (MockTransport) e agentes em 127.0.0.1 (LoopbackAgent).
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover -s tests
+"""
+import asyncio
+import os
+import sys
+import time
+import unittest
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_executor import STATUS_CANCELADO, STATUS_CONCLUIDO, STATUS_TIMEOUT, ExecutionEngine
+from executor import SaidaCallback
+from fanout import Target, criar_alvo, executar_em_alvos
+from metrics import ExecutionSample, MetricsRegistry
+from models import Command
+from platform_detector import FakePlatform
+from transport import LoopbackAgent, MockTransport, Transport
+
+
+COMANDO = Command("F1", "Fan-out", "diagnostico", "Teste")
+
+
+class TransporteContador(Transport):
+    """Alvo simulado que registra quantas execuções estão em andamento."""
+
+    def __init__(self, estado: dict, atraso: float = 0.05):
+        self.estado = estado
+        self.atraso = atraso
+
+    async def executar(
+        self,
+        comando: str,
+        saida: SaidaCallback,
+        timeout: Optional[float] = None,
+        amostra: Optional[ExecutionSample] = None,
+    ) -> int:
+        self.estado["atual"] += 1
+        self.estado["pico"] = max(self.estado["pico"], self.estado["atual"])
+        try:
+            await asyncio.sleep(self.atraso)
+        finally:
+            self.estado["atual"] -= 1
+        return 0
+
+
+def comando_python(codigo: str) -> Command:
+    return Command("F2", "Python", f'"{sys.executable}" -c "{codigo}"', "Teste")
+
+
+class FanOutTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = ExecutionEngine(plataforma=FakePlatform(), registro_metricas=MetricsRegistry())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.parar()
+
+    def executar(self, cmd: Command, alvos: List[Target], **kwargs):
+        saida: List[str] = []
+        execucao = executar_em_alvos(cmd, alvos, saida=saida.append, engine=self.engine, **kwargs)
+        return execucao.resultado(30), "".join(saida).splitlines()
+
+    def test_prefixo_por_alvo_com_linhas_inteiras(self):
+        alvos = [Target(f"t{i}", MockTransport(f"linha 1 de t{i}\nlinha 2 de t{i}")) for i in range(5)]
+        execucao, linhas = self.executar(COMANDO, alvos)
+
+        self.assertTrue(execucao.sucesso)
+        for i in range(5):
+            # A última linha, sem quebra, é repassada ao fim da execução
+            self.assertIn(f"[t{i}] linha 1 de t{i}", linhas)
+            self.assertIn(f"[t{i}] linha 2 de t{i}", linhas)
+        for linha in linhas:
+            if linha.startswith("[t"):
+                prefixo = linha.split("]", 1)[0][1:]
+                self.assertTrue(linha.endswith(f"de {prefixo}"), linha)
+
+    def test_alvo_com_falha_nao_interrompe_os_demais(self):
+        alvos = [
+            Target("falha", MockTransport("erro\n", codigo=3)),
+            Target("ok1", MockTransport(atraso=0.1)),
+            Target("ok2", MockTransport(atraso=0.1)),
+        ]
+        execucao, _ = self.executar(COMANDO, alvos, paralelismo=1)
+
+        self.assertFalse(execucao.sucesso)
+        self.assertEqual(execucao.resultados["falha"].returncode, 3)
+        self.assertTrue(execucao.resultados["ok1"].sucesso)
+        self.assertTrue(execucao.resultados["ok2"].sucesso)
+
+    def test_parar_em_falha_cancela_os_restantes(self):
+        alvos = [
+            Target("falha", MockTransport("erro\n", codigo=1)),
+            Target("lento", MockTransport(atraso=5)),
+            Target("na_fila", MockTransport()),
+        ]
+        inicio = time.monotonic()
+        execucao, _ = self.executar(COMANDO, alvos, paralelismo=2, parar_em_falha=True)
+
+        self.assertLess(time.monotonic() - inicio, 2)
+        self.assertEqual(execucao.resultados["falha"].status, STATUS_CONCLUIDO)
+        self.assertEqual(execucao.resultados["lento"].status, STATUS_CANCELADO)
+        self.assertEqual(execucao.resultados["na_fila"].status, STATUS_CANCELADO)
+
+    def test_tempo_limite_por_alvo(self):
+        alvos = [Target("lento", MockTransport(atraso=5)), Target("rapido", MockTransport())]
+        inicio = time.monotonic()
+        execucao, linhas = self.executar(COMANDO, alvos, timeout=0.2)
+
+        self.assertLess(time.monotonic() - inicio, 2)
+        self.assertEqual(execucao.resultados["lento"].status, STATUS_TIMEOUT)
+        self.assertTrue(execucao.resultados["rapido"].sucesso)
+        self.assertIn("[rapido] ok", linhas)
+
+    def test_limite_de_paralelismo(self):
+        estado = {"atual": 0, "pico": 0}
+        alvos = [Target(f"t{i}", TransporteContador(estado)) for i in range(12)]
+        execucao, _ = self.executar(COMANDO, alvos, paralelismo=3)
+
+        self.assertTrue(execucao.sucesso)
+        self.assertEqual(estado["pico"], 3)
+
+    def test_nomes_repetidos_recusados(self):
+        with self.assertRaises(ValueError):
+            executar_em_alvos(COMANDO, [Target("a", MockTransport()), Target("a", MockTransport())], engine=self.engine)
+
+    def test_comando_admin_recusado_em_agente_remoto(self):
+        cmd = Command("F3", "Admin", "diagnostico", "Teste", requires_admin=True)
+        with self.assertRaises(ValueError):
+            executar_em_alvos(cmd, [criar_alvo("pc01=127.0.0.1:9")], engine=self.engine)
+
+
+class LoopbackTest(unittest.TestCase):
+    """Agentes reais em 127.0.0.1 executando processos locais."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = ExecutionEngine(plataforma=FakePlatform(), registro_metricas=MetricsRegistry())
+        cls.agentes = [LoopbackAgent() for _ in range(3)]
+        cls.alvos = [Target(f"agente{i}", agente.transporte()) for i, agente in enumerate(cls.agentes)]
+
+    @classmethod
+    def tearDownClass(cls):
+        for agente in cls.agentes:
+            agente.parar()
+        cls.engine.parar()
+
+    def test_saida_e_codigo_dos_processos(self):
+        saida: List[str] = []
+        cmd = comando_python("import sys; print('a'); print('b'); sys.exit(2)")
+        execucao = executar_em_alvos(cmd, self.alvos, saida=saida.append, engine=self.engine).resultado(30)
+
+        linhas = "".join(saida).splitlines()
+        for alvo in self.alvos:
+            self.assertEqual(execucao.resultados[alvo.name].returncode, 2)
+            self.assertIn(f"[{alvo.name}] a", linhas)
+            self.assertIn(f"[{alvo.name}] b", linhas)
+
+    def test_tempo_limite_encerra_o_processo(self):
+        cmd = comando_python("import time; time.sleep(30)")
+        inicio = time.monotonic()
+        execucao = executar_em_alvos(cmd, self.alvos, timeout=0.5, engine=self.engine).resultado(30)
+
+        self.assertLess(time.monotonic() - inicio, 10)
+        for alvo in self.alvos:
+            self.assertEqual(execucao.resultados[alvo.name].status, STATUS_TIMEOUT)
+
+    def test_agente_inacessivel(self):
+        execucao = executar_em_alvos(
+            COMANDO, [criar_alvo("fora=127.0.0.1:9")], timeout=5, engine=self.engine
+        ).resultado(30)
+        self.assertFalse(execucao.sucesso)
+        self.assertIsNotNone(execucao.resultados["fora"].erro)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Verificações das métricas coletadas pelo motor assíncrono (metrics.py
+com async_executor.ExecutionEngine e LocalTransport).
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover -s tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_executor import STATUS_TIMEOUT, ExecutionEngine
+from metrics import MetricsRegistry
+from models import Command
+from platform_detector import FakePlatform
+
+
+def comando_python(key: str, codigo: str, timeout=None) -> Command:
+    return Command(key, "Python", f'"{sys.executable}" -c "{codigo}"', "Teste", timeout=timeout)
+
+
+class MetricasDoMotorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registro = MetricsRegistry()
+        self.engine = ExecutionEngine(plataforma=FakePlatform(), registro_metricas=self.registro)
+
+    def tearDown(self):
+        self.engine.parar()
+
+    @unittest.skipIf(os.name == "nt", "CPU e pico de memória só são medidos em POSIX")
+    def test_cpu_e_pico_de_memoria(self):
+        # Aloca e toca ~200 MB, bem acima do pico do próprio processo de testes
+        cmd = comando_python("M1", "x = b'x' * (200 * 1024 * 1024); print(len(x))")
+        handle = self.engine.submeter(cmd)
+
+        self.assertEqual(handle.resultado(30), 0)
+        self.assertGreaterEqual(handle.amostra.rss_pico, 200 * 1024 * 1024)
+        self.assertGreater(handle.amostra.cpu, 0)
+
+        dados = self.registro.obter("M1")
+        self.assertIn("rss_pico", dados)
+        self.assertIn("cpu", dados)
+        self.assertGreaterEqual(dados["rss_pico"]["max"], 200 * 1024 * 1024)
+
+    def test_codigo_de_retorno_e_tempo_limite(self):
+        handle = self.engine.submeter(comando_python("M2", "import sys; sys.exit(3)"))
+        self.assertEqual(handle.resultado(30), 3)
+
+        handle = self.engine.submeter(comando_python("M3", "import time; time.sleep(30)", timeout=0.5))
+        handle.resultado(30)
+        self.assertEqual(handle.status, STATUS_TIMEOUT)
+        self.assertEqual(self.registro.obter("M3")["status"], {STATUS_TIMEOUT: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
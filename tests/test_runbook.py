@@ -0,0 +1,77 @@
+"""
+Verificações da execução de runbooks (runbook.py) com a plataforma
+simulada: ordem dos passos e passos que requerem privilégios.
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover -s tests
+"""
+import os
+import sys
+import unittest
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_executor import ExecutionEngine
+from metrics import MetricsRegistry
+from models import Command, Runbook, RunbookStep
+from platform_detector import FakePlatform
+from runbook import STATUS_CONCLUIDO, STATUS_FALHOU, STATUS_IGNORADO, executar_runbook
+
+
+def comando_python(key: str, codigo: str, requires_admin: bool = False) -> Command:
+    return Command(
+        key, f"Passo {key}", f'"{sys.executable}" -c "{codigo}"', "Teste", requires_admin=requires_admin
+    )
+
+
+# A1 (admin) demora um pouco; B1 depende dele
+COMANDOS = {
+    "A1": comando_python("A1", "import time; time.sleep(0.3); print('fim de A1')", requires_admin=True),
+    "B1": comando_python("B1", "print('inicio de B1')"),
+}
+RUNBOOK = Runbook("RBT", "Teste", (RunbookStep("A1"), RunbookStep("B1", ("A1",))))
+
+
+class RunbookAdminTest(unittest.TestCase):
+
+    def executar(self, plataforma: FakePlatform):
+        engine = ExecutionEngine(plataforma=plataforma, registro_metricas=MetricsRegistry())
+        saida: List[str] = []
+        try:
+            execucao = executar_runbook(RUNBOOK, COMANDOS, engine=engine, saida=saida.append).resultado(30)
+        finally:
+            engine.parar()
+        return execucao, "".join(saida).splitlines()
+
+    def test_passo_admin_elevado_em_linha_antes_dos_dependentes(self):
+        plataforma = FakePlatform(admin=False)
+        execucao, linhas = self.executar(plataforma)
+
+        self.assertTrue(execucao.sucesso)
+        self.assertEqual(plataforma.elevacoes, [COMANDOS["A1"].command])
+        self.assertLess(linhas.index("[A1] fim de A1"), linhas.index("[B1] inicio de B1"))
+
+    def test_passo_admin_sem_elevacao_em_linha_falha_sem_executar(self):
+        plataforma = FakePlatform(admin=False, em_linha=False)
+        execucao, linhas = self.executar(plataforma)
+
+        self.assertFalse(execucao.sucesso)
+        self.assertEqual(execucao.passos["A1"].status, STATUS_FALHOU)
+        self.assertEqual(execucao.passos["B1"].status, STATUS_IGNORADO)
+        # Nada foi entregue à elevação fora da aplicação
+        self.assertEqual(plataforma.elevacoes, [])
+        self.assertNotIn("[A1] fim de A1", linhas)
+
+    def test_administrador_executa_sem_elevar(self):
+        plataforma = FakePlatform(admin=True, em_linha=False)
+        execucao, _ = self.executar(plataforma)
+
+        self.assertEqual(execucao.passos["A1"].status, STATUS_CONCLUIDO)
+        self.assertEqual(execucao.passos["B1"].status, STATUS_CONCLUIDO)
+        self.assertEqual(plataforma.elevacoes, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
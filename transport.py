@@ -0,0 +1,419 @@
+"""
+Transportes: onde e como o texto de um comando é executado.
+
+O ExecutionEngine executa comandos locais com LocalTransport; a execução
+em vários alvos (fanout.py) usa um transporte por alvo. Um transporte
+recebe o texto do comando, um destino de saída incremental e o tempo
+limite, e retorna o código de saída; estoura asyncio.TimeoutError no
+tempo limite e, se cancelado, encerra o que estiver executando.
+
+Para desenvolver e testar a execução remota numa única máquina:
+    - LoopbackAgent: agente TCP local que executa os comandos recebidos
+      com LocalTransport (o mesmo protocolo que um agente remoto usaria)
+    - AgentTransport: cliente desse protocolo
+    - MockTransport: alvo simulado, sem processos nem rede
+
+Protocolo (JSON Lines sobre TCP): o cliente envia
+{"comando": "...", "timeout": 30}; o agente responde com {"saida": "..."}
+para cada trecho e termina com {"codigo": 0} ou {"erro": "..."}. Fechar
+a conexão cancela a execução no agente.
+"""
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from contextlib import suppress
+from typing import Optional
+
+from executor import (
+    SaidaCallback,
+    STREAM_CHUNK_SIZE,
+    aguardar_processo,
+    criar_decoder_saida,
+    kwargs_grupo_processos,
+    matar_arvore_processos,
+)
+from metrics import ExecutionSample
+
+
+# Tempo máximo aguardando o processo sair após encerrar sua árvore
+PRAZO_ENCERRAMENTO = 5.0
+
+
+class Transport:
+    """Interface dos transportes de execução."""
+
+    nome = "transporte"
+
+    async def executar(
+        self,
+        comando: str,
+        saida: SaidaCallback,
+        timeout: Optional[float] = None,
+        amostra: Optional[ExecutionSample] = None,
+    ) -> int:
+        """
+        Executa o comando, repassando a saída conforme chega.
+
+        Se `amostra` for informada, o transporte preenche as medições que
+        conseguir obter (ver metrics.ExecutionSample).
+
+        Raises:
+            asyncio.TimeoutError: Tempo limite excedido (execução encerrada)
+        """
+        raise NotImplementedError
+
+
+class _ProcessoPosix:
+    """
+    Subprocesso POSIX recolhido com os.wait4 (executor.aguardar_processo),
+    que informa o tempo de CPU e o pico de memória do filho.
+
+    Tem a mesma interface usada de asyncio.subprocess.Process (stdout, pid,
+    returncode, wait); o watcher do asyncio recolheria o filho antes, sem
+    essas medições.
+    """
+
+    def __init__(self, popen: subprocess.Popen, stdout: asyncio.StreamReader, pipe: asyncio.ReadTransport):
+        self.popen = popen
+        self.pid = popen.pid
+        self.stdout = stdout
+        self._pipe = pipe
+        self.returncode: Optional[int] = None
+        self.cpu: Optional[float] = None
+        self.rss_pico: Optional[int] = None
+        # Uma thread por processo, como o ThreadedChildWatcher do asyncio (e
+        # não o executor padrão, que o encerramento da árvore também usa):
+        # o filho é recolhido mesmo que ninguém chegue a aguardá-lo
+        loop = asyncio.get_running_loop()
+        self._espera: asyncio.Future = loop.create_future()
+        threading.Thread(target=self._recolher, args=(loop,), daemon=True).start()
+
+    @classmethod
+    async def criar(cls, comando: str, **kwargs) -> "_ProcessoPosix":
+        popen = subprocess.Popen(
+            comando, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **kwargs
+        )
+        leitor = asyncio.StreamReader()
+        loop = asyncio.get_running_loop()
+        pipe, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(leitor), popen.stdout)
+        return cls(popen, leitor, pipe)
+
+    def _recolher(self, loop: asyncio.AbstractEventLoop) -> None:
+        resultado = aguardar_processo(self.popen)
+        with suppress(RuntimeError):  # loop já encerrado
+            loop.call_soon_threadsafe(self._concluir, resultado)
+
+    def _concluir(self, resultado) -> None:
+        if not self._espera.done():
+            self._espera.set_result(resultado)
+
+    async def wait(self) -> int:
+        """Aguarda o fim do processo, recolhido pela thread de espera."""
+        # Cancelar a espera não interrompe o os.wait4 já em andamento
+        self.returncode, self.cpu, self.rss_pico = await asyncio.shield(self._espera)
+        return self.returncode
+
+    def fechar(self) -> None:
+        """Fecha o pipe de saída (já fechado ao chegar ao fim da saída)."""
+        self._pipe.close()
+
+
+class LocalTransport(Transport):
+    """
+    Executa o comando como subprocesso desta máquina.
+
+    Preenche na amostra o início do processo, o primeiro byte, os bytes
+    de saída, a duração e o código de retorno e, em POSIX, o tempo de CPU
+    e o pico de memória do processo.
+    """
+
+    nome = "local"
+
+    def __init__(self, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    async def executar(
+        self,
+        comando: str,
+        saida: SaidaCallback,
+        timeout: Optional[float] = None,
+        amostra: Optional[ExecutionSample] = None,
+    ) -> int:
+        amostra = amostra if amostra is not None else ExecutionSample()
+        inicio = time.monotonic()
+        if os.name == "nt":
+            processo = await asyncio.create_subprocess_shell(
+                comando,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                **kwargs_grupo_processos(),
+            )
+        else:
+            processo = await _ProcessoPosix.criar(comando, **kwargs_grupo_processos())
+        amostra.inicio_processo = time.monotonic() - inicio
+
+        try:
+            return await asyncio.wait_for(self._repassar_saida(processo, saida, amostra, inicio), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            await self._encerrar_processo(processo)
+            raise
+        finally:
+            amostra.duracao = time.monotonic() - inicio
+            if isinstance(processo, _ProcessoPosix):
+                processo.fechar()
+
+    async def _repassar_saida(
+        self,
+        processo: "asyncio.subprocess.Process",
+        saida: SaidaCallback,
+        amostra: ExecutionSample,
+        inicio: float,
+    ) -> int:
+        """Repassa a saída em blocos conforme chega e aguarda o fim do processo."""
+        decoder = criar_decoder_saida()
+
+        while True:
+            bloco = await processo.stdout.read(self.chunk_size)
+            if not bloco:
+                break
+            if amostra.primeiro_byte is None:
+                amostra.primeiro_byte = time.monotonic() - inicio
+            amostra.bytes_saida += len(bloco)
+            texto = decoder.decode(bloco)
+            if texto:
+                saida(texto)
+
+        resto = decoder.decode(b"", final=True)
+        if resto:
+            saida(resto)
+
+        amostra.returncode = await processo.wait()
+        amostra.cpu = getattr(processo, "cpu", None)
+        amostra.rss_pico = getattr(processo, "rss_pico", None)
+        return amostra.returncode
+
+    @staticmethod
+    async def _encerrar_processo(processo) -> None:
+        """Encerra a árvore de processos e recolhe o processo filho."""
+        if processo.returncode is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, matar_arvore_processos, processo.pid)
+        try:
+            await asyncio.wait_for(processo.wait(), PRAZO_ENCERRAMENTO)
+        except asyncio.TimeoutError:
+            logging.error("Processo %s não terminou após ser encerrado", processo.pid)
+
+
+class AgentTransport(Transport):
+    """Executa o comando em um agente pelo protocolo JSON Lines."""
+
+    nome = "agente"
+
+    def __init__(self, host: str, porta: int):
+        self.host = host
+        self.porta = porta
+
+    async def executar(
+        self,
+        comando: str,
+        saida: SaidaCallback,
+        timeout: Optional[float] = None,
+        amostra: Optional[ExecutionSample] = None,
+    ) -> int:
+        # O tempo limite inclui a conexão; ao excedê-lo a conexão é fechada
+        # e o agente cancela a execução
+        amostra = amostra if amostra is not None else ExecutionSample()
+        inicio = time.monotonic()
+        try:
+            return await asyncio.wait_for(self._executar(comando, saida, timeout, amostra, inicio), timeout)
+        finally:
+            amostra.duracao = time.monotonic() - inicio
+
+    async def _executar(
+        self,
+        comando: str,
+        saida: SaidaCallback,
+        timeout: Optional[float],
+        amostra: ExecutionSample,
+        inicio: float,
+    ) -> int:
+        reader, writer = await asyncio.open_connection(self.host, self.porta)
+        try:
+            pedido = {"comando": comando, "timeout": timeout}
+            writer.write(json.dumps(pedido).encode("utf-8") + b"\n")
+            await writer.drain()
+            return await self._ler_respostas(reader, saida, amostra, inicio)
+        finally:
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    @staticmethod
+    async def _ler_respostas(
+        reader: asyncio.StreamReader,
+        saida: SaidaCallback,
+        amostra: ExecutionSample,
+        inicio: float,
+    ) -> int:
+        """Repassa a saída do agente até receber o código de saída."""
+        while True:
+            linha = await reader.readline()
+            if not linha:
+                raise ConnectionError("o agente encerrou a conexão")
+            mensagem = json.loads(linha)
+            if "saida" in mensagem:
+                if amostra.primeiro_byte is None:
+                    amostra.primeiro_byte = time.monotonic() - inicio
+                amostra.bytes_saida += len(mensagem["saida"].encode("utf-8"))
+                saida(mensagem["saida"])
+            elif "codigo" in mensagem:
+                # Medições feitas pelo agente na máquina de destino
+                amostra.inicio_processo = mensagem.get("inicio_processo")
+                amostra.cpu = mensagem.get("cpu")
+                amostra.rss_pico = mensagem.get("rss_pico")
+                amostra.returncode = mensagem["codigo"]
+                return mensagem["codigo"]
+            elif mensagem.get("erro") == "timeout":
+                raise asyncio.TimeoutError()
+            else:
+                raise RuntimeError(mensagem.get("erro", "resposta inválida do agente"))
+
+
+class MockTransport(Transport):
+    """Alvo simulado: emite uma saída fixa após um atraso, sem processos."""
+
+    nome = "simulado"
+
+    def __init__(self, saida: str = "ok\n", codigo: int = 0, atraso: float = 0.0):
+        self.saida = saida
+        self.codigo = codigo
+        self.atraso = atraso
+
+    async def executar(
+        self,
+        comando: str,
+        saida: SaidaCallback,
+        timeout: Optional[float] = None,
+        amostra: Optional[ExecutionSample] = None,
+    ) -> int:
+        async def simular() -> int:
+            if self.atraso:
+                await asyncio.sleep(self.atraso)
+            if self.saida:
+                saida(self.saida)
+            if amostra is not None:
+                amostra.duracao = self.atraso
+                amostra.bytes_saida = len(self.saida.encode("utf-8"))
+                amostra.returncode = self.codigo
+            return self.codigo
+
+        return await asyncio.wait_for(simular(), timeout)
+
+
+class LoopbackAgent:
+    """
+    Agente de execução em 127.0.0.1, com event loop em thread própria.
+
+    Atende o protocolo de AgentTransport executando os comandos com o
+    transporte informado (padrão: LocalTransport).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", porta: int = 0, transport: Optional[Transport] = None):
+        self.host = host
+        self.porta = porta
+        self.transport = transport or LocalTransport()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> int:
+        """Inicia o agente e retorna a porta em que ele escuta."""
+        if self._loop is not None:
+            return self.porta
+
+        pronto = threading.Event()
+        loop = asyncio.new_event_loop()
+
+        async def abrir():
+            self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+            self.porta = self._servidor.sockets[0].getsockname()[1]
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(abrir())
+            loop.call_soon(pronto.set)
+            loop.run_forever()
+            loop.close()
+
+        self._loop = loop
+        self._thread = threading.Thread(target=run, name="LoopbackAgent", daemon=True)
+        self._thread.start()
+        pronto.wait()
+        return self.porta
+
+    def parar(self, timeout: Optional[float] = 5.0) -> None:
+        """Fecha o servidor e encerra a thread do agente."""
+        loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        async def fechar():
+            self._servidor.close()
+            # Execuções em andamento são canceladas (encerrando seus processos)
+            pendentes = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for tarefa in pendentes:
+                tarefa.cancel()
+            await asyncio.gather(*pendentes, return_exceptions=True)
+            await self._servidor.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(fechar(), loop).result(timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout)
+
+    def transporte(self) -> AgentTransport:
+        """Transporte cliente conectado a este agente."""
+        return AgentTransport(self.host, self.iniciar())
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Executa um pedido; a desconexão do cliente cancela a execução."""
+        def responder(mensagem: dict) -> None:
+            writer.write(json.dumps(mensagem, ensure_ascii=False).encode("utf-8") + b"\n")
+
+        try:
+            pedido = json.loads(await reader.readline())
+            amostra = ExecutionSample()
+            execucao = asyncio.ensure_future(self.transport.executar(
+                pedido["comando"], lambda t: responder({"saida": t}), pedido.get("timeout"), amostra
+            ))
+            desconexao = asyncio.ensure_future(reader.read())
+            await asyncio.wait({execucao, desconexao}, return_when=asyncio.FIRST_COMPLETED)
+
+            if not execucao.done():
+                execucao.cancel()
+                with suppress(asyncio.CancelledError):
+                    await execucao
+                return
+            desconexao.cancel()
+
+            try:
+                responder({
+                    "codigo": execucao.result(),
+                    "inicio_processo": amostra.inicio_processo,
+                    "cpu": amostra.cpu,
+                    "rss_pico": amostra.rss_pico,
+                })
+            except asyncio.TimeoutError:
+                responder({"erro": "timeout"})
+            except Exception as e:
+                responder({"erro": str(e)})
+            await writer.drain()
+        except Exception as e:
+            logging.warning("Agente: pedido inválido ou conexão perdida: %s", e)
+        finally:
+            writer.close()